@@ -1,15 +1,19 @@
 import streamlit as st
 import pandas as pd
-from copy import deepcopy
 
 # Import your Engine components
 from scraper import DataDragon
 from loader import ItemLoader
-from engine import Stats, StatType, DamageType, ProcType
+from engine import Stats, StatType, DamageType, ProcType, effective_resist, resist_multiplier
 from ability import Ability, AbilityConfig, AbilityLevelData, ScalingRatio
 from simulation import TimeEngine
 from pipeline import EventManager, CombatSystem, DamageEngine
 from stat_pipeline import StatPipeline
+from heatmap import HeatmapBuilder, TargetGrid, linspace
+from scenario import Scenario
+from optimizer import Optimizer
+from enumerator import BuildEnumerator, BuildConstraints
+from growth import GrowthTable, EZREAL
 
 # ------------------------------------------------------------------
 # 1. SETUP & CACHING
@@ -21,6 +25,9 @@ def load_library():
     raw = dd.fetch_items()
     return ItemLoader.load_all(raw)
 
+# Base stats per level, computed once per session
+ezreal_table = GrowthTable(EZREAL)
+
 st.set_page_config(page_title="LoL Sim 2026", layout="wide")
 st.title("⚔️ League of Legends Combat Simulator")
 st.caption("Phase 11: Granular Damage Tracking & Event Reset")
@@ -36,12 +43,14 @@ st.sidebar.header("1. Champion (Ezreal)")
 
 # A. Level & Base Stats
 level = st.sidebar.slider("Level", 1, 18, 9)
-base_ad = 62.0 + (3.0 * level)
-base_as = 0.625
-bonus_as_growth = 0.025 * level
+champ_level_stats = ezreal_table.stats(level)
+base_ad = champ_level_stats.base_ad
+base_as = champ_level_stats.base_attack_speed
+bonus_as_growth = champ_level_stats.bonus_attack_speed
 
-base_mana = st.sidebar.number_input("Base Mana", 0, 2000, 375 + (50 * level)) # Approx Ezreal growth
-base_mana_regen = st.sidebar.number_input("Base Mana Regen", 0.0, 20.0, 2.0) # Per Second
+base_mana = st.sidebar.number_input("Base Mana", 0, 2000, int(champ_level_stats.base_mana))
+base_mana_regen = st.sidebar.number_input("Base Mana Regen", 0.0, 20.0,
+                                          round(champ_level_stats.base_mana_regen, 2)) # Per Second
 
 st.sidebar.markdown(f"**Base AD:** `{base_ad:.0f}`")
 st.sidebar.markdown(f"**Base AS:** `{base_as:.3f} (+{bonus_as_growth:.1%})`")
@@ -78,6 +87,17 @@ if st.sidebar.button("🗑️ Nuke Cache & Reload", type="secondary", use_contai
    
 
 
+# Ezreal Q (Mystic Shot), shared by the heatmap and the simulation
+q_config = AbilityConfig(
+    name="Mystic Shot",
+    damage_type=DamageType.PHYSICAL,
+    ratios=[ScalingRatio(StatType.AD, 1.30)], 
+    level_data=[AbilityLevelData(base_damage=120, 
+                                 mana_cost=30, 
+                                 cooldown=4.5)], 
+    proc_type=ProcType.SPELL | ProcType.ON_HIT
+)
+
 # ------------------------------------------------------------------
 # 3. COMBAT SCENARIO & TARGET ANALYSIS (Live Updates)
 # ------------------------------------------------------------------
@@ -114,12 +134,11 @@ st.subheader("🧐 Target Analysis")
 current_lethality = final_attacker_stats.lethality
 current_percent_pen = final_attacker_stats.armor_pen_percent
 
-# 2. Calculate "Post-Penetration" Armor
-eff_armor = target_armor * (1.0 - current_percent_pen)
-eff_armor = max(0, eff_armor - current_lethality)
+# 2. Calculate "Post-Penetration" Armor (same kernel the simulation uses)
+eff_armor = effective_resist(target_armor, current_lethality, current_percent_pen)
 
 # 3. Calculate Mitigation & Effective HP
-mitigation = 100.0 / (100.0 + eff_armor)
+mitigation = resist_multiplier(target_armor, current_lethality, current_percent_pen)
 reduction_percent = (1.0 - mitigation) * 100.0
 ehp_physical = target_hp * (1.0 + (eff_armor / 100.0))
 
@@ -130,6 +149,52 @@ t2.metric("Dmg Reduction", f"{reduction_percent:.1f}%")
 t3.metric("Effective HP", f"{ehp_physical:.0f}", delta=f"+{ehp_physical - target_hp:.0f} Armor Value")
 t4.metric("Penetration", f"{current_percent_pen*100:.0f}% + {current_lethality:.0f} Flat")
 
+# --- TARGET HEATMAP ---
+with st.expander("🗺️ Target Heatmap (HP × Armor × MR)"):
+    h1, h2, h3 = st.columns(3)
+    with h1:
+        hm_metric = st.radio("Metric", ["Time to Kill", "Damage"], horizontal=True)
+        hm_points = st.slider("Grid Points per Axis", 2, 50, 20)
+    with h2:
+        hm_hp = st.slider("Enemy HP Range", 500, 10000, (1000, 5000), step=100)
+        hm_armor = st.slider("Enemy Armor Range", 0, 500, (0, 200), step=10)
+    with h3:
+        hm_mr = st.slider("Enemy MR Range", 0, 500, (0, 100), step=10)
+        hm_mr_points = st.slider("MR Points", 1, 50, 3)
+
+    if st.button("Build Heatmap", use_container_width=True):
+        hm_attacker = Stats(
+            base_ad=base_ad,
+            base_attack_speed=base_as,
+            bonus_attack_speed=bonus_as_growth,
+            base_mana=base_mana,
+            current_mana=base_mana,
+            base_mana_regen=base_mana_regen
+        )
+        grid = TargetGrid(
+            hp_values=linspace(*hm_hp, hm_points),
+            armor_values=linspace(*hm_armor, hm_points),
+            mr_values=linspace(*hm_mr, hm_mr_points)
+        )
+        builder = HeatmapBuilder(hm_attacker, preview_items, [Ability(q_config, rank=1)])
+        metric = "ttk" if hm_metric == "Time to Kill" else "damage"
+        with st.spinner(f"Evaluating {grid.size} target profiles..."):
+            st.session_state["heatmap"] = builder.build(grid, metric, float(sim_duration))
+
+    heat = st.session_state.get("heatmap")
+    if heat is not None:
+        st.caption(f"{heat.grid.size} points from {heat.simulations} simulation(s) ({heat.mode})")
+        mr_pick = st.select_slider(
+            "MR Slice", options=list(range(len(heat.grid.mr_values))),
+            format_func=lambda i: f"{heat.grid.mr_values[i]:.0f} MR"
+        )
+        heat_df = pd.DataFrame(
+            heat.slice(mr_pick),
+            index=[f"{a:.0f} Armor" for a in heat.grid.armor_values],
+            columns=[f"{h:.0f} HP" for h in heat.grid.hp_values]
+        )
+        st.dataframe(heat_df, use_container_width=True)
+
 st.divider()
 
 # ------------------------------------------------------------------
@@ -137,8 +202,8 @@ st.divider()
 # ------------------------------------------------------------------
 if st.button("🔥 RUN SIMULATION", type="primary", use_container_width=True):
 
-    # A. Setup Objects (CRITICAL: Deepcopy only ONCE to reset passive states)
-    items = deepcopy([library[name] for name in selected_items])
+    # A. Setup Objects (passive state lives on the bus, so library items are used as-is)
+    items = [library[name] for name in selected_items]
     
 
     with st.expander("🔍 Engine Diagnostic: What Passives do I actually have?"):
@@ -167,16 +232,7 @@ if st.button("🔥 RUN SIMULATION", type="primary", use_container_width=True):
         base_mr=target_armor
     )
 
-    # C. Define Ezreal Q (Mystic Shot)
-    q_config = AbilityConfig(
-        name="Mystic Shot",
-        damage_type=DamageType.PHYSICAL,
-        ratios=[ScalingRatio(StatType.AD, 1.30)], 
-        level_data=[AbilityLevelData(base_damage=120, 
-                                     mana_cost=30, 
-                                     cooldown=4.5)], 
-        proc_type=ProcType.SPELL | ProcType.ON_HIT
-    )
+    # C. Ezreal Q (Mystic Shot)
     abilities = [Ability(q_config, rank=1)]
     
     # D. Initialize Pipeline
@@ -189,10 +245,7 @@ if st.button("🔥 RUN SIMULATION", type="primary", use_container_width=True):
     sim.max_duration = float(sim_duration)
     
     # F. Register Passives to the Event Bus
-    for item in items:
-        for p in item.passives:
-            if hasattr(p, 'register'): 
-                p.register(bus)
+    sim.register_passives()
 
     # G. Run
     sim.run(abilities)
@@ -234,4 +287,137 @@ if st.button("🔥 RUN SIMULATION", type="primary", use_container_width=True):
     else:
         st.error("Simulation ran but no damage was recorded. Check Ability/Attack logic.")
 
-    st.success(f"Simulation complete for {', '.join(selected_items)}!")
\ No newline at end of file
+    st.success(f"Simulation complete for {', '.join(selected_items)}!")
+
+# ------------------------------------------------------------------
+# 6. BUILD SWEEP (Streaming Leaderboard)
+# ------------------------------------------------------------------
+st.divider()
+st.header("🏁 Build Sweep")
+
+sw1, sw2, sw3 = st.columns([3, 1, 1])
+with sw1:
+    sweep_pool = st.multiselect("Candidate Items", options=all_items, default=selected_items)
+with sw2:
+    sweep_size = st.slider("Items per Build", 1, 6, min(3, max(1, len(sweep_pool))))
+with sw3:
+    sweep_top_k = st.slider("Leaders Shown", 1, 25, 10)
+
+sweep_budget = st.number_input("Gold Budget (0 = unlimited)", 0, 30000, 0, step=500)
+
+sweep_enum = BuildEnumerator(
+    {name: library[name] for name in sweep_pool},
+    BuildConstraints(min_items=sweep_size, max_items=sweep_size,
+                     gold_budget=sweep_budget or None)
+)
+sweep_total = sweep_enum.count()
+st.caption(f"{sweep_total} builds to simulate")
+
+if st.button("🏁 RUN SWEEP", use_container_width=True, disabled=sweep_total == 0):
+    sweep_attacker = Stats(
+        base_ad=base_ad,
+        base_attack_speed=base_as,
+        bonus_attack_speed=bonus_as_growth,
+        base_mana=base_mana,
+        current_mana=base_mana,
+        base_mana_regen=base_mana_regen
+    )
+    sweep_scenario = Scenario(
+        name="Sweep",
+        duration=float(sim_duration),
+        attacker_level=level,
+        target_stats=Stats(base_hp=target_hp, current_health=target_hp,
+                           base_armor=target_armor, base_mr=target_armor)
+    )
+    opt = Optimizer(sweep_scenario, sweep_attacker, [Ability(q_config, rank=1)])
+
+    # Lazy: builds are generated one at a time, never as a full list
+    sweep_builds = (
+        (" + ".join(item.name for item in items), items)
+        for items in sweep_enum
+    )
+
+    bar = st.progress(0.0, text="Simulating...")
+    leaders_box = st.empty()
+
+    def show_leaders(done, board):
+        bar.progress(done / sweep_total, text=f"Simulated {done} / {sweep_total} builds")
+        leaders_box.dataframe(pd.DataFrame([
+            {"Build": r.build_name, "DPS": round(r.dps, 1), "Total": round(r.total_damage),
+             "Cost": r.cost, "Dmg / Gold": round(r.total_damage / max(1, r.cost), 2)}
+            for r in board.top("dps")
+        ]), use_container_width=True)
+
+    board = opt.sweep(sweep_builds, top_k=sweep_top_k, progress=show_leaders,
+                      progress_every=max(1, sweep_total // 50))
+    show_leaders(board.seen, board)
+    st.success(f"Sweep complete: {board.seen} builds simulated.")
+
+# --- Pareto frontier: best DPS at every price point in one run ---
+pareto_budgets = st.text_input("Budgets to Report (gold, comma separated)", "7000, 10000, 13000")
+
+if st.button("📈 PARETO FRONTIER (Cost vs DPS)", use_container_width=True, disabled=sweep_total == 0):
+    pareto_attacker = Stats(
+        base_ad=base_ad,
+        base_attack_speed=base_as,
+        bonus_attack_speed=bonus_as_growth,
+        base_mana=base_mana,
+        current_mana=base_mana,
+        base_mana_regen=base_mana_regen
+    )
+    pareto_scenario = Scenario(
+        name="Pareto",
+        duration=float(sim_duration),
+        attacker_level=level,
+        target_stats=Stats(base_hp=target_hp, current_health=target_hp,
+                           base_armor=target_armor, base_mr=target_armor)
+    )
+    opt = Optimizer(pareto_scenario, pareto_attacker, [Ability(q_config, rank=1)])
+    budgets = [int(b) for b in pareto_budgets.replace(" ", "").split(",") if b.isdigit()]
+
+    with st.spinner("Searching the frontier..."):
+        frontier = opt.pareto_sweep({name: library[name] for name in sweep_pool},
+                                    sweep_enum.constraints, use_ttk=True, budgets=budgets)
+
+    st.dataframe(pd.DataFrame([
+        {"Cost": p.cost, "DPS": round(p.dps, 1),
+         "TTK": round(p.time_to_kill, 2) if p.time_to_kill is not None else None,
+         "Build": p.build_name}
+        for p in frontier.points
+    ]), use_container_width=True)
+
+    for budget in budgets:
+        best = frontier.best_at(budget)
+        if best:
+            st.write(f"**Best at {budget}g:** {best.build_name} ({best.dps:.1f} DPS, {best.cost}g)")
+        else:
+            st.write(f"**Best at {budget}g:** nothing affordable")
+
+# ------------------------------------------------------------------
+# 7. POWER CURVE (Levels 1-18)
+# ------------------------------------------------------------------
+st.divider()
+st.header("📈 Power Curve")
+st.caption("The current build simulated at every level, using the champion's growth table.")
+
+if st.button("📈 RUN LEVEL SWEEP", use_container_width=True, disabled=not selected_items):
+    curve_scenario = Scenario(
+        name="Level Sweep",
+        duration=float(sim_duration),
+        attacker_level=level,
+        target_stats=Stats(base_hp=target_hp, current_health=target_hp,
+                           base_armor=target_armor, base_mr=target_armor)
+    )
+    opt = Optimizer(curve_scenario, champ_level_stats, [Ability(q_config, rank=1)])
+
+    with st.spinner("Simulating levels 1-18..."):
+        curve = opt.level_sweep(" + ".join(selected_items), preview_items, ezreal_table)
+
+    curve_df = pd.DataFrame([
+        {"Level": lvl, "DPS": round(r.dps, 1), "Total": round(r.total_damage),
+         "TTK": round(r.time_to_kill, 2) if r.time_to_kill is not None else None}
+        for lvl, r in zip(curve.levels, curve.results)
+    ])
+    st.line_chart(curve_df, x="Level", y="DPS")
+    st.write("**Biggest spikes:** " + ", ".join(f"Lv {lvl} (+{gain:.1f} DPS)" for lvl, gain in curve.spikes()))
+    st.dataframe(curve_df, use_container_width=True)
@@ -1,3 +1,4 @@
+from copy import copy
 from dataclasses import dataclass, field
 from typing import List, Dict
 from item import StatModifier
@@ -33,6 +34,11 @@ class BuffManager:
     def __init__(self):
         # Map: BuffName -> ActiveBuff Instance
         self.active_buffs: Dict[str, ActiveBuff] = {}
+        # Bumped whenever the buffs (or their stacks) change: stats resolved
+        # for an older version are stale, for the same version still valid
+        self.version = 0
+        # Earliest expiration; tick() has nothing to do before it
+        self._next_expiry = float("inf")
 
     def apply_buff(self, config: BuffConfig, current_time: float):
         if config.name in self.active_buffs:
@@ -42,9 +48,14 @@ class BuffManager:
             # New buff: Create
             self.active_buffs[config.name] = ActiveBuff(config, current_time)
             print(f"[{current_time:.2f}s] BUFF APPLIED: {config.name}")
+        self.version += 1
+        self._next_expiry = min(self._next_expiry, self.active_buffs[config.name].expiration_time)
 
     def tick(self, current_time: float):
         """Removes expired buffs."""
+        if current_time < self._next_expiry:
+            return
+
         expired = []
         for name, buff in self.active_buffs.items():
             if current_time >= buff.expiration_time:
@@ -54,5 +65,19 @@ class BuffManager:
             del self.active_buffs[name]
             print(f"[{current_time:.2f}s] BUFF EXPIRED: {name}")
 
+        if expired:
+            self.version += 1
+        # Refreshed stacks may have pushed the old minimum back
+        self._next_expiry = min((b.expiration_time for b in self.active_buffs.values()),
+                                default=float("inf"))
+
+    def copy(self) -> 'BuffManager':
+        """Independent manager with the same buffs (configs are shared, stacks are not)."""
+        clone = BuffManager()
+        clone.active_buffs = {name: copy(buff) for name, buff in self.active_buffs.items()}
+        clone.version = self.version
+        clone._next_expiry = self._next_expiry
+        return clone
+
     def get_all_buffs(self) -> List[ActiveBuff]:
         return list(self.active_buffs.values())
\ No newline at end of file
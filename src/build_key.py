@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from item import ItemConfig
+
+@dataclass(frozen=True)
+class BuildKey:
+    """
+    Identity of a build for caching.
+
+    By default the item names are sorted, so any permutation of the same
+    items (duplicates included, e.g. two Long Swords) maps to one key.
+    `ordered` keys keep purchase order for scenarios where it matters.
+    """
+    items: Tuple[str, ...]
+    ordered: bool = False
+
+    def __str__(self) -> str:
+        sep = " > " if self.ordered else " + "
+        return sep.join(self.items) or "(empty)"
+
+def canonical_key(items: List[ItemConfig], order_sensitive: bool = False) -> BuildKey:
+    names = tuple(item.name for item in items)
+    if order_sensitive:
+        return BuildKey(names, ordered=True)
+    return BuildKey(tuple(sorted(names)))
+
+class TranspositionTable:
+    """
+    Remembers results of equivalent builds so no search or batch run
+    simulates the same item set twice.
+
+    Entries are keyed by (BuildKey, context). The context holds whatever
+    else the result depends on (see Optimizer.context: crit stream,
+    scenario, champion and kit).
+    """
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[BuildKey, Hashable], Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: BuildKey, context: Hashable = None):
+        result = self._entries.get((key, context))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: BuildKey, result, context: Hashable = None):
+        self._entries[(key, context)] = result
+
+        # Oldest entries go first (dicts keep insertion order)
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
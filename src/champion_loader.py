@@ -0,0 +1,263 @@
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from engine import StatType, DamageType, ProcType
+from ability import AbilityConfig, AbilityLevelData, ScalingRatio, StatSource
+from growth import ChampionGrowth, GrowthTable
+from kit_overrides import KIT_OVERRIDES
+from storage import write_json_atomic
+
+SLOTS = ["Q", "W", "E", "R"]
+
+# Bump when the compiled format or the parsing rules change (old caches are ignored)
+KIT_FORMAT = 1
+
+# Default cache: <repo>/data/champions, wherever the app is launched from (gitignored)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "champions")
+
+# ------------------------------------------------------------------
+# 1. THE COMPILED KIT
+# ------------------------------------------------------------------
+
+@dataclass
+class ChampionKit:
+    champion_id: str
+    name: str
+    patch: str
+    growth: ChampionGrowth
+    # Damaging spells only, in slot order (the engine casts them by priority)
+    abilities: List[AbilityConfig] = field(default_factory=list)
+
+    @property
+    def table(self) -> GrowthTable:
+        return GrowthTable(self.growth)
+
+    # --- JSON (enums are stored by name) ---
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": KIT_FORMAT,
+            "champion_id": self.champion_id,
+            "name": self.name,
+            "patch": self.patch,
+            "growth": asdict(self.growth),
+            "abilities": [
+                {
+                    "name": a.name,
+                    "damage_type": a.damage_type.name,
+                    "ratios": [[r.stat_type.name, r.coefficient, r.source.name] for r in a.ratios],
+                    "level_data": [[d.base_damage, d.cooldown, d.mana_cost] for d in a.level_data],
+                    "proc_type": a.proc_type.value,
+                    "proc_coefficient": a.proc_coefficient,
+                    "tags": sorted(a.tags),
+                }
+                for a in self.abilities
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ChampionKit':
+        abilities = [
+            AbilityConfig(
+                name=a["name"],
+                damage_type=DamageType[a["damage_type"]],
+                ratios=[ScalingRatio(StatType[s], c, StatSource[src]) for s, c, src in a["ratios"]],
+                level_data=[AbilityLevelData(dmg, cd, cost) for dmg, cd, cost in a["level_data"]],
+                proc_type=ProcType(a["proc_type"]),
+                proc_coefficient=a["proc_coefficient"],
+                tags=set(a["tags"]),
+            )
+            for a in data["abilities"]
+        ]
+        return cls(data["champion_id"], data["name"], data["patch"],
+                   ChampionGrowth(**data["growth"]), abilities)
+
+# ------------------------------------------------------------------
+# 2. PARSING (DataDragon champion JSON -> ChampionKit)
+# ------------------------------------------------------------------
+
+# Damage type of a spell without an override, from the tooltip's markup tags
+_DAMAGE_TAGS = [
+    ("<physicalDamage>", DamageType.PHYSICAL),
+    ("<magicDamage>", DamageType.MAGIC),
+    ("<trueDamage>", DamageType.TRUE),
+]
+
+def parse_growth(champion_id: str, stats: Dict[str, float]) -> ChampionGrowth:
+    return ChampionGrowth(
+        name=champion_id,
+        hp=stats.get("hp", 0.0), hp_per_level=stats.get("hpperlevel", 0.0),
+        mana=stats.get("mp", 0.0), mana_per_level=stats.get("mpperlevel", 0.0),
+        # Riot gives regen per 5 seconds; the engine regenerates per second
+        mana_regen=stats.get("mpregen", 0.0) / 5.0,
+        mana_regen_per_level=stats.get("mpregenperlevel", 0.0) / 5.0,
+        ad=stats.get("attackdamage", 0.0), ad_per_level=stats.get("attackdamageperlevel", 0.0),
+        armor=stats.get("armor", 0.0), armor_per_level=stats.get("armorperlevel", 0.0),
+        mr=stats.get("spellblock", 0.0), mr_per_level=stats.get("spellblockperlevel", 0.0),
+        attack_speed=stats.get("attackspeed", 0.625),
+        # Riot gives percent (2.5 = +2.5%)
+        attack_speed_per_level=stats.get("attackspeedperlevel", 0.0) / 100.0,
+    )
+
+def _per_rank(values: Optional[List[float]], ranks: int) -> List[float]:
+    values = [v or 0.0 for v in (values or [])]
+    if not values:
+        return [0.0] * ranks
+    # Pad short lists with their last value
+    return (values + [values[-1]] * ranks)[:ranks]
+
+def parse_spell(slot: str, spell: Dict[str, Any], uses_mana: bool,
+                override: Optional[Dict[str, Any]]) -> Optional[AbilityConfig]:
+    """One spell, or None if it deals no damage the engine can model."""
+    ranks = spell.get("maxrank", 5)
+    cooldowns = _per_rank(spell.get("cooldown"), ranks)
+    costs = _per_rank(spell.get("cost"), ranks) if uses_mana else [0.0] * ranks
+
+    if override is not None:
+        damage_type = override["damage_type"]
+        base_damage = _per_rank(override["base_damage"], ranks)
+        ratios = [ScalingRatio(stat, coef) for stat, coef in override.get("ratios", [])]
+        proc_type = override.get("proc_type", ProcType.SPELL)
+    else:
+        # 1. Damage type from the tooltip markup (no markup = utility spell)
+        tooltip = spell.get("tooltip", "")
+        damage_type = next((dt for tag, dt in _DAMAGE_TAGS if tag in tooltip), None)
+        if damage_type is None:
+            return None
+
+        # 2. Base damage: DataDragon leaves effect[0] empty and puts the
+        #    spell's main per-rank damage in effect[1]. Ratios are not in
+        #    the JSON any more, so the spell scales with nothing; kits that
+        #    need AD/AP scaling (or another effect slot) get an override.
+        effects = spell.get("effect") or []
+        base_damage = _per_rank(effects[1] if len(effects) > 1 else None, ranks)
+        if not any(base_damage):
+            return None
+        ratios = []
+        proc_type = ProcType.SPELL
+
+    return AbilityConfig(
+        name=spell.get("name", slot),
+        damage_type=damage_type,
+        ratios=ratios,
+        level_data=[AbilityLevelData(base_damage=d, cooldown=cd, mana_cost=c)
+                    for d, cd, c in zip(base_damage, cooldowns, costs)],
+        proc_type=proc_type,
+        tags={slot},
+    )
+
+def compile_champion(data: Dict[str, Any], patch: str) -> ChampionKit:
+    champion_id = data["id"]
+    overrides = KIT_OVERRIDES.get(champion_id, {})
+    uses_mana = data.get("partype") == "Mana"
+
+    abilities = []
+    for slot, spell in zip(SLOTS, data.get("spells", [])):
+        if slot in overrides and overrides[slot] is None:
+            continue # Explicitly excluded from the rotation
+        config = parse_spell(slot, spell, uses_mana, overrides.get(slot))
+        if config is not None:
+            abilities.append(config)
+
+    return ChampionKit(champion_id, data.get("name", champion_id), patch,
+                       parse_growth(champion_id, data.get("stats", {})), abilities)
+
+# ------------------------------------------------------------------
+# 3. THE LOADER (disk cache per patch)
+# ------------------------------------------------------------------
+
+class ChampionLoader:
+    """
+    Compiled champion kits, cached as JSON under <cache_dir>/<patch>/.
+
+    A kit is compiled once per patch; after that, loading is a file read.
+    load_roster() fills the cache for every champion from one bundle
+    download (championFull.json) instead of one request per champion.
+    """
+    def __init__(self, dragon=None, patch: Optional[str] = None,
+                 cache_dir: str = CACHE_DIR):
+        # `dragon` is a DataDragon; only needed when something is not cached yet
+        self.dragon = dragon
+        self.patch = patch or (dragon.version if dragon is not None else None)
+        if self.patch is None:
+            raise ValueError("ChampionLoader needs a patch or a DataDragon")
+        self.cache_dir = os.path.join(cache_dir, self.patch)
+
+    def _path(self, champion_id: str) -> str:
+        # Champion ids are alphanumeric; anything else is stripped from the filename
+        return os.path.join(self.cache_dir, re.sub(r"[^A-Za-z0-9]", "", champion_id) + ".json")
+
+    def _read(self, champion_id: str) -> Optional[ChampionKit]:
+        path = self._path(champion_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != KIT_FORMAT:
+            return None
+        return ChampionKit.from_dict(data)
+
+    def _write(self, kit: ChampionKit):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_json_atomic(self._path(kit.champion_id), kit.to_dict(), indent=2)
+
+    def compile(self, raw: Dict[str, Any]) -> ChampionKit:
+        """Compiles (and caches) a champion from its DataDragon JSON."""
+        kit = compile_champion(raw, self.patch)
+        self._write(kit)
+        return kit
+
+    def load(self, champion_id: str) -> ChampionKit:
+        kit = self._read(champion_id)
+        if kit is not None:
+            return kit
+        if self.dragon is None:
+            raise KeyError(f"{champion_id} is not cached for patch {self.patch}")
+
+        raw = self.dragon.fetch_champion(champion_id)
+        if not raw:
+            raise KeyError(f"Could not download {champion_id}")
+        return self.compile(raw)
+
+    def _roster_path(self) -> str:
+        # Leading underscore: can never collide with a champion's file
+        return os.path.join(self.cache_dir, "_roster.json")
+
+    def load_roster(self, champion_ids: Optional[Iterable[str]] = None) -> Dict[str, ChampionKit]:
+        """
+        Kits for many champions (the whole roster by default). Cached kits
+        are read from disk; anything missing comes from a single roster
+        download, never one request per champion.
+        """
+        ids = list(champion_ids) if champion_ids is not None else None
+        if ids is None and os.path.exists(self._roster_path()):
+            with open(self._roster_path(), encoding="utf-8") as f:
+                ids = json.load(f)
+
+        # 1. Disk first
+        roster: Dict[str, ChampionKit] = {}
+        for champion_id in ids or []:
+            kit = self._read(champion_id)
+            if kit is not None:
+                roster[champion_id] = kit
+        if ids is not None and len(roster) == len(ids):
+            return roster
+
+        if self.dragon is None:
+            missing = [c for c in ids or [] if c not in roster]
+            raise KeyError(f"Not cached for patch {self.patch}: {missing or 'roster'}")
+
+        # 2. One bundle for everything else
+        bundle = self.dragon.fetch_all_champions()
+        for champion_id, raw in bundle.items():
+            if (ids is None or champion_id in ids) and champion_id not in roster:
+                roster[champion_id] = self.compile(raw)
+
+        if champion_ids is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_json_atomic(self._roster_path(), sorted(bundle))
+
+        print(f"Loaded {len(roster)} champion kits for patch {self.patch}")
+        return roster
@@ -33,4 +33,11 @@ class CooldownManager:
 
     def trigger_gcd(self, duration: float, current_sim_time: float):
         """Locks the character for 'duration' seconds (Cast Time or Attack Windup)"""
-        self.global_cooldown = max(self.global_cooldown, current_sim_time + duration)
\ No newline at end of file
+        self.global_cooldown = max(self.global_cooldown, current_sim_time + duration)
+
+    def copy(self) -> 'CooldownManager':
+        # CooldownStates are replaced, never mutated, so they can be shared
+        clone = CooldownManager()
+        clone.states = dict(self.states)
+        clone.global_cooldown = self.global_cooldown
+        return clone
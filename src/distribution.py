@@ -0,0 +1,218 @@
+import math
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from engine import Stats
+from ability import Ability, StatSource
+from item import ItemConfig
+from scenario import Scenario
+from events import EventType, CombatEvent, Priority
+from pipeline import EventManager, CombatSystem, DamageEngine
+from simulation import TimeEngine
+from rng import CritStream, FixedStream, build_fingerprint
+
+# ------------------------------------------------------------------
+# 1. THE DISTRIBUTION
+# ------------------------------------------------------------------
+
+class DamageDistribution:
+    """
+    Discrete distribution of total damage dealt in a window. `exact` means
+    convolved at full resolution: False when it was sampled, or when the
+    support had to be merged to stay under max_support.
+    """
+    def __init__(self, pmf: Dict[float, float], exact: bool, samples: int = 0):
+        self.values = sorted(pmf)
+        self.probs = [pmf[v] for v in self.values]
+        self.exact = exact
+        # Monte Carlo runs behind it (0 when exact)
+        self.samples = samples
+
+        self._cdf = []
+        running = 0.0
+        for p in self.probs:
+            running += p
+            self._cdf.append(running)
+
+    @property
+    def mean(self) -> float:
+        return sum(v * p for v, p in zip(self.values, self.probs))
+
+    def percentile(self, q: float) -> float:
+        """Smallest damage value with CDF >= q (q in [0, 1])."""
+        k = bisect_left(self._cdf, q - 1e-12)
+        return self.values[min(k, len(self.values) - 1)]
+
+    def prob_at_least(self, damage: float) -> float:
+        k = bisect_left(self.values, damage)
+        return min(1.0, sum(self.probs[k:]))
+
+# ------------------------------------------------------------------
+# 2. SCHEDULE RECORDING
+# ------------------------------------------------------------------
+
+@dataclass
+class _Hit:
+    timestamp: float
+    ability_name: str
+    damage: float
+    is_auto: bool
+    crit_chance: float
+
+class _HitRecorder:
+    def __init__(self, bus: EventManager):
+        self.hits: List[_Hit] = []
+        bus.subscribe(EventType.POST_MITIGATION_DAMAGE, self._on_damage, Priority.LOWEST)
+
+    def _on_damage(self, event: CombatEvent):
+        if not event.damage_result:
+            return
+        base = event.base_instance
+        self.hits.append(_Hit(
+            event.timestamp,
+            event.ability_name,
+            event.damage_result.post_mitigation_damage,
+            'auto_attack' in base.tags,
+            base.source_stats.crit_chance
+        ))
+
+# ------------------------------------------------------------------
+# 3. THE EVALUATOR
+# ------------------------------------------------------------------
+
+class CritDistributionEvaluator:
+    """
+    Exact damage distribution for a build over a scenario.
+
+    With a fixed attack schedule, every auto either crits (probability
+    crit_chance) or not, independently, and nothing else changes. Total
+    damage is then a sum of weighted Bernoulli terms. We get the schedule
+    from two engine runs (never crit / always crit) and convolve the
+    per-attack outcomes instead of sampling thousands of fights.
+
+    If crits feed back into the fight (a passive reads the target's live
+    state, or the two runs disagree on anything but auto damage), we fall
+    back to seeded Monte Carlo.
+    """
+    def __init__(self, base_champ: Stats, items: List[ItemConfig], abilities: List[Ability],
+                 scenario: Scenario, resolution: float = 1e-6, max_support: int = 50000):
+        self.base_champ = base_champ
+        self.items = items
+        self.abilities = abilities
+        self.scenario = scenario
+        # Damage totals closer than this are merged into one outcome
+        self.resolution = resolution
+        self.max_support = max_support
+
+    def _run(self, rng: CritStream) -> Tuple[TimeEngine, List[_Hit]]:
+        bus = EventManager()
+        CombatSystem(bus, DamageEngine())
+        recorder = _HitRecorder(bus)
+
+        sim = TimeEngine(bus, self.base_champ, self.scenario.target_stats.snapshot(), self.items, rng)
+        sim.max_duration = self.scenario.duration
+        sim.register_passives()
+
+        sim.run(self.abilities)
+        return sim, recorder.hits
+
+    def _has_feedback(self) -> bool:
+        for item in self.items:
+            if any(getattr(p, 'reads_target_state', False) for p in item.passives):
+                return True
+        return any(r.source == StatSource.TARGET
+                   for a in self.abilities for r in a.config.ratios)
+
+    def schedule(self) -> Optional[List[Tuple[float, float, float, float]]]:
+        """
+        (timestamp, damage if no crit, damage if crit, crit chance) per hit,
+        or None when crits change the schedule itself.
+        """
+        if self._has_feedback():
+            return None
+
+        _, normal = self._run(FixedStream(1.0))
+        _, crits = self._run(FixedStream(-1.0))
+
+        if len(normal) != len(crits):
+            return None
+
+        rows = []
+        for n, c in zip(normal, crits):
+            if n.timestamp != c.timestamp or n.ability_name != c.ability_name:
+                return None
+            if n.is_auto:
+                rows.append((n.timestamp, n.damage, c.damage, min(1.0, max(0.0, n.crit_chance))))
+            elif abs(n.damage - c.damage) > 1e-9:
+                # Something other than the auto itself reacted to the crit
+                return None
+            else:
+                rows.append((n.timestamp, n.damage, n.damage, 0.0))
+        return rows
+
+    def _quantize(self, value: float, resolution: float) -> float:
+        return round(value / resolution) * resolution
+
+    def _convolve(self, rows) -> DamageDistribution:
+        # 1. Deterministic part + group identical Bernoulli terms (same delta, same p)
+        base = 0.0
+        groups: Dict[Tuple[float, float], int] = {}
+        for _, d0, d1, p in rows:
+            base += d0
+            if p <= 0.0 or d1 == d0:
+                continue
+            if p >= 1.0:
+                base += d1 - d0
+                continue
+            key = (self._quantize(d1 - d0, self.resolution), p)
+            groups[key] = groups.get(key, 0) + 1
+
+        # 2. Each group is Binomial(n, p) in crit count; convolve the groups
+        resolution = self.resolution
+        merged_any = False
+        pmf = {self._quantize(base, resolution): 1.0}
+        for (delta, p), n in groups.items():
+            binom = [(k * delta, math.comb(n, k) * p ** k * (1.0 - p) ** (n - k)) for k in range(n + 1)]
+            nxt: Dict[float, float] = {}
+            for value, prob in pmf.items():
+                for shift, pk in binom:
+                    key = self._quantize(value + shift, resolution)
+                    nxt[key] = nxt.get(key, 0.0) + prob * pk
+
+            # Keep the support bounded by merging nearby totals
+            while len(nxt) > self.max_support:
+                merged_any = True
+                resolution *= 10.0
+                merged: Dict[float, float] = {}
+                for value, prob in nxt.items():
+                    key = self._quantize(value, resolution)
+                    merged[key] = merged.get(key, 0.0) + prob
+                nxt = merged
+            pmf = nxt
+
+        return DamageDistribution(pmf, exact=not merged_any)
+
+    def _sample(self, samples: int, until: float, seed: int) -> DamageDistribution:
+        pmf: Dict[float, float] = {}
+        fingerprint = build_fingerprint(self.items)
+        for i in range(samples):
+            _, hits = self._run(CritStream(seed + i, fingerprint))
+            total = sum(h.damage for h in hits if h.timestamp <= until)
+            key = self._quantize(total, self.resolution)
+            pmf[key] = pmf.get(key, 0.0) + 1.0 / samples
+        return DamageDistribution(pmf, exact=False, samples=samples)
+
+    def distribution(self, until: Optional[float] = None, samples: int = 2000, seed: int = 0) -> DamageDistribution:
+        """Damage dealt by `until` seconds (defaults to the scenario duration)."""
+        until = self.scenario.duration if until is None else until
+
+        rows = self.schedule()
+        if rows is None:
+            return self._sample(samples, until, seed)
+        return self._convolve([r for r in rows if r[0] <= until])
+
+    def kill_probability(self, until: Optional[float] = None, samples: int = 2000, seed: int = 0) -> float:
+        """P(damage dealt by `until` >= target HP)."""
+        hp = self.scenario.target_stats.current_health
+        return self.distribution(until, samples, seed).prob_at_least(hp)
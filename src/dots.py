@@ -0,0 +1,221 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from engine import Stats, DamageType, DamageInstance, ProcType
+from events import EventType, CombatEvent
+
+# Group key for closed-form DoTs (settled once when they run out, not per tick)
+CLOSED_FORM = None
+
+@dataclass
+class DotConfig:
+    """
+    A burn / poison / bleed. Damage per second per stack is
+    damage_per_second + max_hp_ratio * target max HP (fixed when applied).
+    """
+    name: str
+    duration: float
+    damage_type: DamageType = DamageType.MAGIC
+    damage_per_second: float = 0.0
+    max_hp_ratio: float = 0.0
+    tick_interval: float = 0.5
+    # Re-applying refreshes the duration and adds a stack up to this cap
+    max_stacks: int = 1
+
+@dataclass
+class _Segment:
+    start: float
+    end: float
+    rate: float
+
+@dataclass
+class ActiveDot:
+    config: DotConfig
+    source_stats: Stats # Snapshot of the attacker when applied (penetration)
+    stacks: int = 1
+    # Back-to-back stretches of constant damage per second
+    segments: List[_Segment] = field(default_factory=list)
+
+    @property
+    def end(self) -> float:
+        return self.segments[-1].end
+
+    def damage_between(self, t0: float, t1: float) -> float:
+        """Raw damage dealt in (t0, t1]: the rate integrated over the overlap."""
+        total = 0.0
+        for seg in self.segments:
+            overlap = min(t1, seg.end) - max(t0, seg.start)
+            if overlap > 0:
+                total += seg.rate * overlap
+        return total
+
+class DotManager:
+    """
+    Every DoT on the target, for one simulation.
+
+    DoTs sharing a tick interval share ONE scheduled tick: each tick deals
+    the damage every active DoT of that cadence accrued since the last one,
+    in a single PRE_MITIGATION_HIT (PERIODIC, one instance per DoT). Ten
+    burns ticking every 0.5s cost one event per 0.5s, not ten. The ticks
+    are queued in bulk (schedule_many): applying a DoT queues every tick
+    up to its end at once, and a refresh only adds the extra ones.
+
+    Because damage accrues at a constant rate, the same sums have a closed
+    form. With `closed_form`, no ticks are scheduled at all: each DoT is
+    settled in one hit when it runs out. Either way, whatever is still
+    burning when the fight ends is settled up to the end (settle()), so
+    the raw totals match tick mode (post-mitigation too, unless the
+    target's MR/armor changes mid-DoT). Keep ticks when time-to-kill
+    matters.
+    """
+    def __init__(self, bus, schedule: Callable[[CombatEvent], None], closed_form: bool = False,
+                 schedule_many: Optional[Callable[[List[CombatEvent]], None]] = None):
+        self.bus = bus
+        self.schedule = schedule
+        self.schedule_many = schedule_many
+        self.closed_form = closed_form
+        self.reset()
+
+    def reset(self):
+        # Cadence (tick interval, or CLOSED_FORM) -> DoT name -> DoT
+        self.groups: Dict[Optional[float], Dict[str, ActiveDot]] = {}
+        # Cadence -> time everything in the group was last paid out up to
+        self.settled: Dict[Optional[float], float] = {}
+        # Tick times already in the queue, per cadence
+        self.pending: Dict[Optional[float], set] = {}
+        # Last tick queued per cadence (the chain is extended from there)
+        self.horizon: Dict[Optional[float], float] = {}
+
+    def copy(self, bus, schedule: Callable[[CombatEvent], None],
+             schedule_many: Optional[Callable[[List[CombatEvent]], None]] = None) -> 'DotManager':
+        """Same DoTs for a forked engine (queued ticks travel with its event queue)."""
+        clone = DotManager(bus, schedule, self.closed_form, schedule_many)
+        clone.groups = {
+            cadence: {name: ActiveDot(d.config, d.source_stats, d.stacks,
+                                      [_Segment(s.start, s.end, s.rate) for s in d.segments])
+                      for name, d in dots.items()}
+            for cadence, dots in self.groups.items()
+        }
+        clone.settled = dict(self.settled)
+        clone.pending = {cadence: set(times) for cadence, times in self.pending.items()}
+        clone.horizon = dict(self.horizon)
+        return clone
+
+    # --- Applying ---
+    def apply(self, config: DotConfig, source: Stats, target: Stats, now: float):
+        rate = config.damage_per_second + config.max_hp_ratio * target.total_hp
+        cadence = CLOSED_FORM if self.closed_form else config.tick_interval
+
+        group = self.groups.get(cadence)
+        if not group:
+            group = self.groups[cadence] = {}
+            self.settled[cadence] = now
+
+        dot = group.get(config.name)
+        if dot is None:
+            dot = group[config.name] = ActiveDot(config, source.snapshot())
+        else:
+            # Refresh: the old stretch stops here, a new one starts with the new stack count
+            dot.stacks = min(dot.stacks + 1, config.max_stacks)
+            dot.segments[-1].end = min(dot.segments[-1].end, now)
+        dot.segments.append(_Segment(now, now + config.duration, rate * dot.stacks))
+
+        if cadence is CLOSED_FORM:
+            self._schedule_tick(cadence, dot.end)
+        else:
+            self._extend_ticks(cadence, now, dot.end)
+
+    def _tick_event(self, cadence: Optional[float], when: float) -> CombatEvent:
+        return CombatEvent(
+            event_type=EventType.DOT_TICK,
+            timestamp=when,
+            source=None,
+            target=None,
+            ability_name="DoT",
+            dot_config=cadence
+        )
+
+    def _schedule_tick(self, cadence: Optional[float], when: float):
+        times = self.pending.setdefault(cadence, set())
+        if when in times:
+            return
+        times.add(when)
+        self.schedule(self._tick_event(cadence, when))
+
+    def _extend_ticks(self, cadence: float, now: float, end: float):
+        """
+        Queues the cadence's ticks up to the first one at or after `end`,
+        continuing the chain already queued (or starting one `cadence`
+        after now). Tick k+1 is tick k + cadence, as if each tick had
+        queued the next.
+        """
+        times = self.pending.setdefault(cadence, set())
+        when = self.horizon[cadence] if times else now
+        batch = []
+        while when < end:
+            when = when + cadence
+            times.add(when)
+            batch.append(self._tick_event(cadence, when))
+        if not batch:
+            return
+        self.horizon[cadence] = when
+        if self.schedule_many is not None:
+            self.schedule_many(batch)
+        else:
+            for event in batch:
+                self.schedule(event)
+
+    # --- Ticking ---
+    def on_tick(self, event: CombatEvent):
+        cadence = event.dot_config
+        now = event.timestamp
+        self.pending.get(cadence, set()).discard(now)
+        group = self.groups.get(cadence)
+        if not group:
+            return
+
+        # 1. Everything each DoT accrued since the last payout
+        last = self.settled[cadence]
+        instances = []
+        for name, dot in group.items():
+            raw = dot.damage_between(last, now)
+            if raw > 0:
+                instances.append(DamageInstance(
+                    raw_damage=raw,
+                    damage_type=dot.config.damage_type,
+                    source_stats=dot.source_stats,
+                    proc_type=ProcType.PERIODIC,
+                    tags={'dot', name},
+                    source=name
+                ))
+        self.settled[cadence] = now
+
+        # 2. Drop what ran out (a refreshed DoT keeps ticking)
+        for name in [name for name, dot in group.items() if dot.end <= now]:
+            del group[name]
+
+        # 3. One hit for the whole group
+        if instances:
+            hit = CombatEvent(
+                event_type=EventType.PRE_MITIGATION_HIT,
+                timestamp=now,
+                source=event.source,
+                target=event.target,
+                base_instance=instances[0],
+                ability_name="DoT"
+            )
+            for extra in instances[1:]:
+                hit.add_instance(extra)
+            self.bus.publish(hit)
+
+    def settle(self, now: float, source: Stats, target: Stats):
+        """Pays every cadence what it accrued since its last payout (the fight ends at `now`)."""
+        for cadence in list(self.groups):
+            self.on_tick(CombatEvent(EventType.DOT_TICK, now, source, target,
+                                     ability_name="DoT", dot_config=cadence))
+
+    # --- Analysis ---
+    def damage_between(self, t0: float, t1: float) -> float:
+        """Raw damage every active DoT deals in (t0, t1], in closed form."""
+        return sum(dot.damage_between(t0, t1)
+                   for group in self.groups.values() for dot in group.values())
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field, replace
 from enum import Enum, auto, Flag
-from typing import Any, Set, List
+from typing import Any, Dict, Set, List
 from copy import deepcopy
 
 # ==========================================
@@ -169,62 +169,108 @@ class DamageInstance:
     proc_coefficient: float = 1.0
     tags: Set[str] = field(default_factory=set)
     is_crit: bool = False # Crit
+    # Log label for extra instances (e.g. "Shock"); "" = the hit itself
+    source: str = ""
 
 @dataclass
 class DamageResult:
     damage_type: Any # DamageType
     pre_mitigation_damage: float # The "Raw" number
     post_mitigation_damage: float # The "Final" number after armor
+    # Post-mitigation damage per source label, for the combat log
+    breakdown: Dict[str, float] = field(default_factory=dict)
 
 # ==========================================
 # 4. THE LOGIC ENGINE
 # ==========================================
 
+def effective_resist(resist: float, flat_pen: float, percent_pen: float) -> float:
+    """Armor/MR after penetration. Order: % Pen -> Flat Pen -> Floor at 0."""
+    effective = resist * (1.0 - percent_pen) - flat_pen
+    return effective if effective > 0.0 else 0.0
+
+def resist_multiplier(resist: float, flat_pen: float, percent_pen: float) -> float:
+    """Fraction of damage that gets through: 100 / (100 + effective resist)."""
+    return 100.0 / (100.0 + effective_resist(resist, flat_pen, percent_pen))
+
 class DamageEngine:
     """
-    The Math Core. Purely functional. 
+    The Math Core: the one mitigation kernel every engine uses.
     Input: Instance + Target Stats -> Output: Result
+
+    Multipliers are memoized per (damage type, target resist, attacker pen).
+    The key holds the values themselves, so a new Carve stack or a pen
+    change is simply a new key; nothing needs invalidating.
     """
-    
-    def calculate_damage(self, instance: DamageInstance, target: Stats) -> DamageResult:
-        # 1. True Damage Check (Bypasses everything)
-        if instance.damage_type == DamageType.TRUE:
-            return DamageResult(
-                post_mitigation_damage=instance.raw_damage,
-                mitigated_amount=0.0,
-                breakdown={'raw': instance.raw_damage, 'mitigated': 0}
-            )
-
-        # 2. Select Resistance & Penetration
-        if instance.damage_type == DamageType.PHYSICAL:
-            defense = target.total_armor
-            flat_pen = instance.source_stats.lethality 
-            percent_pen = instance.source_stats.armor_pen_percent
-        else: # MAGIC
-            defense = target.total_mr
-            flat_pen = instance.source_stats.magic_pen_flat
-            percent_pen = instance.source_stats.magic_pen_percent
-
-        # 3. Calculate Effective Resistance
-        # Order: % Pen -> Flat Pen -> Floor at 0
-        effective_defense = defense * (1.0 - percent_pen)
-        effective_defense = effective_defense - flat_pen
-        
-        if effective_defense < 0:
-            effective_defense = 0
+    # Distinct resist/pen states are few per fight; the cap only guards long sweeps
+    MEMO_LIMIT = 4096
 
-        # 4. Mitigation Formula: 100 / (100 + Def)
-        mitigation_multiplier = 100.0 / (100.0 + effective_defense)
-        
-        final_damage = instance.raw_damage * mitigation_multiplier
-
-        return DamageResult(
-            post_mitigation_damage=final_damage,
-            mitigated_amount=instance.raw_damage - final_damage,
-            breakdown={
-                'raw': instance.raw_damage,
-                'defense_raw': defense,
-                'defense_eff': effective_defense,
-                'final': final_damage
-            }
-        )
\ No newline at end of file
+    def __init__(self):
+        self._memo: Dict[tuple, float] = {}
+
+    def multiplier(self, damage_type: DamageType, attacker: Stats, target: Stats) -> float:
+        """Fraction of raw damage that survives mitigation (1.0 for True damage)."""
+        if damage_type is DamageType.PHYSICAL:
+            key = (damage_type, target.total_armor, attacker.lethality, attacker.armor_pen_percent)
+        elif damage_type is DamageType.MAGIC:
+            key = (damage_type, target.total_mr, attacker.magic_pen_flat, attacker.magic_pen_percent)
+        else:
+            return 1.0 # True damage
+
+        mult = self._memo.get(key)
+        if mult is None:
+            if len(self._memo) >= self.MEMO_LIMIT:
+                self._memo.clear()
+            mult = resist_multiplier(key[1], key[2], key[3])
+            self._memo[key] = mult
+        return mult
+
+    def calculate(self, instance: DamageInstance, target: Stats) -> DamageResult:
+        raw = instance.raw_damage
+        final = raw * self.multiplier(instance.damage_type, instance.source_stats, target)
+        return DamageResult(instance.damage_type, raw, final)
+
+    # Name used by the early phase scripts
+    calculate_damage = calculate
+
+    def calculate_hit(self, instances: List[DamageInstance], target: Stats,
+                      label: str = "") -> DamageResult:
+        """
+        Every instance of one hit at once. Instances with the same damage
+        type and penetration share a multiplier, so their raw damage is
+        merged and mitigated in one go (an auto with three on-hit procs is
+        one or two lookups, not four). `label` names unlabelled instances
+        in the breakdown.
+        """
+        # 1. Fuse: (type, pen) -> [attacker stats, raw total, instances]
+        groups: Dict[tuple, list] = {}
+        for inst in instances:
+            src = inst.source_stats
+            if inst.damage_type is DamageType.PHYSICAL:
+                key = (inst.damage_type, src.lethality, src.armor_pen_percent)
+            elif inst.damage_type is DamageType.MAGIC:
+                key = (inst.damage_type, src.magic_pen_flat, src.magic_pen_percent)
+            else:
+                key = (inst.damage_type,)
+
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [src, inst.raw_damage, [inst]]
+            else:
+                group[1] += inst.raw_damage
+                group[2].append(inst)
+
+        # 2. One multiplier per group
+        pre = 0.0
+        post = 0.0
+        breakdown: Dict[str, float] = {}
+        for key, (src, raw, members) in groups.items():
+            mult = self.multiplier(key[0], src, target)
+            pre += raw
+            post += raw * mult
+            for inst in members:
+                name = inst.source or label
+                breakdown[name] = breakdown.get(name, 0.0) + inst.raw_damage * mult
+
+        damage_type = instances[0].damage_type if instances else DamageType.TRUE
+        return DamageResult(damage_type, pre, post, breakdown)
@@ -0,0 +1,171 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from item import ItemConfig
+from scenario import Scenario
+
+@dataclass
+class BuildConstraints:
+    min_items: int = 1
+    max_items: int = 6
+    gold_budget: Optional[int] = None
+    max_boots: int = 1
+    # Riot item ids that every build must contain (Scenario.required_item_ids)
+    required_item_ids: List[str] = field(default_factory=list)
+    # An item must carry at least one of these tags (empty = no filter)
+    include_tags: Set[str] = field(default_factory=set)
+    exclude_tags: Set[str] = field(default_factory=lambda: {"Consumable", "Trinket"})
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario, **overrides) -> 'BuildConstraints':
+        return cls(required_item_ids=list(scenario.required_item_ids or []), **overrides)
+
+    def accepts_item(self, item: ItemConfig) -> bool:
+        tags = set(item.tags)
+        if tags & self.exclude_tags:
+            return False
+        return not self.include_tags or bool(tags & self.include_tags)
+
+    def allows(self, items: List[ItemConfig]) -> bool:
+        """Full check of a finished build (for searches that don't enumerate)."""
+        if not self.min_items <= len(items) <= self.max_items:
+            return False
+        if self.gold_budget is not None and sum(i.cost for i in items) > self.gold_budget:
+            return False
+        if sum(1 for i in items if "Boots" in i.tags) > self.max_boots:
+            return False
+
+        names = [i.name for i in items]
+        if any(i.unique and names.count(i.name) > 1 for i in items):
+            return False
+
+        ids = {i.item_id for i in items}
+        return all(req in ids for req in self.required_item_ids)
+
+class BuildEnumerator:
+    """
+    Lazily yields every build allowed by the constraints.
+
+    Builds are generated as sorted multisets (each item index >= the
+    previous one), so no permutation is produced twice. Every constraint
+    is checked as a slot is filled, never after the fact:
+      - candidates are sorted by cost, so once an item busts the gold
+        budget, every later one does too and the whole slot is cut;
+      - unique items advance the index, components may repeat;
+      - required items are placed first, the rest fill the free slots.
+
+    Sharding: with shard_count > 1, the subtrees below each prefix of
+    `shard_depth` free items are dealt round-robin to the shards. Every
+    shard walks the same (cheap) top of the tree, so the shards are
+    disjoint and together cover everything without coordination.
+
+    Pruning: `prune(build, remaining, slots, min_cost)` is asked before a
+    partial build is emitted or extended. `remaining` are the affordable
+    candidates for its `slots` open slots and `min_cost` the cheapest any
+    of its builds can be. Returning True skips the whole subtree. Since
+    builds are generated lazily, the callback can use results of builds
+    yielded earlier. It is only consulted inside a shard's own subtrees,
+    so shards stay disjoint.
+    """
+    def __init__(self, library: Dict[str, ItemConfig], constraints: Optional[BuildConstraints] = None,
+                 shard_index: int = 0, shard_count: int = 1, shard_depth: int = 2,
+                 prune: Optional[Callable[[List[ItemConfig], List[ItemConfig], int, int], bool]] = None):
+        self.constraints = constraints or BuildConstraints()
+        c = self.constraints
+
+        # 1. Required items (resolved by Riot id)
+        by_id = {item.item_id: item for item in library.values() if item.item_id}
+        missing = [req for req in c.required_item_ids if req not in by_id]
+        if missing:
+            raise ValueError(f"Required items not in library: {missing}")
+        self.required = [by_id[req] for req in c.required_item_ids]
+
+        # 2. Candidate pool for the free slots, cheapest first
+        required_names = {item.name for item in self.required}
+        self.candidates = sorted(
+            (item for item in library.values()
+             if item.cost > 0 and item.name not in required_names and c.accepts_item(item)),
+            key=lambda item: (item.cost, item.name)
+        )
+        self._costs = [item.cost for item in self.candidates]
+
+        self.prune = prune
+        self.pruned = 0
+
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.shard_depth = shard_depth
+
+    def __iter__(self) -> Iterator[List[ItemConfig]]:
+        c = self.constraints
+        base_cost = sum(item.cost for item in self.required)
+        base_boots = sum(1 for item in self.required if "Boots" in item.tags)
+
+        if len(self.required) > c.max_items or base_boots > c.max_boots:
+            return
+        if c.gold_budget is not None and base_cost > c.gold_budget:
+            return
+
+        # Shard bookkeeping: one counter per walk
+        self._unit = 0
+        self.pruned = 0
+        yield from self._walk([], 0, base_cost, base_boots, self.shard_count == 1)
+
+    def _claim(self) -> bool:
+        unit = self._unit
+        self._unit += 1
+        return unit % self.shard_count == self.shard_index
+
+    def _walk(self, chosen: List[ItemConfig], start: int, cost: int, boots: int,
+              owned: bool) -> Iterator[List[ItemConfig]]:
+        c = self.constraints
+        depth = len(chosen)
+
+        # A. Sharding: the subtree under this prefix belongs to one shard
+        if not owned and depth == self.shard_depth:
+            if not self._claim():
+                return
+            owned = True
+
+        size = len(self.required) + depth
+        build = self.required + chosen
+
+        # B. Prune: let the caller cut the subtree before anything in it is emitted
+        if owned and self.prune is not None and size < c.max_items:
+            end = len(self.candidates)
+            if c.gold_budget is not None:
+                end = bisect_right(self._costs, c.gold_budget - cost, start)
+            remaining = self.candidates[start:end]
+            if remaining:
+                needed = max(0, c.min_items - size)
+                min_cost = cost + needed * remaining[0].cost
+                if self.prune(build, remaining, c.max_items - size, min_cost):
+                    self.pruned += 1
+                    return
+
+        # C. Emit (builds shallower than the shard depth are units of their own)
+        if size >= c.min_items and (owned or self._claim()):
+            yield build
+        if size >= c.max_items:
+            return
+
+        # D. Fill the next slot
+        for i in range(start, len(self.candidates)):
+            item = self.candidates[i]
+
+            if c.gold_budget is not None and cost + item.cost > c.gold_budget:
+                break # Sorted by cost: everything after is dearer
+            is_boots = "Boots" in item.tags
+            if is_boots and boots >= c.max_boots:
+                continue
+
+            chosen.append(item)
+            yield from self._walk(chosen, i + 1 if item.unique else i,
+                                  cost + item.cost, boots + is_boots, owned)
+            chosen.pop()
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
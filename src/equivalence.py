@@ -0,0 +1,358 @@
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from engine import Stats, StatType, DamageType, ProcType
+from ability import Ability, AbilityConfig, AbilityLevelData, ScalingRatio
+from item import ItemConfig
+from scenario import Scenario
+from events import EventType, CombatEvent, Priority
+from engine import DamageInstance, DamageResult, resist_multiplier
+from pipeline import EventManager, CombatSystem, DamageEngine
+from simulation import TimeEngine
+from rng import CritStream, build_fingerprint
+from parallel import gil_enabled, run_threaded
+
+# The offline item snapshot (resolved from here, not from the working directory)
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "items_raw.json")
+
+# ------------------------------------------------------------------
+# 1. DATA PACKETS
+# ------------------------------------------------------------------
+
+@dataclass
+class SimCase:
+    """One randomized fight: a build, a champion, a scenario and a seed."""
+    name: str
+    base_champ: Stats
+    scenario: Scenario
+    items: List[ItemConfig]
+    abilities: List[Ability]
+    seed: int = 0
+    fork_at: Optional[float] = None   # run_resumed forks here (default: half the fight)
+
+@dataclass
+class RunMetrics:
+    """What every engine (reference or candidate) must report for a case."""
+    total_damage: float = 0.0
+    hit_count: int = 0
+    source_damage: Dict[str, float] = field(default_factory=dict)
+    final_mana: float = 0.0
+    time_to_kill: Optional[float] = None
+
+@dataclass
+class Tolerances:
+    # Relative tolerances (fraction of the reference value)
+    total_damage: float = 1e-6
+    source_damage: float = 1e-6
+    # Absolute tolerances
+    hit_count: int = 0
+    final_mana: float = 1e-6
+    time_to_kill: float = 1e-6
+
+@dataclass
+class Divergence:
+    case_name: str
+    metric: str
+    reference: float
+    candidate: float
+
+    @property
+    def error(self) -> float:
+        return abs(self.candidate - self.reference)
+
+@dataclass
+class EquivalenceReport:
+    cases_run: int = 0
+    divergences: List[Divergence] = field(default_factory=list)
+    # Worst error seen per metric, even when inside tolerance
+    max_error: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return not self.divergences
+
+    def print_report(self):
+        print(f"\n--- EQUIVALENCE REPORT ({self.cases_run} cases) ---")
+        for metric, err in sorted(self.max_error.items()):
+            print(f"{metric:<20} max error: {err:.6g}")
+
+        if self.passed:
+            print("✅ Candidate matches the reference engine.")
+            return
+
+        print(f"❌ {len(self.divergences)} divergences:")
+        for d in self.divergences:
+            print(f" - {d.case_name:<12} {d.metric:<30} ref={d.reference:<12.4f} cand={d.candidate:.4f}")
+
+# A candidate is anything that turns a case into metrics
+Candidate = Callable[[SimCase], RunMetrics]
+
+# ------------------------------------------------------------------
+# 2. THE REFERENCE ENGINE
+# ------------------------------------------------------------------
+
+class MetricsRecorder:
+    """Listens to the bus and tallies what the engine actually dealt."""
+    def __init__(self, bus: EventManager):
+        self.metrics = RunMetrics()
+        bus.subscribe(EventType.POST_MITIGATION_DAMAGE, self._on_damage, Priority.LOWEST)
+
+    def _on_damage(self, event: CombatEvent):
+        if not event.damage_result:
+            return
+        dmg = event.damage_result.post_mitigation_damage
+        self.metrics.total_damage += dmg
+        self.metrics.hit_count += 1
+        by_source = self.metrics.source_damage
+        by_source[event.ability_name] = by_source.get(event.ability_name, 0.0) + dmg
+
+def _start(case: SimCase, bus: EventManager, damage_engine: DamageEngine):
+    """TimeEngine + CombatSystem + item passives, exactly as the Optimizer wires them."""
+    CombatSystem(bus, damage_engine)
+    recorder = MetricsRecorder(bus)
+
+    rng = CritStream(case.seed, build_fingerprint(case.items))
+    sim = TimeEngine(bus, case.base_champ, case.scenario.target_stats.snapshot(), case.items, rng)
+    sim.max_duration = case.scenario.duration
+    sim.register_passives()
+    return sim, recorder
+
+def _finish(sim: TimeEngine, recorder: MetricsRecorder) -> RunMetrics:
+    recorder.metrics.final_mana = sim.attacker.current_mana
+    recorder.metrics.time_to_kill = sim.time_to_kill
+    return recorder.metrics
+
+def run_reference(case: SimCase) -> RunMetrics:
+    """The production engine: generated dispatch, memoized and fused mitigation."""
+    sim, recorder = _start(case, EventManager(), DamageEngine())
+    sim.run(case.abilities)
+    return _finish(sim, recorder)
+
+# ------------------------------------------------------------------
+# 3. CANDIDATES
+# ------------------------------------------------------------------
+
+class BaselineDamageEngine(DamageEngine):
+    """The textbook kernel: no memo, every instance mitigated on its own."""
+    def multiplier(self, damage_type: DamageType, attacker: Stats, target: Stats) -> float:
+        if damage_type is DamageType.PHYSICAL:
+            return resist_multiplier(target.total_armor, attacker.lethality, attacker.armor_pen_percent)
+        if damage_type is DamageType.MAGIC:
+            return resist_multiplier(target.total_mr, attacker.magic_pen_flat, attacker.magic_pen_percent)
+        return 1.0
+
+    def calculate_hit(self, instances: List[DamageInstance], target: Stats,
+                      label: str = "") -> DamageResult:
+        pre = 0.0
+        post = 0.0
+        breakdown: Dict[str, float] = {}
+        for inst in instances:
+            dealt = inst.raw_damage * self.multiplier(inst.damage_type, inst.source_stats, target)
+            pre += inst.raw_damage
+            post += dealt
+            name = inst.source or label
+            breakdown[name] = breakdown.get(name, 0.0) + dealt
+
+        damage_type = instances[0].damage_type if instances else DamageType.TRUE
+        return DamageResult(damage_type, pre, post, breakdown)
+
+def run_baseline(case: SimCase) -> RunMetrics:
+    """
+    The same fight with every shortcut off: the bus walks its listener
+    list and mitigation is recomputed per instance. Sums are grouped
+    differently, so compare with the default (relative) tolerances.
+    """
+    sim, recorder = _start(case, EventManager(debug=True), BaselineDamageEngine())
+    sim.run(case.abilities)
+    return _finish(sim, recorder)
+
+def run_resumed(case: SimCase) -> RunMetrics:
+    """Runs part of the fight (half unless the case says), checkpoints, and finishes it on a fork."""
+    fork_at = case.fork_at if case.fork_at is not None else case.scenario.duration / 2
+    sim, recorder = _start(case, EventManager(), DamageEngine())
+    sim.run(case.abilities, until=fork_at)
+
+    fork = sim.checkpoint().fork()
+    carried = recorder.metrics
+    recorder = MetricsRecorder(fork.bus)
+    recorder.metrics = RunMetrics(carried.total_damage, carried.hit_count, dict(carried.source_damage))
+
+    fork.run(case.abilities)
+    return _finish(fork, recorder)
+
+# ------------------------------------------------------------------
+# 4. RANDOMIZED CASES
+# ------------------------------------------------------------------
+
+def default_abilities() -> List[Ability]:
+    """Ezreal Q, the same kit the app and the phase scripts use."""
+    q_config = AbilityConfig(
+        name="Mystic Shot",
+        damage_type=DamageType.PHYSICAL,
+        ratios=[ScalingRatio(StatType.AD, 1.30)],
+        level_data=[AbilityLevelData(base_damage=120, mana_cost=30, cooldown=4.5)],
+        proc_type=ProcType.SPELL | ProcType.ON_HIT
+    )
+    return [Ability(q_config, rank=1)]
+
+def generate_cases(library: Dict[str, ItemConfig], count: int, seed: int = 0,
+                   abilities: Optional[List[Ability]] = None) -> List[SimCase]:
+    """
+    Random builds from the real item library against random targets.
+    Every case carries its own crit seed.
+    """
+    rng = random.Random(seed)
+    pool = sorted(name for name, item in library.items() if item.cost > 0)
+    abilities = abilities if abilities is not None else default_abilities()
+
+    cases = []
+    for i in range(count):
+        # A. Build (0-6 distinct items)
+        size = rng.randint(0, min(6, len(pool)))
+        items = [library[name] for name in rng.sample(pool, size)]
+
+        # B. Champion (Ezreal-like growth at a random level)
+        level = rng.randint(1, 18)
+        base_mana = 375.0 + 50.0 * level
+        base_champ = Stats(
+            base_ad=62.0 + 3.0 * level,
+            base_attack_speed=0.625,
+            bonus_attack_speed=0.025 * level,
+            base_mana=base_mana,
+            current_mana=base_mana,
+            base_mana_regen=rng.choice([0.0, 2.0, 8.0])
+        )
+
+        # C. Scenario
+        hp = float(rng.randrange(1000, 4000, 100))
+        target = Stats(
+            base_hp=hp,
+            current_health=hp,
+            base_armor=float(rng.randrange(0, 200, 5)),
+            base_mr=float(rng.randrange(0, 150, 5))
+        )
+        scenario = Scenario(
+            name=f"case-{i}",
+            duration=float(rng.randint(3, 20)),
+            attacker_level=level,
+            target_stats=target
+        )
+
+        cases.append(SimCase(
+            name=f"case-{i}",
+            base_champ=base_champ,
+            scenario=scenario,
+            items=items,
+            abilities=abilities,
+            seed=rng.getrandbits(32)
+        ))
+
+    return cases
+
+def fork_cases(library: Dict[str, ItemConfig],
+               fork_times=(0.033, 0.264, 3.96, 7.656)) -> List[SimCase]:
+    """
+    Trinity Force forked right after a Q cast (and mid-fight): Spellblade
+    is armed by the cast and spent by the next hit, so a fork that drops
+    passive state loses damage. Random builds rarely land there.
+    """
+    base_champ = Stats(base_ad=116.0, base_attack_speed=0.625, bonus_attack_speed=0.45,
+                       base_mana=1275.0, current_mana=1275.0)
+    cases = []
+    for t in fork_times:
+        target = Stats(base_hp=6000.0, current_health=6000.0, base_armor=80.0, base_mr=50.0)
+        cases.append(SimCase(
+            name=f"trinity-fork-{t}",
+            base_champ=base_champ,
+            scenario=Scenario(f"trinity-fork-{t}", 10.0, 18, target),
+            items=[library["Trinity Force"]],
+            abilities=default_abilities(),
+            fork_at=t
+        ))
+    return cases
+
+# ------------------------------------------------------------------
+# 5. THE HARNESS
+# ------------------------------------------------------------------
+
+def _relative(ref: float, cand: float) -> float:
+    return abs(cand - ref) / max(abs(ref), 1.0)
+
+def compare_metrics(case_name: str, ref: RunMetrics, cand: RunMetrics,
+                    tol: Tolerances, report: EquivalenceReport):
+    checks = [
+        ("total_damage", ref.total_damage, cand.total_damage,
+         _relative(ref.total_damage, cand.total_damage), tol.total_damage),
+        ("hit_count", ref.hit_count, cand.hit_count,
+         abs(cand.hit_count - ref.hit_count), tol.hit_count),
+        ("final_mana", ref.final_mana, cand.final_mana,
+         abs(cand.final_mana - ref.final_mana), tol.final_mana),
+    ]
+
+    # A kill on one side only is always a divergence (-1 = survived)
+    ref_ttk = ref.time_to_kill if ref.time_to_kill is not None else -1.0
+    cand_ttk = cand.time_to_kill if cand.time_to_kill is not None else -1.0
+    ttk_err = abs(cand_ttk - ref_ttk) if (ref_ttk < 0) == (cand_ttk < 0) else float("inf")
+    checks.append(("time_to_kill", ref_ttk, cand_ttk, ttk_err, tol.time_to_kill))
+
+    for source in sorted(set(ref.source_damage) | set(cand.source_damage)):
+        r = ref.source_damage.get(source, 0.0)
+        c = cand.source_damage.get(source, 0.0)
+        checks.append((f"source_damage[{source}]", r, c, _relative(r, c), tol.source_damage))
+
+    for metric, r, c, err, limit in checks:
+        key = metric.split("[")[0]
+        report.max_error[key] = max(report.max_error.get(key, 0.0), err)
+        if err > limit:
+            report.divergences.append(Divergence(case_name, metric, r, c))
+
+def check_equivalence(candidate: Candidate, cases: List[SimCase],
+                      tolerances: Optional[Tolerances] = None,
+                      reference: Candidate = run_reference) -> EquivalenceReport:
+    """Runs every case through both engines and records per-metric divergence."""
+    tol = tolerances or Tolerances()
+    report = EquivalenceReport()
+
+    for case in cases:
+        ref = reference(case)
+        cand = candidate(case)
+        compare_metrics(case.name, ref, cand, tol, report)
+        report.cases_run += 1
+
+    return report
+
+def check_thread_safety(cases: List[SimCase], workers: int = 8,
+                        candidate: Candidate = run_reference) -> EquivalenceReport:
+    """
+    Runs every case serially, then all of them at once on a thread pool
+    sharing the same item objects, and demands identical metrics. Any
+    state leaking between simulations shows up as a divergence. Run it on
+    both a GIL and a free-threaded interpreter.
+    """
+    serial = [candidate(case) for case in cases]
+    threaded = run_threaded(candidate, cases, workers)
+
+    report = EquivalenceReport()
+    exact = Tolerances(total_damage=0.0, source_damage=0.0, final_mana=0.0, time_to_kill=0.0)
+    for case, ref, cand in zip(cases, serial, threaded):
+        compare_metrics(case.name, ref, cand, exact, report)
+        report.cases_run += 1
+    return report
+
+if __name__ == "__main__":
+    # Offline self-check: the shortcut-free and the checkpointed engines must match production
+    from loader import ItemLoader
+
+    with open(DATA_PATH, encoding="utf-8") as f:
+        library = ItemLoader.load_all(json.load(f)["data"])
+
+    cases = generate_cases(library, count=25, seed=1) + fork_cases(library)
+    for name, candidate in [("Baseline", run_baseline), ("Checkpoint + fork", run_resumed)]:
+        print(f"\n{name} vs reference:")
+        check_equivalence(candidate, cases).print_report()
+
+    print(f"\nThreaded runs ({'GIL' if gil_enabled() else 'free-threaded'} interpreter):")
+    check_thread_safety(cases).print_report()
@@ -14,6 +14,9 @@ class EventType(Enum):
     POST_MITIGATION_DAMAGE = auto()
     # NEW: Event to trigger a buff application
     BUFF_APPLY = auto()
+    # DoTs (see dots.py): start one, and the shared per-cadence tick
+    DOT_APPLY = auto()
+    DOT_TICK = auto()
 
 class Priority(IntEnum):
     HIGHEST = 0
@@ -35,6 +38,8 @@ class CombatEvent:
     
     # NEW: Payload for Buffs
     buff_config: Any = None 
+    # DOT_APPLY: the DotConfig. DOT_TICK: the tick interval it belongs to
+    dot_config: Any = None
     
     ability_name: str = "Unknown"
     
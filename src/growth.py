@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import List
+
+from engine import Stats
+
+MAX_LEVEL = 18
+
+def stat_at_level(base: float, per_level: float, level: int) -> float:
+    """Riot's growth curve: later levels grow slightly more than early ones."""
+    n = level - 1
+    return base + per_level * n * (0.7025 + 0.0175 * n)
+
+@dataclass
+class ChampionGrowth:
+    """Base stats at level 1 and growth per level (DataDragon units, regen per second)."""
+    name: str
+    hp: float
+    hp_per_level: float
+    mana: float
+    mana_per_level: float
+    mana_regen: float
+    mana_regen_per_level: float
+    ad: float
+    ad_per_level: float
+    armor: float
+    armor_per_level: float
+    mr: float
+    mr_per_level: float
+    attack_speed: float
+    # Growth is bonus attack speed: 0.025 = +2.5% per level
+    attack_speed_per_level: float
+
+class GrowthTable:
+    """
+    Base stats for every level, computed once.
+
+    stats(level) hands out a copy of the precomputed row, so level sweeps
+    and UI sliders never redo the growth math.
+    """
+    def __init__(self, growth: ChampionGrowth):
+        self.growth = growth
+        self._rows: List[Stats] = [self._compute(level) for level in range(1, MAX_LEVEL + 1)]
+
+    def _compute(self, level: int) -> Stats:
+        g = self.growth
+        hp = stat_at_level(g.hp, g.hp_per_level, level)
+        mana = stat_at_level(g.mana, g.mana_per_level, level)
+        return Stats(
+            base_hp=hp,
+            current_health=hp,
+            base_mana=mana,
+            current_mana=mana,
+            base_mana_regen=stat_at_level(g.mana_regen, g.mana_regen_per_level, level),
+            base_ad=stat_at_level(g.ad, g.ad_per_level, level),
+            base_armor=stat_at_level(g.armor, g.armor_per_level, level),
+            base_mr=stat_at_level(g.mr, g.mr_per_level, level),
+            base_attack_speed=g.attack_speed,
+            bonus_attack_speed=stat_at_level(0.0, g.attack_speed_per_level, level),
+        )
+
+    def stats(self, level: int) -> Stats:
+        if not 1 <= level <= MAX_LEVEL:
+            raise ValueError(f"Level must be 1-{MAX_LEVEL}, got {level}")
+        return self._rows[level - 1].snapshot()
+
+    @property
+    def levels(self) -> range:
+        return range(1, MAX_LEVEL + 1)
+
+# Ezreal (DataDragon values, mana regen converted from per 5s to per second)
+EZREAL = ChampionGrowth(
+    name="Ezreal",
+    hp=600.0, hp_per_level=102.0,
+    mana=375.0, mana_per_level=70.0,
+    mana_regen=1.7, mana_regen_per_level=0.13,
+    ad=62.0, ad_per_level=2.5,
+    armor=24.0, armor_per_level=4.7,
+    mr=30.0, mr_per_level=1.3,
+    attack_speed=0.625, attack_speed_per_level=0.025,
+)
@@ -0,0 +1,253 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from engine import Stats
+from ability import Ability, StatSource
+from item import ItemConfig
+from events import EventType, CombatEvent, Priority
+from pipeline import EventManager, CombatSystem, DamageEngine
+from simulation import TimeEngine
+from rng import CritStream, build_fingerprint
+from hit_trace import TraceReplayer
+
+# Target used to record a schedule: it never dies, so every hit lands
+_UNKILLABLE_HP = 1e12
+
+# ------------------------------------------------------------------
+# 1. GRID & RESULT
+# ------------------------------------------------------------------
+
+def linspace(lo: float, hi: float, points: int) -> List[float]:
+    if points <= 1:
+        return [float(lo)]
+    step = (hi - lo) / (points - 1)
+    return [lo + step * i for i in range(points)]
+
+@dataclass
+class TargetGrid:
+    hp_values: List[float]
+    armor_values: List[float]
+    mr_values: List[float] = field(default_factory=lambda: [0.0])
+
+    @property
+    def size(self) -> int:
+        return len(self.hp_values) * len(self.armor_values) * len(self.mr_values)
+
+@dataclass
+class HeatmapResult:
+    metric: str            # "ttk" or "damage"
+    duration: float
+    grid: TargetGrid
+    # values[mr_index][armor_index][hp_index]; TTK is None if the target survives
+    values: List[List[List[Optional[float]]]]
+    # How the grid was filled: "vectorized", "replay" or "per_point"
+    mode: str
+    simulations: int
+
+    def slice(self, mr_index: int = 0) -> List[List[Optional[float]]]:
+        """Armor (rows) x HP (columns) at one MR value."""
+        return self.values[mr_index]
+
+# ------------------------------------------------------------------
+# 2. HIT SCHEDULE (Pre-Mitigation)
+# ------------------------------------------------------------------
+
+class _ScheduleRecorder:
+    """
+    Captures every instance right before mitigation (after all passives).
+    Instances are grouped by (damage type, penetration) so one multiplier per
+    group covers every hit in it.
+    """
+    def __init__(self, bus: EventManager):
+        self.times: List[float] = []
+        self.group_keys: List[Tuple] = []
+        self.group_pen: List[Stats] = []
+        # raw[k] = {group_index: raw damage} for hit k
+        self.raw: List[Dict[int, float]] = []
+        bus.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.LOW)
+
+    def _group(self, instance) -> int:
+        src = instance.source_stats
+        key = (instance.damage_type, src.lethality, src.armor_pen_percent,
+               src.magic_pen_flat, src.magic_pen_percent)
+        if key not in self.group_keys:
+            self.group_keys.append(key)
+            self.group_pen.append(src)
+        return self.group_keys.index(key)
+
+    def _on_hit(self, event: CombatEvent):
+        per_group: Dict[int, float] = {}
+        for instance in event.all_instances:
+            g = self._group(instance)
+            per_group[g] = per_group.get(g, 0.0) + instance.raw_damage
+        self.times.append(event.timestamp)
+        self.raw.append(per_group)
+
+class _TimelineRecorder:
+    """Post-mitigation damage over time, for the stateful fallbacks."""
+    def __init__(self, bus: EventManager):
+        self.times: List[float] = []
+        self.cumulative: List[float] = []
+        bus.subscribe(EventType.POST_MITIGATION_DAMAGE, self._on_damage, Priority.LOWEST)
+
+    def _on_damage(self, event: CombatEvent):
+        if not event.damage_result:
+            return
+        total = self.cumulative[-1] if self.cumulative else 0.0
+        self.times.append(event.timestamp)
+        self.cumulative.append(total + event.damage_result.post_mitigation_damage)
+
+# ------------------------------------------------------------------
+# 3. THE BUILDER
+# ------------------------------------------------------------------
+
+class HeatmapBuilder:
+    """
+    TTK / damage over a grid of target HP x Armor x MR for ONE build.
+
+    The attacker side (stats, casts, autos, on-hits) does not care about the
+    target unless a passive reads or changes target state. In that case we
+    simulate once, record the pre-mitigation hits, and apply mitigation for
+    the whole grid. Builds that shred the target replay one recorded trace
+    per resist pair; only builds that read target state fall back to
+    stateful simulation.
+    """
+    def __init__(self, base_champ: Stats, items: List[ItemConfig], abilities: List[Ability], seed: int = 0):
+        self.base_champ = base_champ
+        self.items = items
+        self.abilities = abilities
+        self.seed = seed
+        self.damage_engine = DamageEngine()
+
+    # --- Target dependency checks ---
+    def _passives(self):
+        for item in self.items:
+            for p in item.passives:
+                yield p
+
+    @property
+    def reads_target_state(self) -> bool:
+        if any(getattr(p, 'reads_target_state', False) for p in self._passives()):
+            return True
+        # Abilities scaling off target stats (e.g. % max HP) also count
+        return any(r.source == StatSource.TARGET
+                   for a in self.abilities for r in a.config.ratios)
+
+    @property
+    def modifies_target_state(self) -> bool:
+        return any(getattr(p, 'modifies_target_state', False) for p in self._passives())
+
+    # --- Simulation ---
+    def _simulate(self, target: Stats, duration: float, stop_on_kill: bool, recorder_cls,
+                  trace: bool = False):
+        bus = EventManager()
+        CombatSystem(bus, self.damage_engine)
+        recorder = recorder_cls(bus)
+
+        # Same seed for every grid point, so every point sees the same crits
+        rng = CritStream(self.seed, build_fingerprint(self.items))
+        sim = TimeEngine(bus, self.base_champ, target, self.items, rng)
+        sim.max_duration = duration
+        sim.stop_on_kill = stop_on_kill
+        sim.register_passives()
+
+        if trace:
+            sim.enable_trace()
+        sim.run(self.abilities)
+        return sim, recorder
+
+    def _target(self, hp: float, armor: float, mr: float) -> Stats:
+        return Stats(base_hp=hp, current_health=hp, base_armor=armor, base_mr=mr)
+
+    @staticmethod
+    def _read(times: List[float], cumulative: List[float], metric: str, hp_values: List[float]):
+        if metric == "damage":
+            total = cumulative[-1] if cumulative else 0.0
+            return [total for _ in hp_values]
+
+        row = []
+        for hp in hp_values:
+            k = bisect_left(cumulative, hp)
+            row.append(times[k] if k < len(times) else None)
+        return row
+
+    def build(self, grid: TargetGrid, metric: str = "ttk", duration: float = 10.0) -> HeatmapResult:
+        if metric not in ("ttk", "damage"):
+            raise ValueError(f"Unknown heatmap metric: {metric}")
+
+        if self.reads_target_state:
+            return self._build_per_point(grid, metric, duration)
+        if self.modifies_target_state:
+            return self._build_replay(grid, metric, duration)
+        return self._build_vectorized(grid, metric, duration)
+
+    def _build_vectorized(self, grid: TargetGrid, metric: str, duration: float) -> HeatmapResult:
+        # 1. One simulation: the attacker's hits never depend on this target
+        dummy = self._target(_UNKILLABLE_HP, 0.0, 0.0)
+        _, rec = self._simulate(dummy, duration, False, _ScheduleRecorder)
+
+        # 2. Cumulative raw damage per group, hit by hit
+        groups = range(len(rec.group_keys))
+        cum_raw = [[0.0] * len(rec.times) for _ in groups]
+        for g in groups:
+            running = 0.0
+            column = cum_raw[g]
+            for k, per_group in enumerate(rec.raw):
+                running += per_group.get(g, 0.0)
+                column[k] = running
+
+        # 3. Mitigation once per (armor, MR, group), applied to the whole timeline
+        values = []
+        for mr in grid.mr_values:
+            plane = []
+            for armor in grid.armor_values:
+                target = self._target(0.0, armor, mr)
+                mults = [self.damage_engine.multiplier(key[0], rec.group_pen[g], target)
+                         for g, key in enumerate(rec.group_keys)]
+
+                cumulative = [0.0] * len(rec.times)
+                for g in groups:
+                    m = mults[g]
+                    column = cum_raw[g]
+                    cumulative = [c + r * m for c, r in zip(cumulative, column)]
+
+                plane.append(self._read(rec.times, cumulative, metric, grid.hp_values))
+            values.append(plane)
+
+        return HeatmapResult(metric, duration, grid, values, "vectorized", 1)
+
+    def _build_replay(self, grid: TargetGrid, metric: str, duration: float) -> HeatmapResult:
+        # 1. One simulation records every hit; shred changes mitigation over
+        # time but never which hits happen, and never depends on HP
+        dummy = self._target(_UNKILLABLE_HP, 0.0, 0.0)
+        sim, _ = self._simulate(dummy, duration, False, _TimelineRecorder, trace=True)
+        replayer = TraceReplayer(sim.trace, self.items, self.damage_engine)
+
+        # 2. Re-run only mitigation + shred per (armor, MR)
+        values = []
+        for mr in grid.mr_values:
+            plane = []
+            for armor in grid.armor_values:
+                res = replayer.replay(self._target(_UNKILLABLE_HP, armor, mr))
+                plane.append(self._read(res.times, res.cumulative, metric, grid.hp_values))
+            values.append(plane)
+
+        return HeatmapResult(metric, duration, grid, values, "replay", 1)
+
+    def _build_per_point(self, grid: TargetGrid, metric: str, duration: float) -> HeatmapResult:
+        values = []
+        sims = 0
+        for mr in grid.mr_values:
+            plane = []
+            for armor in grid.armor_values:
+                row = []
+                for hp in grid.hp_values:
+                    target = self._target(hp, armor, mr)
+                    sim, _ = self._simulate(target, duration, metric == "ttk", _TimelineRecorder)
+                    sims += 1
+                    row.append(sim.time_to_kill if metric == "ttk" else sim.total_damage_done)
+                plane.append(row)
+            values.append(plane)
+
+        return HeatmapResult(metric, duration, grid, values, "per_point", sims)
@@ -0,0 +1,248 @@
+import struct
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from engine import Stats, DamageType, DamageInstance, ProcType
+from ability import StatSource
+from item import ItemConfig
+from events import EventType, CombatEvent, Priority
+from pipeline import EventManager, CombatSystem, DamageEngine
+from buffs import BuffManager
+from stat_pipeline import StatPipeline
+
+class TraceInvalidError(Exception):
+    """The trace's decisions depend on the target, so it cannot be replayed against another one."""
+
+# Damage types as one byte
+_TYPE_CODES = {DamageType.PHYSICAL: 0, DamageType.MAGIC: 1, DamageType.TRUE: 2}
+_CODE_TYPES = {code: dt for dt, code in _TYPE_CODES.items()}
+
+# Binary header: magic, version, duration, flags, hits, instances, pen entries
+_HEADER = struct.Struct("<4sHdBIII")
+_MAGIC = b"HTRC"
+_VERSION = 1
+
+# ------------------------------------------------------------------
+# 1. THE TRACE
+# ------------------------------------------------------------------
+
+class HitTrace:
+    """
+    Every pre-mitigation hit of one fight, as flat typed arrays.
+
+    Recorded after all on-hit passives ran, so each hit is final raw damage
+    per instance plus the penetration it carries. What is NOT in here is
+    anything the target decides: mitigation, shred, deaths. Those are
+    re-run on replay.
+
+    Layout (hit k owns instances [hit_start[k], hit_start[k + 1]), base instance first):
+      hit_frame / hit_time   engine frame it was processed in / event time
+      inst_type / inst_raw   per instance damage type and raw damage
+      inst_pen               index into `pen` (lethality, % armor pen, flat / % magic pen)
+    """
+    def __init__(self, duration: float = 0.0):
+        self.duration = duration
+        self.hit_frame = array('d')
+        self.hit_time = array('d')
+        self.hit_start = array('I')
+        self.inst_type = array('B')
+        self.inst_raw = array('d')
+        self.inst_pen = array('H')
+        self.pen: List[Tuple[float, float, float, float]] = []
+        self._pen_index: Dict[Tuple[float, float, float, float], int] = {}
+
+        # Set while recording: the fight was cut short by a kill
+        self.truncated = False
+        # Why this trace cannot be replayed (None = it can)
+        self.invalid_reason: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.hit_time)
+
+    def _pen_id(self, src: Stats) -> int:
+        key = (src.lethality, src.armor_pen_percent, src.magic_pen_flat, src.magic_pen_percent)
+        idx = self._pen_index.get(key)
+        if idx is None:
+            idx = self._pen_index[key] = len(self.pen)
+            self.pen.append(key)
+        return idx
+
+    def add_hit(self, frame: float, event: CombatEvent):
+        self.hit_frame.append(frame)
+        self.hit_time.append(event.timestamp)
+        self.hit_start.append(len(self.inst_raw))
+        for instance in event.all_instances:
+            self.inst_type.append(_TYPE_CODES[instance.damage_type])
+            self.inst_raw.append(instance.raw_damage)
+            self.inst_pen.append(self._pen_id(instance.source_stats))
+
+    # --- Binary form ---
+    def to_bytes(self) -> bytes:
+        flags = int(self.truncated) | (int(self.invalid_reason is not None) << 1)
+        reason = (self.invalid_reason or "").encode("utf-8")
+        pen = array('d', [v for entry in self.pen for v in entry])
+        parts = [
+            _HEADER.pack(_MAGIC, _VERSION, self.duration, flags,
+                         len(self), len(self.inst_raw), len(self.pen)),
+            struct.pack("<H", len(reason)), reason,
+        ]
+        for arr in (self.hit_frame, self.hit_time, self.hit_start,
+                    self.inst_type, self.inst_raw, self.inst_pen, pen):
+            parts.append(arr.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HitTrace':
+        magic, version, duration, flags, hits, insts, pens = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a hit trace (or an unsupported version)")
+        offset = _HEADER.size
+        (reason_len,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        reason = data[offset:offset + reason_len].decode("utf-8")
+        offset += reason_len
+
+        trace = cls(duration)
+        trace.truncated = bool(flags & 1)
+        trace.invalid_reason = reason if flags & 2 else None
+
+        def take(arr: array, count: int) -> array:
+            nonlocal offset
+            size = arr.itemsize * count
+            arr.frombytes(data[offset:offset + size])
+            offset += size
+            return arr
+
+        take(trace.hit_frame, hits)
+        take(trace.hit_time, hits)
+        take(trace.hit_start, hits)
+        take(trace.inst_type, insts)
+        take(trace.inst_raw, insts)
+        take(trace.inst_pen, insts)
+        pen = take(array('d'), pens * 4)
+        trace.pen = [tuple(pen[i:i + 4]) for i in range(0, len(pen), 4)]
+        trace._pen_index = {entry: i for i, entry in enumerate(trace.pen)}
+        return trace
+
+def target_dependency(items: List[ItemConfig], abilities) -> Optional[str]:
+    """Why a build's hits depend on the target (None = they don't)."""
+    for item in items:
+        for p in item.passives:
+            if getattr(p, 'reads_target_state', False):
+                return f"{item.name}: {p.__class__.__name__} reads the target's live state"
+    for ability in abilities:
+        if any(r.source == StatSource.TARGET for r in ability.config.ratios):
+            return f"{ability.config.name} scales with target stats"
+    return None
+
+# ------------------------------------------------------------------
+# 2. REPLAY
+# ------------------------------------------------------------------
+
+@dataclass
+class ReplayResult:
+    total_damage: float
+    time_to_kill: Optional[float]
+    hits: int
+    # Post-mitigation damage over time (one entry per hit)
+    times: List[float] = field(default_factory=list)
+    cumulative: List[float] = field(default_factory=list)
+
+class TraceReplayer:
+    """
+    Re-runs only the target side of a recorded fight: mitigation
+    (CombatSystem / DamageEngine) and passives that change the target
+    (Carve stacking), with the same per-frame target refresh as TimeEngine.
+
+    The attacker's decisions (casts gated by mana and cooldowns, attack
+    timing, crit rolls) are taken from the trace as-is, so a trace whose
+    decisions could differ for another target is rejected up front.
+    """
+    def __init__(self, trace: HitTrace, items: List[ItemConfig], damage_engine: Optional[DamageEngine] = None):
+        if trace.invalid_reason is not None:
+            raise TraceInvalidError(trace.invalid_reason)
+        if trace.truncated:
+            raise TraceInvalidError("Recorded fight stopped at a kill; later hits are missing")
+
+        reason = target_dependency(items, [])
+        if reason is not None:
+            raise TraceInvalidError(reason)
+
+        self.trace = trace
+        self.damage_engine = damage_engine or DamageEngine()
+        # Only passives that act on the target are re-run (the rest are baked in)
+        self.target_passives = [p for item in items for p in item.passives
+                                if getattr(p, 'modifies_target_state', False)]
+        self._pen_stats = [Stats(lethality=l, armor_pen_percent=a, magic_pen_flat=mf, magic_pen_percent=mp)
+                           for l, a, mf, mp in trace.pen]
+
+    def replay(self, target: Stats, until: Optional[float] = None,
+               stop_on_kill: bool = False) -> ReplayResult:
+        """Same totals a full simulation against `target` would produce."""
+        trace = self.trace
+        until = trace.duration if until is None else min(until, trace.duration)
+        base_target = target.snapshot()
+
+        # 1. Fresh target side: mitigation + target-changing passives
+        state = {"target": base_target, "total": 0.0, "ttk": None}
+        times: List[float] = []
+        cumulative: List[float] = []
+        debuffs = BuffManager()
+        bus = EventManager()
+        CombatSystem(bus, self.damage_engine)
+
+        def on_damage(event: CombatEvent):
+            dmg = event.damage_result.post_mitigation_damage
+            state["total"] += dmg
+            times.append(event.timestamp)
+            cumulative.append(state["total"])
+            state["target"].current_health -= dmg
+            if state["ttk"] is None and state["target"].current_health <= 0:
+                state["ttk"] = event.timestamp
+
+        def on_buff(event: CombatEvent):
+            if event.buff_config and (event.target == state["target"] or event.target == base_target):
+                debuffs.apply_buff(event.buff_config, event.timestamp)
+
+        bus.subscribe(EventType.POST_MITIGATION_DAMAGE, on_damage, Priority.NORMAL)
+        bus.subscribe(EventType.BUFF_APPLY, on_buff, Priority.HIGHEST)
+
+        # Each registration gets its own per-fight state
+        for passive in self.target_passives:
+            passive.register(bus)
+
+        # 2. Walk the hits frame by frame
+        frame = None
+        hits = 0
+        n = len(trace)
+        for k in range(n):
+            if trace.hit_frame[k] >= until:
+                break
+
+            if trace.hit_frame[k] != frame:
+                # TimeEngine refreshes the target once per frame, before the frame's hits
+                frame = trace.hit_frame[k]
+                debuffs.tick(frame)
+                hp = state["target"].current_health
+                state["target"] = StatPipeline.resolve_target(base_target, debuffs)
+                state["target"].current_health = hp
+
+            start = trace.hit_start[k]
+            end = trace.hit_start[k + 1] if k + 1 < n else len(trace.inst_raw)
+            instances = [
+                DamageInstance(trace.inst_raw[i], _CODE_TYPES[trace.inst_type[i]],
+                               self._pen_stats[trace.inst_pen[i]], ProcType.NONE)
+                for i in range(start, end)
+            ]
+            event = CombatEvent(EventType.PRE_MITIGATION_HIT, trace.hit_time[k],
+                                instances[0].source_stats, state["target"], instances[0])
+            for extra in instances[1:]:
+                event.add_instance(extra)
+            bus.publish(event)
+            hits += 1
+
+            if stop_on_kill and state["ttk"] is not None:
+                break
+
+        return ReplayResult(state["total"], state["ttk"], hits, times, cumulative)
@@ -4,12 +4,22 @@ from passives import OnHitDamagePassive, SpellbladePassive
 from engine import DamageType
 
 class InventoryManager:
-    def __init__(self, event_manager: EventManager):
+    def __init__(self, event_manager: EventManager, engine=None):
         self.bus = event_manager
-        
-    def equip_item(self, item_config: ItemConfig):
+        # The TimeEngine fighting on this bus, if any: it keeps every runtime
+        # so reset() and checkpoint() reach the passives' state
+        self.engine = engine
+
+    def equip_item(self, item_config: ItemConfig) -> list:
         # 1. Register Passives directly attached to the item
+        # (the item is untouched: each passive hands back this bus's runtime)
+        runtimes = []
         for passive in item_config.passives:
             # Check if it has a register method (Duck Typing)
             if hasattr(passive, 'register'):
-                passive.register(self.bus)
\ No newline at end of file
+                runtimes.append(passive.register(self.bus))
+
+        # 2. Hand them to the engine
+        if self.engine is not None:
+            self.engine.passive_runtimes.extend((item_config.name, rt) for rt in runtimes)
+        return runtimes
\ No newline at end of file
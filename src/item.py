@@ -26,4 +26,9 @@ class ItemConfig:
     
     cost: int = 0
     passives: List[Any] = field(default_factory=list) 
-    passive_names: List[str] = field(default_factory=list)
\ No newline at end of file
+    passive_names: List[str] = field(default_factory=list)
+
+    # Shop metadata (Riot id + tags like "Boots"); used by build enumeration
+    item_id: str = ""
+    tags: List[str] = field(default_factory=list)
+    unique: bool = True
\ No newline at end of file
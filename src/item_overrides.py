@@ -23,7 +23,7 @@ ITEM_OVERRIDES = {
     "Blade of the Ruined King": {
         "passives": [
             # The "Mist's Edge" Passive (Simplified to flat dmg for now, usually % HP)
-            OnHitDamagePassive(amount=40.0, damage_type=DamageType.PHYSICAL)
+            OnHitDamagePassive(amount=40.0, damage_type=DamageType.PHYSICAL, label="Mist's Edge")
         ]
     },
     "Kraken Slayer": {
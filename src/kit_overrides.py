@@ -0,0 +1,34 @@
+from engine import StatType, DamageType, ProcType
+
+# DataDragon has cooldowns, costs and ranks for every spell, but no reliable
+# damage ratios. Anything listed here wins over the parsed data.
+# Keys: champion id -> spell slot -> fields (lists are per rank).
+KIT_OVERRIDES = {
+    "Ezreal": {
+        "Q": {
+            "damage_type": DamageType.PHYSICAL,
+            "base_damage": [20, 45, 70, 95, 120],
+            "ratios": [(StatType.AD, 1.30), (StatType.AP, 0.15)],
+            "proc_type": ProcType.SPELL | ProcType.ON_HIT,
+        },
+        "W": {
+            "damage_type": DamageType.MAGIC,
+            "base_damage": [80, 135, 190, 245, 300],
+            "ratios": [(StatType.BONUS_AD, 0.60), (StatType.AP, 0.70)],
+        },
+        # Arcane Shift is mostly a blink: not part of the damage rotation
+        "E": None,
+        "R": {
+            "damage_type": DamageType.MAGIC,
+            "base_damage": [350, 550, 750],
+            "ratios": [(StatType.BONUS_AD, 1.00), (StatType.AP, 0.90)],
+        },
+    },
+    "Jinx": {
+        "W": {
+            "damage_type": DamageType.PHYSICAL,
+            "base_damage": [10, 60, 110, 160, 210],
+            "ratios": [(StatType.AD, 1.60)],
+        },
+    },
+}
@@ -0,0 +1,44 @@
+import heapq
+from typing import Callable, Dict, List, Sequence
+
+# Metric name -> how to read it from a SimulationResult (higher is better)
+METRICS: Dict[str, Callable] = {
+    "dps": lambda r: r.dps,
+    "total_damage": lambda r: r.total_damage,
+    "gold_efficiency": lambda r: r.total_damage / max(1, r.cost),
+}
+
+class Leaderboard:
+    """
+    Bounded top-K per metric.
+
+    Each metric keeps a min-heap of at most K entries, so memory stays
+    constant no matter how many results stream through.
+    """
+    def __init__(self, k: int = 10, metrics: Sequence[str] = ("dps", "total_damage", "gold_efficiency")):
+        self.k = k
+        self.metrics = list(metrics)
+        self.seen = 0
+        # (value, sequence, result); sequence breaks ties without comparing results
+        self._heaps: Dict[str, List] = {m: [] for m in self.metrics}
+
+    def push(self, result):
+        self.seen += 1
+        for metric in self.metrics:
+            entry = (METRICS[metric](result), -self.seen, result)
+            heap = self._heaps[metric]
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    def top(self, metric: str = "dps") -> List:
+        """Current leaders for one metric, best first (earliest wins ties)."""
+        return [r for _, _, r in sorted(self._heaps[metric], reverse=True)]
+
+    def print_table(self, metric: str = "dps"):
+        print(f"\n--- TOP {self.k} BY {metric.upper()} ({self.seen} builds) ---")
+        print(f"{'RANK':<6} {'BUILD':<25} {'DPS':<10} {'TOTAL':<10} {'COST':<8}")
+        print("-" * 65)
+        for i, res in enumerate(self.top(metric)):
+            print(f"{i+1:<6} {res.build_name:<25} {res.dps:<10.1f} {res.total_damage:<10.0f} {res.cost:<8}")
@@ -2,7 +2,7 @@ import json
 from typing import Dict, Any
 from item import ItemConfig, StatModifier, StatModType
 from engine import StatType
-from passives import SpellbladePassive, CarvePassive, AwePassive, ShockPassive, RuinedKingPassive # <--- Import your new passive!
+from passives import SpellbladePassive, CarvePassive, AwePassive, ShockPassive, RuinedKingPassive, TormentPassive # <--- Import your new passive!
 
 class ItemLoader:
     @staticmethod
@@ -19,6 +19,12 @@ class ItemLoader:
             
             # Create Config
             config = ItemConfig(name=name, cost=gold)
+
+            # Shop metadata: components that still build into something can be
+            # bought twice (2x Long Sword); finished items and boots cannot
+            config.item_id = item_id
+            config.tags = list(data.get("tags", []))
+            config.unique = not data.get("into") or "Boots" in config.tags
             
             # --- PARSE STATS ---
             # Riot uses specific keys, we map them to our ItemConfig fields
@@ -126,4 +132,10 @@ class ItemLoader:
             ldr.armor_pen_percent = 0.45
             print("✅ Loaded LDR with 45% Armor Pen")
 
+        # 8. LIANDRY'S TORMENT (Burn)
+        if "Liandry's Torment" in library:
+            lt = library["Liandry's Torment"]
+            lt.passives.append(TormentPassive(0.01))
+            print("✅ Loaded Liandry's Torment with Torment burn")
+
         return library
\ No newline at end of file
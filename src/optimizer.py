@@ -1,4 +1,5 @@
-from typing import List, Tuple
+from dataclasses import astuple, dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional
 from engine import Stats, DamageResult
 from item import ItemConfig
 from scenario import Scenario
@@ -6,13 +7,83 @@ from simulation import TimeEngine
 from pipeline import EventManager, CombatSystem, DamageEngine
 from ability import Ability
 from stat_pipeline import StatPipeline
+from rng import CritStream, FixedStream, build_fingerprint
+from sampling import RunningStats
+from build_key import BuildKey, TranspositionTable, canonical_key
+from leaderboard import Leaderboard
+from enumerator import BuildConstraints, BuildEnumerator
+from pareto import ParetoFrontier, optimistic_item
+from growth import GrowthTable
+from parallel import run_threaded
 
 class SimulationResult:
-    def __init__(self, build_name: str, total_damage: float, dps: float, cost: int):
+    def __init__(self, build_name: str, total_damage: float, dps: float, cost: int,
+                 time_to_kill: Optional[float] = None):
         self.build_name = build_name
         self.total_damage = total_damage
         self.dps = dps
         self.cost = cost
+        # None = target survived the whole scenario
+        self.time_to_kill = time_to_kill
+
+@dataclass
+class PairedComparison:
+    """Mean DPS difference (A - B) over runs that shared every crit draw."""
+    build_a: str
+    build_b: str
+    mean_diff: float
+    ci_low: float
+    ci_high: float
+    confidence: float
+    samples: int
+    # True once the interval no longer straddles zero (or both builds are deterministic)
+    settled: bool
+
+    @property
+    def winner(self) -> Optional[str]:
+        if self.ci_low > 0:
+            return self.build_a
+        if self.ci_high < 0:
+            return self.build_b
+        return None
+
+@dataclass
+class RaceEntry:
+    build_name: str
+    items: List[ItemConfig]
+    cost: int
+    dps: RunningStats = field(default_factory=RunningStats)
+    # Round in which the build was dropped (None = still in the race)
+    eliminated_round: Optional[int] = None
+
+    @property
+    def sims(self) -> int:
+        return self.dps.n
+
+@dataclass
+class Branch:
+    """One what-if continuation: anything left as None is kept from the opening."""
+    name: str
+    items: Optional[List[ItemConfig]] = None
+    abilities: Optional[List[Ability]] = None
+    rng: Optional[CritStream] = None
+
+@dataclass
+class PowerCurve:
+    """One build simulated at every level (results[i] belongs to levels[i])."""
+    build_name: str
+    levels: List[int]
+    results: List[SimulationResult]
+
+    def spikes(self, top: int = 3) -> List[Tuple[int, float]]:
+        """Levels with the largest DPS gain over the previous level, biggest first."""
+        gains = [(self.levels[i], self.results[i].dps - self.results[i - 1].dps)
+                 for i in range(1, len(self.results))]
+        return sorted(gains, key=lambda g: g[1], reverse=True)[:top]
+
+def _shared_stream(seed: int, run_index: int) -> CritStream:
+    """Run i of every build reads the same draws (fingerprint 0 = shared)."""
+    return CritStream(seed * 1_000_003 + run_index, fingerprint=0)
 
 class Optimizer:
     def __init__(self, scenario: Scenario, base_champ: Stats, abilities: List[Ability]):
@@ -20,7 +91,112 @@ class Optimizer:
         self.base_champ = base_champ
         self.abilities = abilities
 
-    def evaluate_build(self, build_name: str, items: List[ItemConfig]) -> SimulationResult:
+        # Results of equivalent builds (same items, any order) are reused.
+        # Bounded so long sweeps stay in constant memory.
+        self.transpositions = TranspositionTable(max_entries=100_000)
+
+    def build_key(self, items: List[ItemConfig]) -> BuildKey:
+        return canonical_key(items, self.scenario.order_sensitive)
+
+    def context(self, rng: CritStream) -> tuple:
+        """
+        Everything besides the items a cached result depends on: the crit
+        stream, and the scenario/champion/kit as they are right now (so a
+        swapped scenario or edited target never reuses stale results).
+        """
+        scenario = self.scenario
+        return (rng.identity(), scenario.duration, astuple(scenario.target_stats),
+                astuple(self.base_champ), tuple((a.config.name, a.rank) for a in self.abilities))
+
+    def evaluate_build(self, build_name: str, items: List[ItemConfig],
+                       rng: Optional[CritStream] = None) -> SimulationResult:
+        # 1. Transposition lookup (the crit stream and the setup are part of the context)
+        if rng is None:
+            rng = CritStream(0, build_fingerprint(items))
+        key = self.build_key(items)
+        context = self.context(rng)
+
+        cached = self.transpositions.get(key, context)
+        if cached is not None:
+            return SimulationResult(build_name, cached.total_damage, cached.dps,
+                                    cached.cost, cached.time_to_kill)
+
+        # 2. Simulate
+        sim = self._simulate(items, self.scenario, stop_on_kill=False, rng=rng)
+        cost = sum(i.cost for i in items)
+
+        result = SimulationResult(
+            build_name, 
+            sim.total_damage_done, 
+            sim.total_damage_done / self.scenario.duration, 
+            cost,
+            sim.time_to_kill
+        )
+        self.transpositions.put(key, result, context)
+        return result
+
+    def evaluate_many(self, builds: List[Tuple[str, List[ItemConfig]]],
+                      workers: Optional[int] = None, seed: int = 0) -> List[SimulationResult]:
+        """
+        evaluate_build for a whole batch, simulated concurrently on threads
+        (see parallel.py). The transposition table is only touched from the
+        calling thread; the worker threads run nothing but simulations.
+        Results come back in input order and match the serial ones exactly.
+        """
+        results: List[Optional[SimulationResult]] = [None] * len(builds)
+        pending: Dict[Tuple[BuildKey, tuple], List[int]] = {}
+
+        # 1. Cache lookups (and duplicates inside the batch) stay serial
+        for i, (name, items) in enumerate(builds):
+            rng = CritStream(seed, build_fingerprint(items))
+            lookup = (self.build_key(items), self.context(rng))
+            cached = self.transpositions.get(*lookup)
+            if cached is not None:
+                results[i] = SimulationResult(name, cached.total_damage, cached.dps,
+                                              cached.cost, cached.time_to_kill)
+            else:
+                pending.setdefault(lookup, []).append(i)
+
+        # 2. One simulation per new build, in parallel
+        def simulate(indices: List[int]) -> SimulationResult:
+            name, items = builds[indices[0]]
+            sim = self._simulate(items, self.scenario, stop_on_kill=False,
+                                 rng=CritStream(seed, build_fingerprint(items)))
+            return SimulationResult(name, sim.total_damage_done,
+                                    sim.total_damage_done / self.scenario.duration,
+                                    sum(i.cost for i in items), sim.time_to_kill)
+
+        fresh = run_threaded(simulate, list(pending.values()), workers)
+
+        # 3. Store and fan out
+        for (lookup, indices), res in zip(pending.items(), fresh):
+            self.transpositions.put(lookup[0], res, lookup[1])
+            for i in indices:
+                name = builds[i][0]
+                results[i] = SimulationResult(name, res.total_damage, res.dps,
+                                              res.cost, res.time_to_kill)
+        return results
+
+    def time_to_kill(self, build_name: str, items: List[ItemConfig],
+                     scenario: Optional[Scenario] = None) -> SimulationResult:
+        """Simulates until the target dies (or the scenario runs out)."""
+        scenario = scenario or self.scenario
+        sim = self._simulate(items, scenario, stop_on_kill=True)
+        cost = sum(i.cost for i in items)
+
+        # DPS over the time actually fought
+        fight_time = sim.time_to_kill if sim.target_dead else scenario.duration
+        
+        return SimulationResult(
+            build_name,
+            sim.total_damage_done,
+            sim.total_damage_done / max(fight_time, 1e-9),
+            cost,
+            sim.time_to_kill
+        )
+
+    def _simulate(self, items: List[ItemConfig], scenario: Scenario, stop_on_kill: bool,
+                  rng: Optional[CritStream] = None, until: Optional[float] = None) -> TimeEngine:
         # 1. Setup Infrastructure
         bus = EventManager()
         damage_engine = DamageEngine()
@@ -28,32 +204,103 @@ class Optimizer:
 
         # 2. Setup Entities
         # We clone the target so one simulation doesn't hurt the next one
-        target_copy = self.scenario.target_stats.snapshot()
+        target_copy = scenario.target_stats.snapshot()
         
         # 3. Initialize Engine (THE FIX IS HERE)
         # Old: sim = TimeEngine(bus, final_stats, target_copy)
         # New: We pass base_champ + items. The Engine calculates the stats itself.
-        sim = TimeEngine(bus, self.base_champ, target_copy, items)
+        sim = TimeEngine(bus, self.base_champ, target_copy, items, rng)
+        sim.max_duration = scenario.duration
+        sim.stop_on_kill = stop_on_kill
 
         # 4. Register Passives
-        # We must manually register item passives to the bus
-        for item in items:
-            for passive in item.passives:
-                if hasattr(passive, 'register'):
-                    passive.register(bus)
+        # Each registration gets fresh runtime state, so the shared items
+        # never carry Spellblade cooldowns from one run into the next
+        sim.register_passives()
 
         # 5. Run Simulation
-        sim.run(self.abilities)
+        sim.run(self.abilities, until)
+        return sim
+
+    def what_if(self, build_name: str, items: List[ItemConfig], at: float,
+                branches: List[Branch]) -> List[SimulationResult]:
+        """
+        Simulates the opening (up to `at` seconds) once, then forks one
+        continuation per branch: another item set, ability priority or
+        crit stream from the same mid-fight state.
+        """
+        opening = self._simulate(items, self.scenario, stop_on_kill=False, until=at)
+        checkpoint = opening.checkpoint()
+
+        results = []
+        for branch in branches:
+            sim = checkpoint.fork(branch.items, branch.rng)
+            sim.run(branch.abilities if branch.abilities is not None else self.abilities)
+            cost = sum(i.cost for i in (branch.items if branch.items is not None else items))
+            results.append(SimulationResult(
+                f"{build_name} -> {branch.name}",
+                sim.total_damage_done,
+                sim.total_damage_done / self.scenario.duration,
+                cost,
+                sim.time_to_kill
+            ))
 
-        # 6. Collect Results
+        print(f"\n--- WHAT IF: {build_name} (forked at {at:.1f}s) ---")
+        print(f"{'BRANCH':<30} {'DPS':<10} {'TOTAL':<10} {'TTK':<10}")
+        print("-" * 65)
+        for res in results:
+            ttk = f"{res.time_to_kill:.2f}s" if res.time_to_kill is not None else "alive"
+            print(f"{res.build_name:<30} {res.dps:<10.1f} {res.total_damage:<10.0f} {ttk:<10}")
+
+        return results
+
+    def level_sweep(self, build_name: str, items: List[ItemConfig], growth: GrowthTable,
+                    levels: Optional[Iterable[int]] = None,
+                    rng: Optional[CritStream] = None) -> PowerCurve:
+        """
+        Simulates one build at every level (1-18 by default).
+
+        The passives are registered on one bus once; between levels only
+        the base stats are swapped and the engine (passive state included)
+        is reset.
+        """
+        levels = list(levels) if levels is not None else list(growth.levels)
+        if rng is None:
+            rng = CritStream(0, build_fingerprint(items))
         cost = sum(i.cost for i in items)
-        
-        return SimulationResult(
-            build_name, 
-            sim.total_damage_done, 
-            sim.total_damage_done / self.scenario.duration, 
-            cost
-        )
+
+        # 1. One bus, one engine, one passive registration
+        bus = EventManager()
+        CombatSystem(bus, DamageEngine())
+        sim = TimeEngine(bus, growth.stats(levels[0]), self.scenario.target_stats.snapshot(), items, rng)
+        sim.max_duration = self.scenario.duration
+
+        sim.register_passives()
+
+        # 2. Re-run per level
+        results = []
+        for level in levels:
+            sim.reset(growth.stats(level), self.scenario.target_stats.snapshot())
+
+            sim.run(self.abilities)
+            results.append(SimulationResult(
+                f"{build_name} @ {level}",
+                sim.total_damage_done,
+                sim.total_damage_done / self.scenario.duration,
+                cost,
+                sim.time_to_kill
+            ))
+
+        curve = PowerCurve(build_name, levels, results)
+
+        print(f"\n--- POWER CURVE: {build_name} ---")
+        print(f"{'LEVEL':<6} {'DPS':<10} {'TOTAL':<10} {'TTK':<10}")
+        print("-" * 40)
+        for level, res in zip(levels, results):
+            ttk = f"{res.time_to_kill:.2f}s" if res.time_to_kill is not None else "alive"
+            print(f"{level:<6} {res.dps:<10.1f} {res.total_damage:<10.0f} {ttk:<10}")
+
+        return curve
 
     def compare_builds(self, builds: List[Tuple[str, List[ItemConfig]]]):
         results = []
@@ -73,4 +320,204 @@ class Optimizer:
         print("-" * 65)
         
         for i, res in enumerate(results):
-            print(f"{i+1:<6} {res.build_name:<25} {res.dps:<10.1f} {res.total_damage:<10.0f} {res.cost:<8}")
\ No newline at end of file
+            print(f"{i+1:<6} {res.build_name:<25} {res.dps:<10.1f} {res.total_damage:<10.0f} {res.cost:<8}")
+
+    def stream_builds(self, builds: Iterable[Tuple[str, List[ItemConfig]]],
+                      leaderboard: Optional[Leaderboard] = None,
+                      progress: Optional[Callable[[int, Leaderboard], None]] = None,
+                      progress_every: int = 1) -> Iterator[SimulationResult]:
+        """
+        Yields each result as soon as it is simulated. `builds` can be a
+        generator: nothing is materialised, and only the leaderboard's
+        top-K entries are kept.
+        """
+        board = leaderboard if leaderboard is not None else Leaderboard()
+
+        for name, items in builds:
+            res = self.evaluate_build(name, items)
+            board.push(res)
+
+            if progress is not None and board.seen % progress_every == 0:
+                progress(board.seen, board)
+            yield res
+
+    def sweep(self, builds: Iterable[Tuple[str, List[ItemConfig]]], top_k: int = 10,
+              progress: Optional[Callable[[int, Leaderboard], None]] = None,
+              progress_every: int = 100) -> Leaderboard:
+        """Runs a whole stream and returns only the leaders."""
+        board = Leaderboard(top_k)
+        for _ in self.stream_builds(builds, board, progress, progress_every):
+            pass
+        return board
+
+    def pareto_sweep(self, library: Dict[str, ItemConfig], constraints: Optional[BuildConstraints] = None,
+                     use_ttk: bool = False, prune: bool = True,
+                     budgets: Optional[List[int]] = None) -> ParetoFrontier:
+        """
+        Every non-dominated build across gold cost and DPS (and TTK) in one
+        pass, so "best DPS at 7k / 10k / 13k" is a lookup on the result.
+
+        With `prune`, each partial build is first simulated once padded with
+        an optimistic virtual item (best remaining stats, every remaining
+        passive, every auto a crit). If the frontier already holds a build
+        that is no more expensive than the cheapest completion and beats
+        that bound, none of the completions is simulated.
+
+        The bound is a simulation, not a proof: it assumes more stats never
+        mean less damage. Haste can trade autos for casts, attack speed
+        shifts the GCD and cast order, and extra casts can run the mana
+        out, so a kit where that costs DPS could lose a frontier build to
+        pruning. Compare against prune=False when adding such a kit
+        (tests/test_pareto.py does this for the item library).
+        """
+        frontier = ParetoFrontier(use_ttk)
+        bounds = 0
+
+        def dominated(build, remaining, slots, min_cost) -> bool:
+            nonlocal bounds
+            # Nothing to compare against yet, or the bound would cost as much as the subtree
+            if not frontier.points or (slots == 1 and len(remaining) < 2):
+                return False
+            bounds += 1
+            sim = self._simulate(build + [optimistic_item(remaining, slots)], self.scenario,
+                                 stop_on_kill=False, rng=FixedStream(-1.0))
+            return frontier.covers(min_cost, sim.total_damage_done / self.scenario.duration,
+                                   sim.time_to_kill)
+
+        shop = BuildEnumerator(library, constraints or BuildConstraints.from_scenario(self.scenario),
+                               prune=dominated if prune else None)
+        for items in shop:
+            frontier.insert(self.evaluate_build(" + ".join(i.name for i in items), items))
+
+        print(f"\nPareto sweep: {frontier.seen} builds simulated, "
+              f"{shop.pruned} subtrees pruned ({bounds} bound sims)")
+        frontier.print_table(budgets)
+        return frontier
+
+    def rank_by_ttk(self, builds: List[Tuple[str, List[ItemConfig]]],
+                    scenario: Optional[Scenario] = None) -> List[SimulationResult]:
+        """Fastest kill first. Builds that never kill are ranked last, by damage dealt."""
+        scenario = scenario or self.scenario
+        results = [self.time_to_kill(name, items, scenario) for name, items in builds]
+
+        results.sort(key=lambda r: (r.time_to_kill is None,
+                                    r.time_to_kill if r.time_to_kill is not None else -r.total_damage))
+
+        target = scenario.target_stats
+        print(f"\n--- TIME TO KILL ---")
+        print(f"Scenario: {scenario.name} ({target.total_hp:.0f} HP / {target.total_armor:.0f} Armor / {target.total_mr:.0f} MR)")
+        print(f"{'RANK':<6} {'BUILD':<25} {'TTK':<10} {'DPS':<10} {'COST':<8}")
+        print("-" * 65)
+
+        for i, res in enumerate(results):
+            ttk = f"{res.time_to_kill:.2f}s" if res.time_to_kill is not None else "alive"
+            print(f"{i+1:<6} {res.build_name:<25} {ttk:<10} {res.dps:<10.1f} {res.cost:<8}")
+
+        return results
+
+    def compare_paired(self, build_a: Tuple[str, List[ItemConfig]], build_b: Tuple[str, List[ItemConfig]],
+                       confidence: float = 0.95, min_samples: int = 5, max_samples: int = 500,
+                       seed: int = 0) -> PairedComparison:
+        """
+        Common random numbers: run i of build A and run i of build B read the
+        same crit stream (attack N gets the same roll in both) on the same
+        time grid. Crit luck cancels out of the difference, so the sign of
+        A - B settles after far fewer runs than independent sampling needs.
+        """
+        name_a, items_a = build_a
+        name_b, items_b = build_b
+        diffs = RunningStats()
+        settled = False
+
+        for i in range(max_samples):
+            rng = _shared_stream(seed, i)
+            a = self.evaluate_build(name_a, items_a, rng)
+            b = self.evaluate_build(name_b, items_b, rng)
+            diffs.add(a.dps - b.dps)
+
+            if diffs.n < min_samples:
+                continue
+
+            low, high = diffs.interval(confidence)
+            # Zero variance: no crits involved, one more run would not change anything
+            if low > 0 or high < 0 or diffs.constant:
+                settled = True
+                break
+
+        low, high = diffs.interval(confidence)
+        result = PairedComparison(name_a, name_b, diffs.mean, low, high, confidence, diffs.n, settled)
+
+        print(f"\n--- PAIRED COMPARISON ({diffs.n} paired runs) ---")
+        print(f"{name_a} - {name_b}: {diffs.mean:+.2f} DPS "
+              f"[{low:+.2f}, {high:+.2f}] @ {confidence:.0%}")
+        print(f"Winner: {result.winner or 'too close to call'}")
+
+        return result
+
+    def race_builds(self, builds: List[Tuple[str, List[ItemConfig]]], budget: int = 1000,
+                    confidence: float = 0.95, initial_runs: int = 3, top_k: int = 1,
+                    seed: int = 0) -> List[RaceEntry]:
+        """
+        Racing tournament: every build gets a few cheap runs, builds whose DPS
+        interval sits entirely below the best lower bound are dropped, and the
+        survivors get more runs (doubling each round). If a round proves
+        nothing, the bottom half by mean is cut (successive halving).
+
+        Stops when `top_k` builds remain, the budget (total simulations) is
+        spent, or the survivors are all deterministic.
+        """
+        entries = [RaceEntry(name, items, sum(i.cost for i in items)) for name, items in builds]
+        alive = list(entries)
+        spent = 0
+        runs = initial_runs
+        round_no = 0
+
+        while len(alive) > top_k and spent < budget:
+            round_no += 1
+
+            # 1. Sample every survivor (same run index -> same crit draws)
+            for entry in alive:
+                # No spread after the opening runs: no crits, the mean is exact
+                if entry.sims >= initial_runs and entry.dps.constant:
+                    continue
+                for _ in range(runs):
+                    if spent >= budget:
+                        break
+                    res = self.evaluate_build(entry.build_name, entry.items, _shared_stream(seed, entry.sims))
+                    entry.dps.add(res.dps)
+                    spent += 1
+
+            # 2. Drop statistically dominated builds
+            # (fewer than two runs = unbounded interval: never sets or fails the bar)
+            best_low = max(e.dps.interval(confidence)[0] for e in alive)
+            survivors = [e for e in alive if e.dps.interval(confidence)[1] >= best_low]
+
+            # 3. Nothing proven: successive halving on the means (once every mean has a spread)
+            if len(survivors) == len(alive) and len(alive) > top_k \
+                    and all(e.sims >= 2 for e in alive):
+                if all(e.dps.constant for e in alive):
+                    break # Deterministic ties: more runs cannot separate them
+                survivors.sort(key=lambda e: e.dps.mean, reverse=True)
+                survivors = survivors[:max(top_k, (len(survivors) + 1) // 2)]
+
+            kept = {id(e) for e in survivors}
+            for entry in alive:
+                if id(entry) not in kept:
+                    entry.eliminated_round = round_no
+            alive = survivors
+            runs *= 2
+
+        # Survivors first, then by how long each build lasted
+        entries.sort(key=lambda e: (e.eliminated_round is not None,
+                                    -(e.eliminated_round or 0),
+                                    -e.dps.mean))
+
+        print(f"\n--- RACING RESULTS ({spent} sims, budget {budget}) ---")
+        print(f"{'RANK':<6} {'BUILD':<25} {'DPS':<10} {'+/-':<8} {'SIMS':<6} {'STATUS':<10}")
+        print("-" * 70)
+        for i, e in enumerate(entries):
+            low, high = e.dps.interval(confidence) if e.sims else (0.0, 0.0)
+            status = "alive" if e.eliminated_round is None else f"out @ R{e.eliminated_round}"
+            print(f"{i+1:<6} {e.build_name:<25} {e.dps.mean:<10.1f} {(high - low) / 2:<8.1f} {e.sims:<6} {status:<10}")
+
+        return entries
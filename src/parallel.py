@@ -0,0 +1,43 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# ------------------------------------------------------------------
+# THREADED SIMULATION
+# ------------------------------------------------------------------
+# A simulation owns everything it mutates: its bus, buff/cooldown managers,
+# passive runtimes, target copy and crit stream. Items, abilities, scenarios
+# and base stats are only read. So many TimeEngines can run side by side in
+# one process, sharing the library instead of pickling it to workers.
+#
+# On a free-threaded interpreter (python3.13t+) the threads run truly in
+# parallel; on a GIL build they still work, just one at a time.
+
+def gil_enabled() -> bool:
+    """False on a free-threaded CPython build with the GIL actually off."""
+    check = getattr(sys, "_is_gil_enabled", None)
+    return True if check is None else check()
+
+def default_workers() -> int:
+    # With the GIL, extra threads only add switching overhead
+    if gil_enabled():
+        return 1
+    return os.cpu_count() or 1
+
+def run_threaded(fn: Callable[[T], R], jobs: Iterable[T], workers: Optional[int] = None) -> List[R]:
+    """
+    fn(job) for every job, on a thread pool. Results come back in job
+    order; the first exception is re-raised. `fn` must only mutate state
+    it creates itself.
+    """
+    jobs = list(jobs)
+    workers = default_workers() if workers is None else workers
+    if workers <= 1 or len(jobs) <= 1:
+        return [fn(job) for job in jobs]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(fn, jobs))
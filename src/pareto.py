@@ -0,0 +1,108 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from engine import StatType
+from item import ItemConfig, StatModifier, StatModType
+from stat_pipeline import ITEM_ATTRIBUTES
+
+# Muramana's mana sits on the item too; resolve() skips it today, the bound shouldn't
+_BOUND_ATTRIBUTES = ITEM_ATTRIBUTES + ("bonus_mana",)
+
+def _ttk(result) -> float:
+    # Never killing counts as the slowest possible kill
+    return math.inf if result.time_to_kill is None else result.time_to_kill
+
+class ParetoFrontier:
+    """
+    Non-dominated builds over (cost, DPS), optionally with TTK as a third axis.
+
+    A build dominates another if it is no more expensive, deals at least as
+    much DPS (and, with TTK, kills no slower). Ties keep the build seen first.
+    """
+    def __init__(self, use_ttk: bool = False):
+        self.use_ttk = use_ttk
+        # Kept sorted by cost
+        self.points: List = []
+        self.seen = 0
+
+    def covers(self, cost: float, dps: float, ttk: Optional[float] = None) -> bool:
+        """True if some point is at least as good as (cost, dps, ttk) on every axis."""
+        ttk = math.inf if ttk is None else ttk
+        for p in self.points:
+            if p.cost > cost:
+                break
+            if p.dps >= dps and (not self.use_ttk or _ttk(p) <= ttk):
+                return True
+        return False
+
+    def insert(self, result) -> bool:
+        """Adds a result; returns False if the frontier already dominates it."""
+        self.seen += 1
+        if self.covers(result.cost, result.dps, result.time_to_kill):
+            return False
+
+        ttk = _ttk(result)
+        self.points = [
+            p for p in self.points
+            if not (p.cost >= result.cost and p.dps <= result.dps
+                    and (not self.use_ttk or _ttk(p) >= ttk))
+        ]
+        self.points.append(result)
+        self.points.sort(key=lambda p: (p.cost, -p.dps))
+        return True
+
+    def best_at(self, budget: int):
+        """Highest-DPS build costing at most `budget` (cheapest on ties), or None."""
+        affordable = [p for p in self.points if p.cost <= budget]
+        if not affordable:
+            return None
+        return max(affordable, key=lambda p: (p.dps, -p.cost))
+
+    def print_table(self, budgets: Optional[List[int]] = None):
+        print(f"\n--- PARETO FRONTIER ({len(self.points)} of {self.seen} builds) ---")
+        print(f"{'COST':<8} {'DPS':<10} {'TTK':<10} {'BUILD':<25}")
+        print("-" * 65)
+        for p in self.points:
+            ttk = f"{p.time_to_kill:.2f}s" if p.time_to_kill is not None else "alive"
+            print(f"{p.cost:<8} {p.dps:<10.1f} {ttk:<10} {p.build_name:<25}")
+
+        for budget in budgets or []:
+            best = self.best_at(budget)
+            label = f"{best.build_name} ({best.dps:.1f} DPS, {best.cost}g)" if best else "nothing affordable"
+            print(f"Best at {budget}g: {label}")
+
+def optimistic_item(remaining: List[ItemConfig], slots: int) -> ItemConfig:
+    """
+    A virtual item at least as strong as any `slots` items from `remaining`.
+
+    Each stat gets the sum of its `slots` largest values (components that
+    can be bought twice count once per slot), and every remaining passive
+    is attached. That covers both the modifiers list and the attributes the
+    loader sets directly on items (lethality, crit, pen, ...). As long as
+    damage only grows with stats and passives, a build padded with this
+    item bounds every real completion from above (see
+    Optimizer.pareto_sweep for when that can fail).
+    """
+    values: Dict[Tuple[StatType, StatModType], List[float]] = {}
+    direct: Dict[str, List[float]] = {attr: [] for attr in _BOUND_ATTRIBUTES}
+    passives = []
+
+    for item in remaining:
+        copies = 1 if item.unique else slots
+        for attr, vals in direct.items():
+            vals.extend([getattr(item, attr, 0.0)] * copies)
+        for mod in item.modifiers:
+            values.setdefault((mod.stat, mod.mod_type), []).extend([mod.value] * copies)
+        passives.extend(item.passives)
+
+    def top(vals: List[float]) -> float:
+        return sum(v for v in sorted(vals, reverse=True)[:slots] if v > 0)
+
+    bound = ItemConfig(
+        name="(bound)",
+        modifiers=[StatModifier(stat, top(vals), mod_type) for (stat, mod_type), vals in values.items()],
+        passives=passives,
+    )
+    for attr, vals in direct.items():
+        setattr(bound, attr, top(vals))
+    return bound
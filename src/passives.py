@@ -3,6 +3,7 @@ from engine import ProcType, Stats, DamageType, DamageInstance, StatType
 from events import EventType, CombatEvent, Priority
 from pipeline import EventManager
 from buffs import BuffConfig
+from dots import DotConfig
 from item import StatModifier, StatModType
 
 # ------------------------------------------------------------------
@@ -13,17 +14,19 @@ class OnHitDamagePassive:
     """
     Adds flat damage to attacks (e.g., Recurve Bow, Nashor's Tooth).
     """
-    def __init__(self, amount: float, damage_type: DamageType):
+    def __init__(self, amount: float, damage_type: DamageType, label: str = "On-Hit"):
         self.amount = amount
         self.damage_type = damage_type
+        # Name in the combat log breakdown
+        self.label = label
 
-    def register(self, event_manager: EventManager):
-        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH)
+    def register(self, event_manager: EventManager) -> 'OnHitDamagePassive':
+        # Stateless: the passive is its own runtime
+        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH,
+                                proc_filter=ProcType.ON_HIT)
+        return self
 
     def _on_hit(self, event: CombatEvent):
-        if not (event.base_instance.proc_type & ProcType.ON_HIT):
-            return
-
         eff = event.base_instance.proc_coefficient
         if eff <= 0: return
 
@@ -34,7 +37,8 @@ class OnHitDamagePassive:
             damage_type=self.damage_type,
             source_stats=event.source,
             proc_type=ProcType.NONE, 
-            tags={'passive_proc', 'on_hit'}
+            tags={'passive_proc', 'on_hit'},
+            source=self.label
         )
         event.add_instance(extra)
 
@@ -60,15 +64,14 @@ class ShockPassive:
     def __init__(self, mana_ratio: float = 0.015):
         self.mana_ratio = mana_ratio
 
-    def register(self, event_manager: EventManager):
+    def register(self, event_manager: EventManager) -> 'ShockPassive':
         # Listen for hits right before mitigation
-        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH)
-
-    def _on_hit(self, event: CombatEvent):
         # Only trigger on Auto Attacks (ON_HIT) or Abilities (SPELL)
-        if not (event.base_instance.proc_type & (ProcType.ON_HIT | ProcType.SPELL)):
-            return
+        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH,
+                                proc_filter=ProcType.ON_HIT | ProcType.SPELL)
+        return self
 
+    def _on_hit(self, event: CombatEvent):
         # Calculate damage based on the Attacker's Total Mana
         bonus_dmg = event.source.total_mana * self.mana_ratio
         
@@ -77,21 +80,24 @@ class ShockPassive:
             damage_type=DamageType.PHYSICAL,
             source_stats=event.source,
             proc_type=ProcType.NONE, # NONE prevents infinite loops!
-            tags={'passive_proc', 'shock'}
+            tags={'passive_proc', 'shock'},
+            source="Shock"
         )
         event.add_instance(extra)
 
 class RuinedKingPassive:
+    # Damage depends on the target's live health
+    reads_target_state = True
+
     def __init__(self, percent_current_hp: float = 0.06): 
         self.percent_current_hp = percent_current_hp
 
-    def register(self, event_manager: EventManager):
-        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH)
+    def register(self, event_manager: EventManager) -> 'RuinedKingPassive':
+        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH,
+                                proc_filter=ProcType.BASIC_ATTACK | ProcType.ON_HIT)
+        return self
 
     def _on_hit(self, event: CombatEvent):
-        if not (event.base_instance.proc_type & (ProcType.BASIC_ATTACK | ProcType.ON_HIT)):
-            return
-
         # Calculate based on target's live health
         target_current_hp = event.target.current_health
         bonus_dmg = max(15.0, target_current_hp * self.percent_current_hp)
@@ -102,24 +108,42 @@ class RuinedKingPassive:
 # ------------------------------------------------------------------
 # STATEFUL PASSIVES (Require Reset)
 # ------------------------------------------------------------------
+# The passive on the item is an immutable description. register() creates
+# a small runtime object holding the per-fight state (and bus), so one item
+# library can serve any number of simulations at once.
 
 class SpellbladePassive:
     """
     Sheen / Trinity Force logic.
     """
+    cooldown = 1.5
+
     def __init__(self, damage_percent_base_ad: float):
         self.ratio = damage_percent_base_ad
+
+    def register(self, event_manager: EventManager) -> 'SpellbladeState':
+        return SpellbladeState(self).register(event_manager)
+
+class SpellbladeState:
+    """One fight's Spellblade: charged or not, and when it last procced."""
+    def __init__(self, passive: SpellbladePassive):
+        self.passive = passive
+        self.reset()
+
+    def reset(self):
         self.active = False
-        self.cooldown = 1.5
         self.last_proc_time = -999.0 
 
-    def register(self, event_manager: EventManager):
+    def register(self, event_manager: EventManager) -> 'SpellbladeState':
         event_manager.subscribe(EventType.CAST_COMPLETE, self._on_cast)
-        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH)
+        # Must be an ON_HIT trigger (usually Basic Attack or Q)
+        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit, Priority.HIGH,
+                                proc_filter=ProcType.ON_HIT)
+        return self
 
     def _on_cast(self, event: CombatEvent):
         # Only charge if off cooldown
-        if event.timestamp >= self.last_proc_time + self.cooldown:
+        if event.timestamp >= self.last_proc_time + self.passive.cooldown:
             self.active = True
 
     def _on_hit(self, event: CombatEvent):
@@ -127,15 +151,11 @@ class SpellbladePassive:
             return
             
         # Standard Spellblade internal CD check
-        if event.timestamp < self.last_proc_time + self.cooldown:
-            return
-
-        # Must be an ON_HIT trigger (usually Basic Attack or Q)
-        if not (event.base_instance.proc_type & ProcType.ON_HIT):
+        if event.timestamp < self.last_proc_time + self.passive.cooldown:
             return
 
         # Apply Bonus
-        bonus_dmg = event.source.base_ad * self.ratio
+        bonus_dmg = event.source.base_ad * self.passive.ratio
         event.base_instance.raw_damage += bonus_dmg
         
         # Reset
@@ -149,23 +169,30 @@ class GrantBuffOnHitPassive:
     """
     def __init__(self, buff_config: BuffConfig):
         self.buff_config = buff_config
-        self.bus = None 
 
-    def register(self, event_manager: EventManager):
+    def register(self, event_manager: EventManager) -> 'GrantBuffOnHitState':
+        return GrantBuffOnHitState(self).register(event_manager)
+
+class GrantBuffOnHitState:
+    """One fight's copy: only needs to know which bus to publish on."""
+    def __init__(self, passive: GrantBuffOnHitPassive):
+        self.passive = passive
+        self.bus = None
+
+    def register(self, event_manager: EventManager) -> 'GrantBuffOnHitState':
         self.bus = event_manager
-        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit)
+        event_manager.subscribe(EventType.PRE_MITIGATION_HIT, self._on_hit,
+                                proc_filter=ProcType.BASIC_ATTACK)
+        return self
 
     def _on_hit(self, event: CombatEvent):
-        if not (event.base_instance.proc_type & ProcType.BASIC_ATTACK):
-            return
-
         # Apply to SELF (Source)
         buff_event = CombatEvent(
             event_type=EventType.BUFF_APPLY,
             timestamp=event.timestamp,
             source=event.source,
             target=event.source, # <--- Target is Self
-            buff_config=self.buff_config
+            buff_config=self.passive.buff_config
         )
         self.bus.publish(buff_event)
 
@@ -179,8 +206,10 @@ class CarvePassive:
     Unique Passive: Carve (Black Cleaver)
     Dealing physical damage applies a stack of 5% Armor Reduction.
     """
+    # Shreds the target, so later hits depend on earlier ones
+    modifies_target_state = True
+
     def __init__(self):
-        self.bus = None
         # Define the Debuff (-5% Armor per stack)
         self.debuff_config = BuffConfig(
             name="Carve",
@@ -195,10 +224,20 @@ class CarvePassive:
             ]
         )
 
-    def register(self, event_manager: EventManager):
+    def register(self, event_manager: EventManager) -> 'CarveState':
+        return CarveState(self).register(event_manager)
+
+class CarveState:
+    """One fight's Carve (the stacks themselves live on the target's debuffs)."""
+    def __init__(self, passive: CarvePassive):
+        self.passive = passive
+        self.bus = None
+
+    def register(self, event_manager: EventManager) -> 'CarveState':
         self.bus = event_manager
         # Listen for ANY damage completion (Auto, Ability, Spellblade, etc.)
         event_manager.subscribe(EventType.POST_MITIGATION_DAMAGE, self._on_damage)
+        return self
 
     def _on_damage(self, event: CombatEvent):
         # 1. Check Damage Type
@@ -211,6 +250,53 @@ class CarvePassive:
             timestamp=event.timestamp,
             source=event.source,
             target=event.target, # <--- Target is Enemy
-            buff_config=self.debuff_config
+            buff_config=self.passive.debuff_config
+        )
+        self.bus.publish(buff_event)
+
+# ------------------------------------------------------------------
+# DAMAGE OVER TIME (Liandry's)
+# ------------------------------------------------------------------
+
+class TormentPassive:
+    """
+    Unique Passive: Torment (Liandry's)
+    Dealing ability damage burns the target for 1% Max HP magic damage
+    per second over 3 seconds. Burns tick through the DotManager.
+    """
+    # The burn scales with the target's max HP
+    reads_target_state = True
+
+    def __init__(self, max_hp_ratio: float = 0.01, duration: float = 3.0):
+        self.burn = DotConfig(
+            name="Torment",
+            duration=duration,
+            damage_type=DamageType.MAGIC,
+            max_hp_ratio=max_hp_ratio,
+            tick_interval=0.5
         )
-        self.bus.publish(buff_event)
\ No newline at end of file
+
+    def register(self, event_manager: EventManager) -> 'TormentState':
+        return TormentState(self).register(event_manager)
+
+class TormentState:
+    """One fight's Torment: only needs to know which bus to publish on."""
+    def __init__(self, passive: TormentPassive):
+        self.passive = passive
+        self.bus = None
+
+    def register(self, event_manager: EventManager) -> 'TormentState':
+        self.bus = event_manager
+        # Ability damage only (the burn's own PERIODIC ticks never re-apply it)
+        event_manager.subscribe(EventType.POST_MITIGATION_DAMAGE, self._on_damage,
+                                proc_filter=ProcType.SPELL)
+        return self
+
+    def _on_damage(self, event: CombatEvent):
+        self.bus.publish(CombatEvent(
+            event_type=EventType.DOT_APPLY,
+            timestamp=event.timestamp,
+            source=event.source,
+            target=event.target,
+            dot_config=self.passive.burn
+        ))
@@ -1,53 +1,166 @@
 from collections import defaultdict
-from engine import DamageInstance, DamageResult
+from typing import Callable, Dict, List, Optional
+from engine import DamageEngine, ProcType # DamageEngine re-exported for existing imports
 from events import EventType, CombatEvent, Priority
 
+def _no_listeners(event: CombatEvent):
+    pass
+
+def _matches(event: CombatEvent, proc_filter: Optional[ProcType]) -> bool:
+    if proc_filter is None:
+        return True
+    base = event.base_instance
+    return base is not None and bool(base.proc_type & proc_filter)
+
 class EventManager:
-    def __init__(self):
+    """
+    The event bus. Listeners run in priority order (stable for ties).
+
+    A listener can pass `proc_filter` to only hear events whose base
+    instance has one of those proc flags (events without an instance never
+    match). For speed, publish() runs a dispatch function generated per
+    event type: one code object calling the bound listeners in order with
+    the filters inlined. It is rebuilt lazily after subscribe(). With
+    `debug`, publish() walks the listener list instead (easy to step through).
+
+    Listeners subscribed with subscribe_batch() receive a list of events:
+    everything of that type the engine fires at one instant (see
+    publish_batch), or a one-element list for a lone publish().
+    """
+    # Default for new buses; set True to debug every simulation at once
+    debug = False
+
+    def __init__(self, debug: Optional[bool] = None):
         self.listeners = defaultdict(list) 
+        if debug is not None:
+            self.debug = debug
+        self._dispatch: Dict[EventType, Callable[[CombatEvent], None]] = {}
+        # Per type: None (no batch listeners) or the segments publish_batch walks
+        self._segments: Dict[EventType, Optional[list]] = {}
+
+    def subscribe(self, event_type: EventType, listener, priority: Priority = Priority.NORMAL,
+                  proc_filter: Optional[ProcType] = None):
+        self._add(event_type, (priority, listener, proc_filter, False))
 
-    def subscribe(self, event_type: EventType, listener, priority: Priority = Priority.NORMAL):
-        self.listeners[event_type].append((priority, listener))
+    def subscribe_batch(self, event_type: EventType, listener, priority: Priority = Priority.NORMAL,
+                        proc_filter: Optional[ProcType] = None):
+        """`listener(events)` gets every matching event of a batch in one call."""
+        self._add(event_type, (priority, listener, proc_filter, True))
+
+    def _add(self, event_type: EventType, entry: tuple):
+        self.listeners[event_type].append(entry)
         self.listeners[event_type].sort(key=lambda x: x[0])
+        # Regenerated on the next publish of this type
+        self._dispatch.pop(event_type, None)
+        self._segments.pop(event_type, None)
 
     def publish(self, event: CombatEvent):
-        if event.event_type in self.listeners:
-            for _, listener in self.listeners[event.event_type]:
+        if self.debug:
+            self._publish_generic(event)
+            return
+
+        dispatch = self._dispatch.get(event.event_type)
+        if dispatch is None:
+            dispatch = self._dispatch[event.event_type] = self._compile(
+                self.listeners.get(event.event_type), event.event_type.name)
+        dispatch(event)
+
+    def publish_batch(self, events: List[CombatEvent]):
+        """
+        Events of one type that happen at the same instant, in order.
+
+        Without batch listeners this is publish() for each event. A batch
+        listener acts as a barrier: every listener before it has seen every
+        event, it gets the matching events as one list, then the listeners
+        after it run per event again.
+        """
+        if len(events) == 1:
+            self.publish(events[0])
+            return
+
+        event_type = events[0].event_type
+        if event_type not in self._segments:
+            self._segments[event_type] = self._split(event_type)
+        segments = self._segments[event_type]
+
+        if segments is None:
+            for event in events:
+                self.publish(event)
+            return
+
+        for batched, target, proc_filter in segments:
+            if not batched:
+                for event in events:
+                    target(event)
+                continue
+            matching = [e for e in events if _matches(e, proc_filter)]
+            if matching:
+                target(matching)
+
+    def _publish_generic(self, event: CombatEvent):
+        for _, listener, proc_filter, batched in self.listeners.get(event.event_type, ()):
+            if not _matches(event, proc_filter):
+                continue
+            if batched:
+                listener([event])
+            else:
                 listener(event)
 
-class DamageEngine:
-    def calculate(self, instance: DamageInstance, target_stats) -> DamageResult:
-        raw = instance.raw_damage
-        
-        # 🟢 NEW: Pull the attacker's stats that were packed into the damage instance!
-        attacker = instance.source_stats 
-        
-        # Determine mitigation based on damage type
-        if instance.damage_type.name == "PHYSICAL":
-            # 1. Start with the target's current armor (Black Cleaver shred is already applied here)
-            armor = target_stats.base_armor 
-            
-            # 2. Apply Percent Armor Penetration (e.g., LDR's 30%)
-            armor = armor * (1.0 - attacker.armor_pen_percent)
-            
-            # 3. Apply Flat Lethality
-            armor = armor - attacker.lethality
-            
-            # 4. Calculate Final Mitigation (Armor cannot be reduced below 0 by Lethality)
-            armor = max(0.0, armor) 
-            mitigation = 100.0 / (100.0 + armor)
-            final = raw * mitigation
-            
-        elif instance.damage_type.name == "MAGIC":
-            mr = max(0.0, target_stats.base_mr)
-            # You can add Magic Pen math here later using the exact same logic!
-            mitigation = 100.0 / (100.0 + mr)
-            final = raw * mitigation
-            
-        else:
-            final = raw # True damage
-            
-        return DamageResult(instance.damage_type, raw, final)
+    def _split(self, event_type: EventType) -> Optional[list]:
+        """Runs of per-event listeners (as one dispatcher each) between batch listeners."""
+        entries = self.listeners.get(event_type, [])
+        if not any(batched for *_, batched in entries):
+            return None
+
+        segments, run = [], []
+        for entry in entries + [None]:
+            if entry is not None and not entry[3]:
+                run.append(entry)
+                continue
+            if run:
+                dispatch = (lambda e, r=run: _publish_entries(e, r)) if self.debug \
+                    else self._compile(run, event_type.name)
+                segments.append((False, dispatch, None))
+                run = []
+            if entry is not None:
+                segments.append((True, entry[1], entry[2]))
+        return segments
+
+    def _compile(self, entries: Optional[list], name: str) -> Callable[[CombatEvent], None]:
+        """
+        Source for one straight-line dispatcher, e.g.
+            def dispatch(event):
+                l0(event)
+                base = event.base_instance
+                if base is not None and base.proc_type & f1: l1(event)
+        """
+        if not entries:
+            return _no_listeners
+
+        namespace = {}
+        lines = ["def dispatch(event):"]
+        base_loaded = False
+        for i, (_, listener, proc_filter, batched) in enumerate(entries):
+            namespace[f"l{i}"] = listener
+            call = f"l{i}([event])" if batched else f"l{i}(event)"
+            if proc_filter is None:
+                lines.append(f"    {call}")
+                continue
+            # Read once: listeners mutate the base instance, they never replace it
+            if not base_loaded:
+                lines.append("    base = event.base_instance")
+                base_loaded = True
+            namespace[f"f{i}"] = proc_filter
+            lines.append(f"    if base is not None and base.proc_type & f{i}: {call}")
+
+        exec(compile("\n".join(lines), f"<dispatch {name}>", "exec"), namespace)
+        return namespace["dispatch"]
+
+def _publish_entries(event: CombatEvent, entries: list):
+    # Debug-mode stand-in for a compiled dispatcher
+    for _, listener, proc_filter, _ in entries:
+        if _matches(event, proc_filter):
+            listener(event)
 
 class CombatSystem:
     def __init__(self, bus: EventManager, damage_engine: DamageEngine):
@@ -59,20 +172,9 @@ class CombatSystem:
 
     def _handle_hit(self, event: CombatEvent):
         """Calculates final damage for every instance in the event."""
-        total_post_mitigation = 0
-        total_pre_mitigation = 0
-        
-        # Process every instance (Base attack + On-hits)
-        for instance in event.all_instances:
-            res = self.damage_engine.calculate(instance, event.target)
-            total_pre_mitigation += res.pre_mitigation_damage
-            total_post_mitigation += res.post_mitigation_damage
-        
-        # Store the final result in the event so the Simulation can see it
-        event.damage_result = DamageResult(
-            event.base_instance.damage_type,
-            total_pre_mitigation,
-            total_post_mitigation
+        # Same-type, same-pen instances (base hit + on-hit procs) are mitigated together
+        event.damage_result = self.damage_engine.calculate_hit(
+            event.all_instances, event.target, event.ability_name
         )
         
         # Publish that damage has officially been dealt
@@ -0,0 +1,70 @@
+import hashlib
+from typing import List
+
+_MASK = 0xFFFFFFFFFFFFFFFF
+_GOLDEN = 0x9E3779B97F4A7C15
+
+def _mix(x: int) -> int:
+    """SplitMix64 finalizer: a strong 64-bit -> 64-bit hash."""
+    x = (x + _GOLDEN) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+def build_fingerprint(items) -> int:
+    """
+    Stable 64-bit id for a build. Uses item names (sorted, so purchase
+    order does not change the crit stream) and a real hash, because
+    Python's hash() is salted per process.
+    """
+    names = "\x1f".join(sorted(item.name for item in items))
+    digest = hashlib.blake2b(names.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+class CritStream:
+    """
+    Counter-based RNG for one simulation.
+
+    Draw N is a pure function of (seed, build fingerprint, N), so the same
+    attack gets the same roll whether the fight runs serially, in another
+    process, or in a vectorized engine that asks for all draws at once.
+    There is no hidden state to share or to advance.
+    """
+    def __init__(self, seed: int = 0, fingerprint: int = 0):
+        self.seed = seed
+        self.fingerprint = fingerprint
+        self.key = _mix((seed & _MASK) ^ _mix(fingerprint & _MASK))
+
+    def draw(self, index: int) -> float:
+        """Uniform float in [0, 1) for the Nth attack."""
+        z = _mix((self.key + index * _GOLDEN) & _MASK)
+        # Top 53 bits -> double precision
+        return (z >> 11) * (1.0 / 9007199254740992.0)
+
+    def draws(self, start: int, count: int) -> List[float]:
+        """Bulk version of draw() for indices [start, start + count)."""
+        return [self.draw(i) for i in range(start, start + count)]
+
+    def with_seed(self, seed: int) -> 'CritStream':
+        return CritStream(seed, self.fingerprint)
+
+    def identity(self) -> tuple:
+        """Hashable id of the whole draw sequence (for result caches)."""
+        return ("stream", self.seed, self.fingerprint)
+
+class FixedStream(CritStream):
+    """
+    Every attack rolls the same value: 1.0 never crits, -1.0 always does.
+    The engine crits when roll < crit chance, so -1.0 crits even at 0%
+    crit chance; the crit distribution and the Pareto upper bound rely on
+    exactly that.
+    """
+    def __init__(self, value: float):
+        super().__init__()
+        self.value = value
+
+    def draw(self, index: int) -> float:
+        return self.value
+
+    def identity(self) -> tuple:
+        return ("fixed", self.value)
@@ -0,0 +1,46 @@
+import math
+from statistics import NormalDist
+from typing import Tuple
+
+def z_score(confidence: float) -> float:
+    """Two-sided normal critical value (0.95 -> 1.96)."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+class RunningStats:
+    """
+    Welford's online mean/variance. Lets samplers decide when to stop
+    without keeping every sample around.
+    """
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        if self.n < 2:
+            return 0.0
+        return self._m2 / (self.n - 1)
+
+    @property
+    def constant(self) -> bool:
+        """At least two samples and no spread at all (e.g. a build that never crits)."""
+        return self.n >= 2 and self._m2 == 0.0
+
+    @property
+    def stderr(self) -> float:
+        # One sample says nothing about the spread: the interval is unbounded
+        if self.n < 2:
+            return math.inf
+        return math.sqrt(self.variance / self.n)
+
+    def interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """Normal-approximation confidence interval for the mean."""
+        half = z_score(confidence) * self.stderr
+        return self.mean - half, self.mean + half
@@ -10,4 +10,8 @@ class Scenario:
     target_stats: Stats      # The Dummy (HP, Armor, MR)
     
     # Optional: Restrictions (e.g. "Must include Boots")
-    required_item_ids: List[str] = None
\ No newline at end of file
+    required_item_ids: List[str] = None
+
+    # True if purchase order changes the outcome (builds are then never
+    # treated as equivalent to their permutations)
+    order_sensitive: bool = False
\ No newline at end of file
@@ -0,0 +1,157 @@
+import bisect
+import heapq
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from events import CombatEvent
+
+# (timestamp, sequence, event): the sequence number is unique, so two events
+# due at the same time never get compared (and fire in the order scheduled)
+_Entry = Tuple[float, int, CombatEvent]
+
+class EventScheduler:
+    """
+    Calendar (bucket) queue for pending combat events.
+
+    Time is cut into buckets `bucket_width` seconds wide (one engine step
+    by default). Events are appended to their bucket in O(1); only the
+    bucket being drained is kept sorted, and a small heap orders the
+    bucket numbers. What we schedule is short-range (windups, 0.25s
+    travel, buff and DoT ticks a few seconds out), so the buckets stay
+    few and small even with thousands of events pending.
+
+    Ties are broken by a sequence number: first scheduled, first fired.
+    """
+    def __init__(self, bucket_width: float = 0.033):
+        self.bucket_width = bucket_width
+        self._buckets: Dict[int, List[_Entry]] = {}
+        # Bucket numbers with pending events (each pushed once)
+        self._keys: List[int] = []
+        # The bucket being drained, sorted; entries before _pos are gone
+        self._current: List[_Entry] = []
+        self._current_key: Optional[int] = None
+        self._pos = 0
+        self._seq = 0
+        self._size = 0
+
+    def _bucket(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.bucket_width)
+
+    # --- Scheduling ---
+    def push(self, event: CombatEvent, timestamp: Optional[float] = None):
+        ts = event.timestamp if timestamp is None else timestamp
+        entry = (ts, self._seq, event)
+        self._seq += 1
+        self._size += 1
+
+        key = self._bucket(ts)
+        if self._current_key is not None and key <= self._current_key:
+            # Due no later than what is being drained: keep the drain order exact
+            bisect.insort(self._current, entry, lo=self._pos)
+            return
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [entry]
+            heapq.heappush(self._keys, key)
+        else:
+            bucket.append(entry)
+
+    def push_many(self, events: Iterable[CombatEvent]):
+        """Bulk insert (e.g. every tick of a DoT at once). Ties keep the given order."""
+        late: Dict[int, List[_Entry]] = {}
+        early: List[_Entry] = []
+        for event in events:
+            entry = (event.timestamp, self._seq, event)
+            self._seq += 1
+            self._size += 1
+            key = self._bucket(event.timestamp)
+            if self._current_key is not None and key <= self._current_key:
+                early.append(entry)
+            else:
+                late.setdefault(key, []).append(entry)
+
+        if early:
+            remaining = self._current[self._pos:] + early
+            remaining.sort()
+            self._current = remaining
+            self._pos = 0
+
+        for key, entries in late.items():
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = entries
+                heapq.heappush(self._keys, key)
+            else:
+                bucket.extend(entries)
+
+    # --- Draining ---
+    def _load(self) -> bool:
+        """Makes sure the current bucket has something left; False if all is empty."""
+        if self._pos < len(self._current):
+            return True
+        if not self._keys:
+            self._current, self._pos, self._current_key = [], 0, None
+            return False
+
+        key = heapq.heappop(self._keys)
+        self._current = self._buckets.pop(key)
+        self._current.sort()
+        self._current_key = key
+        self._pos = 0
+        return True
+
+    def next_time(self) -> Optional[float]:
+        """Timestamp of the next event, or None if nothing is pending."""
+        if not self._load():
+            return None
+        return self._current[self._pos][0]
+
+    def pop(self) -> Tuple[float, CombatEvent]:
+        if not self._load():
+            raise IndexError("pop from an empty EventScheduler")
+        ts, _, event = self._current[self._pos]
+        self._pos += 1
+        self._size -= 1
+        return ts, event
+
+    def pop_simultaneous(self) -> Tuple[float, List[CombatEvent]]:
+        """
+        Every event sharing the earliest timestamp, in scheduling order.
+        Timestamps must be equal, not just close: events computed from the
+        same clock value group, a float a hair later waits for its own pop.
+        """
+        ts, event = self.pop()
+        batch = [event]
+        current = self._current
+        while self._pos < len(current) and current[self._pos][0] == ts:
+            batch.append(current[self._pos][2])
+            self._pos += 1
+        self._size -= len(batch) - 1
+        return ts, batch
+
+    # --- Container protocol ---
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[CombatEvent]:
+        """Pending events, in no particular order."""
+        for entry in self._current[self._pos:]:
+            yield entry[2]
+        for bucket in self._buckets.values():
+            for entry in bucket:
+                yield entry[2]
+
+    def copy(self) -> 'EventScheduler':
+        """Independent queue with the same pending events (the events themselves are shared)."""
+        clone = EventScheduler(self.bucket_width)
+        clone._buckets = {key: list(bucket) for key, bucket in self._buckets.items()}
+        clone._keys = list(self._keys)
+        clone._current = self._current[self._pos:]
+        clone._current_key = self._current_key
+        clone._seq = self._seq
+        clone._size = self._size
+        return clone
@@ -1,41 +1,108 @@
 import requests
-import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from storage import write_json_atomic
+
+DEFAULT_HOST = "https://ddragon.leagueoflegends.com"
+
+class RateLimiter:
+    """At most `per_second` requests start per second, across all threads."""
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
 
 class DataDragon:
-    def __init__(self):
+    """
+    Riot's static data CDN.
+
+    All requests go through one pooled Session (connections are reused),
+    are rate limited, and are retried with backoff on connection errors and
+    429/5xx. `host` can point at a local stand-in server for tests, and
+    `version` pins a patch instead of asking for the latest one.
+    """
+    def __init__(self, version: Optional[str] = None, host: str = DEFAULT_HOST,
+                 data_dir: str = "data", max_workers: int = 8,
+                 requests_per_second: float = 20.0, retries: int = 3, timeout: float = 10.0):
+        self.host = host.rstrip("/")
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.limiter = RateLimiter(requests_per_second)
+        self.session = self._make_session(retries, max_workers)
+
         # 1. Create Data Directory
-        if not os.path.exists("data"):
-            os.makedirs("data")
-            
-        # 2. Get Latest Patch Version
-        # We fetch this every time to ensure we are current.
-        # In production, you'd cache this to avoid API spam.
-        try:
-            print("--- CONNECTING TO RIOT API ---")
-            version_url = "https://ddragon.leagueoflegends.com/api/versions.json"
-            self.version = requests.get(version_url).json()[0]
-            print(f"Detected Patch: {self.version}")
-        except Exception as e:
-            print(f"CRITICAL: Could not fetch version. {e}")
-            # Fallback for offline dev if you have the file
-            self.version = "14.3.1" 
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        # 2. Get Latest Patch Version (unless pinned)
+        self.version = version
+        if self.version is None:
+            try:
+                print("--- CONNECTING TO RIOT API ---")
+                self.version = self.fetch_versions()[0]
+                print(f"Detected Patch: {self.version}")
+            except Exception as e:
+                print(f"CRITICAL: Could not fetch version. {e}")
+                # Fallback for offline dev if you have the file
+                self.version = "14.3.1"
 
-        self.base_url = f"https://ddragon.leagueoflegends.com/cdn/{self.version}/data/en_US"
+        self.base_url = f"{self.host}/cdn/{self.version}/data/en_US"
+
+    @staticmethod
+    def _make_session(retries: int, pool_size: int) -> requests.Session:
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+        # One pool slot per worker so concurrent downloads never queue for a socket
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    # --- Plumbing ---
+    def _get_json(self, url: str) -> Any:
+        self.limiter.wait()
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status() # Crash early if 404/500
+        return response.json()
+
+    def _save(self, filename: str, data: Any):
+        # Write-then-rename: readers never see half a file, even mid-refresh
+        write_json_atomic(os.path.join(self.data_dir, filename), data, indent=4)
+
+    # --- Single downloads ---
+    def fetch_versions(self):
+        return self._get_json(f"{self.host}/api/versions.json")
 
     def fetch_items(self):
         print("Downloading Item Database...")
         url = f"{self.base_url}/item.json"
-        
+
         try:
-            response = requests.get(url)
-            response.raise_for_status() # Crash early if 404/500
-            data = response.json()
-            
+            data = self._get_json(url)
+
             # Save raw JSON for debugging (Trust me, you will need this)
-            with open("data/items_raw.json", "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-                
+            self._save("items_raw.json", data)
+
             return data['data']
         except Exception as e:
             print(f"Error fetching items: {e}")
@@ -44,16 +111,66 @@ class DataDragon:
     def fetch_champion(self, name: str):
         print(f"Downloading {name}...")
         url = f"{self.base_url}/champion/{name}.json"
-        
+
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
-            with open(f"data/{name}_raw.json", "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-                
+            data = self._get_json(url)
+
+            self._save(f"{name}_raw.json", data)
+
             return data['data'][name]
         except Exception as e:
             print(f"Error fetching champion {name}: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+    def fetch_all_champions(self):
+        """Every champion with full spell data, in one download (championFull.json)."""
+        print("Downloading Champion Roster...")
+        url = f"{self.base_url}/championFull.json"
+
+        try:
+            data = self._get_json(url)
+
+            self._save("champions_raw.json", data)
+
+            return data['data']
+        except Exception as e:
+            print(f"Error fetching champion roster: {e}")
+            return {}
+
+    # --- Bulk ---
+    def fetch_bulk(self, champions: Iterable[str] = (), items: bool = True,
+                   versions: bool = True) -> Dict[str, Any]:
+        """
+        Downloads the versions list, items and the given champions at the
+        same time on a thread pool sharing the session.
+
+        Returns {"versions": [...], "items": {...}, "champions": {name: {...}}}.
+        Failed downloads come back empty, like the single fetchers.
+        """
+        champions = list(champions)
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            versions_job = pool.submit(self._fetch_versions_safe) if versions else None
+            items_job = pool.submit(self.fetch_items) if items else None
+            champion_jobs = {name: pool.submit(self.fetch_champion, name) for name in champions}
+
+            result = {
+                "versions": versions_job.result() if versions_job else [],
+                "items": items_job.result() if items_job else {},
+                "champions": {name: job.result() for name, job in champion_jobs.items()},
+            }
+
+        failed = [name for name, data in result["champions"].items() if not data]
+        print(f"Bulk download: {len(champions)} champions in {time.monotonic() - start:.1f}s"
+              + (f" ({len(failed)} failed: {failed})" if failed else ""))
+        return result
+
+    def _fetch_versions_safe(self):
+        try:
+            versions = self.fetch_versions()
+            self._save("versions.json", versions)
+            return versions
+        except Exception as e:
+            print(f"Error fetching versions: {e}")
+            return []
@@ -0,0 +1,273 @@
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from item import ItemConfig
+from optimizer import Optimizer, SimulationResult
+from build_key import BuildKey, TranspositionTable
+from enumerator import BuildConstraints, BuildEnumerator
+from storage import write_json_atomic
+
+# ------------------------------------------------------------------
+# 1. PARALLEL WORKERS
+# ------------------------------------------------------------------
+# Each worker process receives the optimizer and library once (initializer),
+# then only item names travel per task.
+
+_worker_optimizer: Optional[Optimizer] = None
+_worker_library: Optional[Dict[str, ItemConfig]] = None
+
+def _init_worker(optimizer: Optimizer, library: Dict[str, ItemConfig]):
+    global _worker_optimizer, _worker_library
+    _worker_optimizer = optimizer
+    _worker_library = library
+
+def _evaluate_names(names: List[str]) -> SimulationResult:
+    items = [_worker_library[n] for n in names]
+    return _worker_optimizer.evaluate_build(" + ".join(names), items)
+
+# ------------------------------------------------------------------
+# 2. RESULT
+# ------------------------------------------------------------------
+
+@dataclass
+class SearchResult:
+    best_items: List[str]
+    best: SimulationResult
+    generations: int
+    evaluations: int
+    # Best DPS after each generation
+    history: List[float] = field(default_factory=list)
+
+# ------------------------------------------------------------------
+# 3. THE SEARCH
+# ------------------------------------------------------------------
+
+class EvolutionarySearch:
+    """
+    Genetic search over the item library.
+
+    Population of builds -> tournament selection -> crossover (mix the
+    parents' items) -> mutation (replace an item with one from the pool,
+    or swap two slots when purchase order matters). The best builds
+    survive unchanged (elitism). Every generation is evaluated as one
+    batch through Optimizer.evaluate_build, optionally across processes
+    (or, with `threads`, on a thread pool sharing the library in-process).
+
+    Same seed + same library = same search, with or without workers.
+    """
+    def __init__(self, optimizer: Optimizer, library: Dict[str, ItemConfig],
+                 build_size: int = 6, population_size: int = 24, elite: int = 2,
+                 mutation_rate: float = 0.3, tournament: int = 3,
+                 constraints: Optional[BuildConstraints] = None, seed: int = 0, workers: int = 1,
+                 threads: bool = False):
+        self.optimizer = optimizer
+        self.library = library
+        self.constraints = constraints or BuildConstraints.from_scenario(optimizer.scenario)
+
+        # Same pool and required items as the enumerator would use
+        shop = BuildEnumerator(library, self.constraints)
+        self.required = [item.name for item in shop.required]
+        self.pool = sorted(item.name for item in shop.candidates)
+        self.build_size = min(build_size, self.constraints.max_items, len(self.required) + len(self.pool))
+        self.population_size = population_size
+        self.elite = elite
+        self.mutation_rate = mutation_rate
+        self.tournament = tournament
+        self.workers = workers
+        # Threads skip pickling the optimizer and library (best on free-threaded builds)
+        self.threads = threads
+
+        self.rng = random.Random(seed)
+        self.population: List[List[str]] = []
+        self.generation = 0
+        self.evaluations = 0
+        self.history: List[float] = []
+        # Fitness of builds seen so far (permutations share an entry).
+        # Bounded like the optimizer's own table, so long searches stay in constant memory.
+        self.seen = TranspositionTable(max_entries=100_000)
+
+    # --- Build helpers ---
+    def _key(self, names: List[str]) -> BuildKey:
+        return self.optimizer.build_key([self.library[n] for n in names])
+
+    def _cost(self, names: List[str]) -> int:
+        return sum(self.library[n].cost for n in names)
+
+    def _valid(self, names: List[str]) -> bool:
+        return self.constraints.allows([self.library[n] for n in names])
+
+    def _free_slots(self) -> int:
+        return self.build_size - len(self.required)
+
+    def _random_build(self) -> List[str]:
+        for _ in range(100):
+            names = self.required + self.rng.sample(self.pool, self._free_slots())
+            if self._valid(names):
+                return names
+        # Constraints too tight for random picks: start from the cheapest items
+        names = list(self.required)
+        boots = sum(1 for n in names if "Boots" in self.library[n].tags)
+        for n in sorted(self.pool, key=lambda n: self.library[n].cost):
+            if len(names) == self.build_size:
+                break
+            if "Boots" in self.library[n].tags:
+                if boots >= self.constraints.max_boots:
+                    continue
+                boots += 1
+            names.append(n)
+        if not self._valid(names):
+            raise ValueError(f"No {self.build_size}-item build satisfies the constraints")
+        return names
+
+    def _crossover(self, a: List[str], b: List[str]) -> List[str]:
+        # Required items are fixed; only the free slots are mixed
+        genes = [n for n in dict.fromkeys(a + b) if n not in self.required]
+        self.rng.shuffle(genes)
+        return self.required + genes[:self._free_slots()]
+
+    def _mutate(self, names: List[str]) -> List[str]:
+        names = list(names)
+        free = list(range(len(self.required), len(names)))
+        if not free:
+            return names
+        if self.optimizer.scenario.order_sensitive and len(names) > 1 and self.rng.random() < 0.5:
+            # Swap: only meaningful when purchase order matters
+            i, j = self.rng.sample(range(len(names)), 2)
+            names[i], names[j] = names[j], names[i]
+        else:
+            # Replace: drop one free item for one we don't own yet
+            unowned = [n for n in self.pool if n not in names]
+            if not unowned:
+                return names # Already owns the whole pool
+            slot = self.rng.choice(free)
+            names[slot] = self.rng.choice(unowned)
+        return names
+
+    def _select(self, scored) -> List[str]:
+        contenders = self.rng.sample(scored, min(self.tournament, len(scored)))
+        return max(contenders, key=lambda s: s[1].dps)[0]
+
+    # --- Evaluation ---
+    def _evaluate(self, population: List[List[str]], executor) -> List[SimulationResult]:
+        results: List[Optional[SimulationResult]] = [None] * len(population)
+        pending: Dict[BuildKey, List[int]] = {}
+
+        # 1. Reuse anything already seen (including permutations)
+        for i, names in enumerate(population):
+            key = self._key(names)
+            cached = self.seen.get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+
+        # 2. One simulation per new build, as a batch
+        batch = [population[idx[0]] for idx in pending.values()]
+        if executor is not None:
+            fresh = list(executor.map(_evaluate_names, batch))
+        elif self.threads:
+            fresh = self.optimizer.evaluate_many(
+                [(" + ".join(n), [self.library[x] for x in n]) for n in batch], self.workers)
+        else:
+            fresh = [self.optimizer.evaluate_build(" + ".join(n), [self.library[x] for x in n]) for n in batch]
+        self.evaluations += len(batch)
+
+        for (key, indices), res in zip(pending.items(), fresh):
+            self.seen.put(key, res)
+            for i in indices:
+                results[i] = res
+
+        return results
+
+    def _next_generation(self, scored) -> List[List[str]]:
+        scored = sorted(scored, key=lambda s: s[1].dps, reverse=True)
+        nxt = [names for names, _ in scored[:self.elite]]
+
+        attempts = 0
+        while len(nxt) < self.population_size:
+            attempts += 1
+            child = self._crossover(self._select(scored), self._select(scored))
+            if self.rng.random() < self.mutation_rate:
+                child = self._mutate(child)
+            if self._valid(child):
+                nxt.append(child)
+            elif attempts > 50 * self.population_size:
+                # Constraints reject most children: inject fresh blood instead
+                nxt.append(self._random_build())
+        return nxt
+
+    # --- Checkpointing ---
+    def save_checkpoint(self, path: str):
+        version, internal, gauss = self.rng.getstate()
+        state = {
+            "generation": self.generation,
+            "evaluations": self.evaluations,
+            "history": self.history,
+            "population": self.population,
+            "rng_state": [version, list(internal), gauss],
+        }
+        write_json_atomic(path, state)
+
+    def load_checkpoint(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.generation = state["generation"]
+        self.evaluations = state["evaluations"]
+        self.history = state["history"]
+        self.population = state["population"]
+        version, internal, gauss = state["rng_state"]
+        self.rng.setstate((version, tuple(internal), gauss))
+
+    # --- Main loop ---
+    def run(self, generations: int = 50, time_budget: Optional[float] = None,
+            checkpoint_path: Optional[str] = None, checkpoint_every: int = 5) -> SearchResult:
+        start = time.monotonic()
+
+        if not self.population:
+            self.population = [self._random_build() for _ in range(self.population_size)]
+
+        executor = None
+        if self.workers > 1 and not self.threads:
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                           initargs=(self.optimizer, self.library))
+
+        best_names, best = None, None
+
+        def score(population):
+            nonlocal best_names, best
+            scored = list(zip(population, self._evaluate(population, executor)))
+            for names, res in scored:
+                if best is None or res.dps > best.dps:
+                    best_names, best = names, res
+            return scored
+
+        try:
+            # Generation 0 (or the population a checkpoint was saved with)
+            scored = score(self.population)
+
+            while self.generation < generations:
+                # Breed, then evaluate: generation N is reported with its own builds
+                self.population = self._next_generation(scored)
+                self.generation += 1
+                scored = score(self.population)
+
+                self.history.append(best.dps)
+                print(f"[Gen {self.generation}] Best DPS: {best.dps:.1f} ({' + '.join(best_names)})")
+
+                if checkpoint_path and self.generation % checkpoint_every == 0:
+                    self.save_checkpoint(checkpoint_path)
+                if time_budget is not None and time.monotonic() - start >= time_budget:
+                    print(f"Time budget reached after {self.generation} generations.")
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if checkpoint_path:
+            self.save_checkpoint(checkpoint_path)
+
+        return SearchResult(best_names, best, self.generation, self.evaluations, self.history)
@@ -1,24 +1,162 @@
-import heapq
-import random
-from typing import List, Tuple
-from copy import deepcopy
+from dataclasses import dataclass, replace
+from typing import List, Optional, Set
+from collections import Counter
+from copy import copy
 
 from engine import Stats, DamageInstance, DamageType, ProcType
 from ability import Ability
 from cooldowns import CooldownManager
 from events import EventType, CombatEvent, Priority
-from pipeline import EventManager
+from pipeline import EventManager, CombatSystem, DamageEngine
 from item import ItemConfig
 from buffs import BuffManager
 from stat_pipeline import StatPipeline
+from rng import CritStream, build_fingerprint
+from hit_trace import HitTrace, target_dependency
+from scheduler import EventScheduler
+from dots import DotManager
+from inventory_system import InventoryManager
+
+def _clone_event(event: CombatEvent) -> CombatEvent:
+    """Private copy of a queued event: passives mutate instances when it fires."""
+    clones = {id(i): replace(i) for i in event.all_instances}
+    base = None
+    if event.base_instance is not None:
+        base = clones.get(id(event.base_instance)) or replace(event.base_instance)
+    return replace(event, base_instance=base, _instances=[clones[id(i)] for i in event.all_instances])
+
+@dataclass
+class SimCheckpoint:
+    """
+    Frozen mid-fight state of a TimeEngine. Fork it as often as needed;
+    every fork starts from exactly this state.
+    """
+    current_time: float
+    max_duration: float
+    time_step: float
+    stop_on_kill: bool
+    base_attacker: Stats
+    base_target: Stats
+    attacker: Stats
+    target: Stats
+    items: List[ItemConfig]
+    # (item name, passive runtime) pairs, detached from any bus
+    passive_runtimes: list
+    rng: CritStream
+    attack_index: int
+    buff_manager: BuffManager
+    debuff_manager: BuffManager
+    cd_manager: CooldownManager
+    # Detached copy (no bus): fork() binds a copy to the new engine
+    dot_manager: DotManager
+    next_attack_time: float
+    total_damage_done: float
+    time_to_kill: Optional[float]
+    damage_history: list
+    # Events are shared with the engine and every fork: whoever pops one clones it
+    event_queue: EventScheduler
+
+    def fork(self, items: Optional[List[ItemConfig]] = None, rng: Optional[CritStream] = None,
+             damage_engine: Optional[DamageEngine] = None) -> 'TimeEngine':
+        """
+        A new engine on its own bus that continues from the checkpoint.
+
+        `items` swaps the build: stats are re-resolved for it right away
+        (current mana carries over), items kept from the checkpoint (same
+        name) keep their passive state, new ones start fresh. `rng` swaps the crit
+        stream (attack numbering continues). Pass a different ability list
+        to run() to change the priority. Recorders must be subscribed to
+        the fork's bus again.
+        """
+        items = list(self.items) if items is None else list(items)
+
+        bus = EventManager()
+        CombatSystem(bus, damage_engine or DamageEngine())
+        sim = TimeEngine(bus, self.base_attacker, self.base_target.snapshot(), items,
+                         rng if rng is not None else self.rng)
+        sim.max_duration = self.max_duration
+        sim.time_step = self.time_step
+        sim.stop_on_kill = self.stop_on_kill
+
+        # Per-fight state: cheap copies, nothing deep
+        sim.current_time = self.current_time
+        sim.target = self.target.snapshot()
+        sim.attack_index = self.attack_index
+        sim.buff_manager = self.buff_manager.copy()
+        sim.debuff_manager = self.debuff_manager.copy()
+        sim.cd_manager = self.cd_manager.copy()
+        sim.dot_manager = self.dot_manager.copy(bus, sim.schedule_event, sim.schedule_events)
+        sim.next_attack_time = self.next_attack_time
+        sim.total_damage_done = self.total_damage_done
+        sim.time_to_kill = self.time_to_kill
+        sim.damage_history = list(self.damage_history)
+        sim.event_queue = self.event_queue.copy()
+        sim._shared_events = {id(event) for event in self.event_queue}
+
+        # A swapped build fights with its own stats from the first frame on
+        if sorted(i.name for i in items) != sorted(i.name for i in self.items):
+            sim.attacker = StatPipeline.resolve(self.base_attacker, items,
+                                                sim.buff_manager.get_all_buffs())
+            sim.attacker.current_mana = self.attacker.current_mana
+            sim._attacker_version = sim.buff_manager.version
+        else:
+            sim.attacker = self.attacker.snapshot()
+
+        # Kept items continue with a copy of their passive state, new ones start fresh
+        saved = {}
+        for name, runtime in self.passive_runtimes:
+            saved.setdefault(name, []).append(runtime)
+        for item in items:
+            if item.name in saved:
+                runtimes = [copy(rt).register(bus) for rt in saved.pop(item.name)]
+            else:
+                runtimes = [p.register(bus) for p in item.passives if hasattr(p, 'register')]
+            sim.passive_runtimes.extend((item.name, rt) for rt in runtimes)
+        return sim
 
 class TimeEngine:
-    def __init__(self, bus, base_attacker, base_target, items):
+    def __init__(self, bus, base_attacker, base_target, items, rng: Optional[CritStream] = None):
         self.bus = bus
+
+        # Crit rolls: one counter-based stream per simulation
+        self.rng = rng if rng is not None else CritStream(0, build_fingerprint(items))
+        self.items = items                   
+
+        self.time_step = 0.033 
+        self.max_duration = 10.0
+
+        # Stop as soon as the target dies (False = always run max_duration)
+        self.stop_on_kill = False
+
+        # Pre-mitigation hit recording (see enable_trace)
+        self.trace: Optional[HitTrace] = None
+
+        # (item name, runtime) for every passive registered on this bus
+        self.passive_runtimes: list = []
+
+        # Burns and poisons on the target (set dot_manager.closed_form to skip ticks)
+        self.dot_manager = DotManager(bus, self.schedule_event, schedule_many=self.schedule_events)
+
+        self.reset(base_attacker, base_target)
+
+        self.bus.subscribe(EventType.POST_MITIGATION_DAMAGE, self._on_damage_dealt, Priority.NORMAL)
+        self.bus.subscribe(EventType.BUFF_APPLY, self._on_buff_apply, Priority.HIGHEST)
+        self.bus.subscribe(EventType.DOT_APPLY, self._on_dot_apply, Priority.HIGHEST)
+        self.bus.subscribe(EventType.DOT_TICK, self._on_dot_tick, Priority.HIGHEST)
+
+    def reset(self, base_attacker: Stats, base_target: Stats):
+        """
+        Fresh fight with the same bus, items and settings (e.g. the next
+        level of a level sweep). Bus subscriptions are kept and registered
+        passives go back to their starting state.
+        """
+        self.attack_index = 0
+        for _, runtime in self.passive_runtimes:
+            if hasattr(runtime, 'reset'):
+                runtime.reset()
         
         # --- DYNAMIC STAT ENGINE ---
         self.base_attacker = base_attacker   
-        self.items = items                   
         
         self.buff_manager = BuffManager()    
         self.attacker = StatPipeline.resolve(self.base_attacker, self.items, [])
@@ -32,18 +170,98 @@ class TimeEngine:
         self.target = base_target                 
         
         self.cd_manager = CooldownManager()
+        self.dot_manager.reset()
         
         self.current_time = 0.0
-        self.time_step = 0.033 
-        self.max_duration = 10.0
+        self.time_to_kill: Optional[float] = None
         
         self.next_attack_time = 0.0
         self.total_damage_done = 0.0
         self.damage_history = []
-        self.event_queue: List[Tuple[float, CombatEvent]] = []
+        self.event_queue = EventScheduler(self.time_step)
+        # Buff versions the current attacker/target were resolved for (None = never)
+        self._attacker_version: Optional[int] = None
+        self._target_version: Optional[int] = None
+        # ids of queued events shared with a checkpoint (cloned before they fire)
+        self._shared_events: Set[int] = set()
 
-        self.bus.subscribe(EventType.POST_MITIGATION_DAMAGE, self._on_damage_dealt, Priority.NORMAL)
-        self.bus.subscribe(EventType.BUFF_APPLY, self._on_buff_apply, Priority.HIGHEST)
+    def register_passives(self) -> list:
+        """
+        Registers every item passive on this engine's bus. Items are only
+        read: each passive hands back a runtime holding this fight's state,
+        so the same item objects can be shared by any number of engines.
+        (Equipping through InventoryManager(bus, engine) does the same.)
+        """
+        inventory = InventoryManager(self.bus, self)
+        for item in self.items:
+            inventory.equip_item(item)
+        return self.passive_runtimes
+
+    def checkpoint(self) -> SimCheckpoint:
+        """
+        Snapshot of the fight so far (call between run(until=...) calls).
+        The engine itself can keep running; it and every fork clone a
+        queued event only when they pop it (copy-on-write).
+
+        Every item passive must have been registered through this engine
+        (register_passives, or an InventoryManager given the engine):
+        a runtime the engine never saw would not reach the forks.
+        """
+        expected = Counter(item.name for item in self.items
+                           for p in item.passives if hasattr(p, 'register'))
+        missing = expected - Counter(name for name, _ in self.passive_runtimes)
+        if missing:
+            raise ValueError(f"Passives not registered through this engine: {sorted(missing)} "
+                             f"(use register_passives() or InventoryManager(bus, engine))")
+
+        self._shared_events |= {id(event) for event in self.event_queue}
+        return SimCheckpoint(
+            current_time=self.current_time,
+            max_duration=self.max_duration,
+            time_step=self.time_step,
+            stop_on_kill=self.stop_on_kill,
+            base_attacker=self.base_attacker,
+            base_target=self.base_target.snapshot(),
+            attacker=self.attacker.snapshot(),
+            target=self.target.snapshot(),
+            items=list(self.items),
+            passive_runtimes=[(name, copy(rt)) for name, rt in self.passive_runtimes],
+            rng=self.rng,
+            attack_index=self.attack_index,
+            buff_manager=self.buff_manager.copy(),
+            debuff_manager=self.debuff_manager.copy(),
+            cd_manager=self.cd_manager.copy(),
+            dot_manager=self.dot_manager.copy(None, None),
+            next_attack_time=self.next_attack_time,
+            total_damage_done=self.total_damage_done,
+            time_to_kill=self.time_to_kill,
+            damage_history=list(self.damage_history),
+            event_queue=self.event_queue.copy(),
+        )
+
+    def enable_trace(self) -> HitTrace:
+        """
+        Records every hit's pre-mitigation instances (after all on-hit
+        passives) into a compact trace that hit_trace.TraceReplayer can
+        re-mitigate against other targets. Call before run().
+
+        The recorder is a batch listener behind CombatSystem: hits landing
+        at one instant are appended in one call, once each has been fully
+        processed, so recording never reorders the fight itself.
+        """
+        self.trace = HitTrace(self.max_duration)
+        self.bus.subscribe_batch(EventType.PRE_MITIGATION_HIT, self._record_hits, Priority.LOWEST)
+        return self.trace
+
+    def _record_hits(self, events: List[CombatEvent]):
+        for event in events:
+            self.trace.add_hit(self.current_time, event)
+
+    def _on_dot_apply(self, event: CombatEvent):
+        self.dot_manager.apply(event.dot_config, event.source, self.target, event.timestamp)
+
+    def _on_dot_tick(self, event: CombatEvent):
+        self.dot_manager.on_tick(event)
 
     def _on_buff_apply(self, event: CombatEvent):
         if event.buff_config:
@@ -53,37 +271,72 @@ class TimeEngine:
                  self.buff_manager.apply_buff(event.buff_config, event.timestamp)
 
     def schedule_event(self, event: CombatEvent):
-        heapq.heappush(self.event_queue, (event.timestamp, event))
+        self.event_queue.push(event)
+
+    def schedule_events(self, events: List[CombatEvent]):
+        """Bulk version of schedule_event (the DotManager queues a DoT's ticks with it)."""
+        self.event_queue.push_many(events)
 
     def _on_damage_dealt(self, event: CombatEvent):
         if event.damage_result:
             dmg = event.damage_result.post_mitigation_damage
             self.total_damage_done += dmg
             self.target.current_health -= dmg
+
+            if self.time_to_kill is None and self.target.current_health <= 0:
+                self.time_to_kill = event.timestamp
             
             # Add a visual flair to the log if it critted!
             source_label = event.ability_name
             if event.base_instance.is_crit:
                 source_label += " (CRIT!)"
             
+            # On-hit procs that were fused into this hit, by source
+            procs = ", ".join(f"{name} {amount:.1f}"
+                              for name, amount in event.damage_result.breakdown.items()
+                              if name != event.ability_name)
+
             self.damage_history.append({
                 "Time": round(event.timestamp, 2),
                 "Source": source_label,
                 "Type": event.base_instance.damage_type.name,
-                "Damage": round(dmg, 1)
+                "Damage": round(dmg, 1),
+                "Procs": procs
             })
 
-    def run(self, abilities: list[Ability]):
-        while self.current_time < self.max_duration:
-            # 1. Process Due Events
-            while self.event_queue and self.event_queue[0][0] <= self.current_time:
-                timestamp, event = heapq.heappop(self.event_queue)
-                
-                # FIX: Update the event with the true, LIVE state right before it hits
-                event.source = self.attacker
-                event.target = self.target 
-                
-                self.bus.publish(event)
+    @property
+    def target_dead(self) -> bool:
+        return self.time_to_kill is not None
+
+    def run(self, abilities: list[Ability], until: Optional[float] = None):
+        """
+        Runs the fight to max_duration, or pauses once `until` is reached.
+        Calling run() again resumes from where it stopped.
+        """
+        if self.trace is not None:
+            self.trace.duration = self.max_duration
+            self.trace.invalid_reason = target_dependency(self.items, abilities)
+
+        end = self.max_duration if until is None else min(until, self.max_duration)
+        while self.current_time < end:
+            # 1. Process Due Events (everything due at one instant is one batch)
+            while self.event_queue and self.event_queue.next_time() <= self.current_time:
+                batch = self._pop_batch()
+
+                # FIX: Update the events with the true, LIVE state right before they hit
+                # (one resolved stats view for the whole batch)
+                attacker, target = self.attacker, self.target
+                for event in batch:
+                    event.source = attacker
+                    event.target = target
+
+                self._publish_batch(batch)
+
+                # Simultaneous hits all land, even the ones after the killing blow
+                if self.stop_on_kill and self.target_dead:
+                    if self.trace is not None:
+                        self.trace.truncated = True
+                    return
 
             # 2. Check GCD
             if self.current_time < self.cd_manager.global_cooldown:
@@ -114,25 +367,53 @@ class TimeEngine:
             # 5. Advance Time
             self._tick()
 
+    def _pop_batch(self) -> List[CombatEvent]:
+        """Every queued event sharing the earliest timestamp, in scheduling order."""
+        _, batch = self.event_queue.pop_simultaneous()
+
+        # Still shared with a checkpoint: fire private copies
+        if self._shared_events:
+            for i, event in enumerate(batch):
+                if id(event) in self._shared_events:
+                    self._shared_events.discard(id(event))
+                    batch[i] = _clone_event(event)
+        return batch
+
+    def _publish_batch(self, batch: List[CombatEvent]):
+        # Consecutive events of one type go out together (batch listeners see them as one list)
+        start = 0
+        for end in range(1, len(batch) + 1):
+            if end == len(batch) or batch[end].event_type is not batch[start].event_type:
+                self.bus.publish_batch(batch[start:end])
+                start = end
+
     def _tick(self):
+        # Last frame of the fight: DoTs still burning pay what they accrued up to the end
+        if self.current_time < self.max_duration <= self.current_time + self.time_step:
+            self.dot_manager.settle(self.max_duration, self.attacker, self.target)
+
         self.current_time += self.time_step
         
         # A. Update Timers
         self.buff_manager.tick(self.current_time)
         self.debuff_manager.tick(self.current_time)
         
-        # B. FIX 2: PRESERVE MANA before overwriting attacker
-        # The pipeline creates a NEW stats object, so we must save our current mana
-        saved_mana = self.attacker.current_mana
-        
-        self.attacker = StatPipeline.resolve(
-            self.base_attacker, 
-            self.items, 
-            self.buff_manager.get_all_buffs()
-        )
-        
-        # Restore mana to the new object
-        self.attacker.current_mana = saved_mana
+        # B. Re-resolve the attacker only when its buffs changed
+        # (items and base stats are fixed for the whole fight)
+        if self.buff_manager.version != self._attacker_version:
+            # FIX 2: PRESERVE MANA before overwriting attacker
+            # The pipeline creates a NEW stats object, so we must save our current mana
+            saved_mana = self.attacker.current_mana
+            
+            self.attacker = StatPipeline.resolve(
+                self.base_attacker, 
+                self.items, 
+                self.buff_manager.get_all_buffs()
+            )
+            
+            # Restore mana to the new object
+            self.attacker.current_mana = saved_mana
+            self._attacker_version = self.buff_manager.version
         
         # C. Mana Regen
         regen = self.attacker.total_mana_regen * self.time_step
@@ -141,15 +422,17 @@ class TimeEngine:
             self.attacker.current_mana + regen
         )
 
-        # D. Update Enemy
-        saved_target_hp = self.target.current_health
+        # D. Update Enemy (only when its debuffs changed)
+        if self.debuff_manager.version != self._target_version:
+            saved_target_hp = self.target.current_health
 
-        self.target = StatPipeline.resolve_target(
-            self.base_target,
-            self.debuff_manager
-        )
+            self.target = StatPipeline.resolve_target(
+                self.base_target,
+                self.debuff_manager
+            )
 
-        self.target.current_health = saved_target_hp
+            self.target.current_health = saved_target_hp
+            self._target_version = self.debuff_manager.version
 
     def _perform_cast(self, ability: Ability, haste_mult: float) -> bool:
         """Returns True if cast was successful, False if blocked (OOM)."""
@@ -216,8 +499,11 @@ class TimeEngine:
         is_crit = False
         damage_mult = 1.0
         
-        # random.random() generates a float between 0.0 and 1.0
-        if random.random() < snapshot_stats.crit_chance:
+        # Draw N belongs to attack N, no matter who runs the simulation
+        roll = self.rng.draw(self.attack_index)
+        self.attack_index += 1
+
+        if roll < snapshot_stats.crit_chance:
             is_crit = True
             damage_mult = snapshot_stats.total_crit_damage
         # ==========================================
@@ -3,6 +3,14 @@ from engine import Stats, StatType
 from buffs import BuffManager, ActiveBuff
 from item import ItemConfig, StatModType
 
+# Every attribute resolve() reads straight off an item (the loader sets
+# these directly). Anything that bounds item stats must cover all of them.
+ITEM_ATTRIBUTES = (
+    "base_ad", "bonus_ad", "base_ap", "bonus_ap", "base_hp", "bonus_hp",
+    "attack_damage", "health", "ability_power", "ability_haste", "attack_speed",
+    "crit_chance", "bonus_crit_damage", "armor_pen_percent", "lethality",
+)
+
 class StatPipeline:
     @staticmethod
     def resolve(base_stats: Stats, items: List[ItemConfig], buffs: List[ActiveBuff]) -> Stats:
@@ -0,0 +1,19 @@
+import json
+import os
+import threading
+from typing import Any, Optional
+
+# ------------------------------------------------------------------
+# ATOMIC JSON FILES
+# ------------------------------------------------------------------
+# Checkpoints, champion caches and scraped data are all written the same
+# way: dump to a temp file next to the target, then rename over it. The
+# rename is atomic, so a crash or a concurrent reader never sees half a
+# file. The temp name carries the process and thread, so two writers
+# racing on one path each finish their own file and the last rename wins.
+
+def write_json_atomic(path: str, data: Any, indent: Optional[int] = None):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp, path)
@@ -0,0 +1,32 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The simulator is a flat set of modules in src/
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, os.path.abspath(SRC))
+
+from engine import Stats
+from scenario import Scenario
+from loader import ItemLoader
+from optimizer import Optimizer
+from equivalence import DATA_PATH, default_abilities
+
+@pytest.fixture(scope="session")
+def library():
+    """The offline item snapshot (data/items_raw.json), loaded once."""
+    with open(DATA_PATH, encoding="utf-8") as f:
+        return ItemLoader.load_all(json.load(f)["data"])
+
+@pytest.fixture
+def make_optimizer():
+    """Optimizer factory: a level-18 auto attacker with Ezreal Q against a dummy."""
+    def make(duration: float = 10.0, armor: float = 80.0) -> Optimizer:
+        champ = Stats(base_ad=100.0, base_attack_speed=0.8, bonus_attack_speed=0.5,
+                      base_mana=1000.0, current_mana=1000.0)
+        target = Stats(base_hp=3000.0, current_health=3000.0, base_armor=armor, base_mr=50.0)
+        scenario = Scenario(name="dummy", duration=duration, attacker_level=18, target_stats=target)
+        return Optimizer(scenario, champ, default_abilities())
+    return make
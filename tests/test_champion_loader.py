@@ -0,0 +1,77 @@
+import os
+
+from engine import DamageType, ProcType
+from champion_loader import ChampionLoader, CACHE_DIR, compile_champion, parse_spell
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def test_default_cache_is_inside_the_repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    loader = ChampionLoader(patch="14.3.1")
+    assert os.path.abspath(loader.cache_dir) == os.path.join(REPO, "data", "champions", "14.3.1")
+    assert os.path.abspath(CACHE_DIR) == os.path.join(REPO, "data", "champions")
+
+# A trimmed DataDragon champion: one damaging spell per kind the parser handles
+RAW = {
+    "id": "Testy", "name": "Testy", "partype": "Mana",
+    "stats": {"hp": 600, "hpperlevel": 100, "mp": 300, "mpregen": 10,
+              "attackdamage": 60, "attackspeed": 0.65, "attackspeedperlevel": 2.5},
+    "spells": [
+        {"name": "Slash", "maxrank": 5, "tooltip": "Deals <physicalDamage>{{ e1 }}</physicalDamage>",
+         "effect": [None, [80, 120, 160, 200, 240]],
+         "cooldown": [8, 7, 6, 5, 4], "cost": [40, 45, 50, 55, 60]},
+        {"name": "Shout", "maxrank": 5, "tooltip": "Gains <speed>speed</speed>",
+         "effect": [None, [1, 2, 3, 4, 5]], "cooldown": [10], "cost": [50]},
+        {"name": "Fizzle", "maxrank": 5, "tooltip": "<magicDamage>?</magicDamage>",
+         "effect": [None], "cooldown": [12], "cost": [70]},
+        {"name": "Blast", "maxrank": 3, "tooltip": "Deals <magicDamage>{{ e1 }}</magicDamage>",
+         "effect": [None, [300, 450]], "cooldown": [100, 80, 60], "cost": [100]},
+    ],
+}
+
+class _Dragon:
+    """Stand-in DataDragon that counts downloads."""
+    version = "14.3.1"
+    def __init__(self):
+        self.fetches = 0
+    def fetch_champion(self, champion_id):
+        self.fetches += 1
+        return RAW if champion_id == "Testy" else None
+
+def test_compile_a_fixed_payload():
+    kit = compile_champion(RAW, "14.3.1")
+
+    # Utility spells and spells without base damage are dropped
+    assert [a.name for a in kit.abilities] == ["Slash", "Blast"]
+    slash, blast = kit.abilities
+    assert slash.damage_type is DamageType.PHYSICAL and slash.proc_type is ProcType.SPELL
+    assert [(d.base_damage, d.cooldown, d.mana_cost) for d in slash.level_data] == [
+        (80, 8, 40), (120, 7, 45), (160, 6, 50), (200, 5, 55), (240, 4, 60)]
+    # Short per-rank lists are padded with their last value
+    assert [d.base_damage for d in blast.level_data] == [300, 450, 450]
+    assert [d.mana_cost for d in blast.level_data] == [100, 100, 100]
+
+    assert kit.growth.mana_regen == 2.0 # Per 5 seconds -> per second
+    assert kit.growth.attack_speed_per_level == 0.025
+
+def test_effect_fallback_takes_effect_one_without_ratios():
+    spell = {"tooltip": "<trueDamage>x</trueDamage>", "maxrank": 2,
+             "effect": [[999, 999], [50, 70], [5, 5]]}
+    config = parse_spell("E", spell, uses_mana=False, override=None)
+
+    assert config.damage_type is DamageType.TRUE
+    assert [d.base_damage for d in config.level_data] == [50, 70] # Not effect[0] or effect[2]
+    assert config.ratios == [] # DataDragon has no coefficients: overrides supply them
+    assert [d.mana_cost for d in config.level_data] == [0.0, 0.0]
+
+def test_cached_kit_matches_the_compiled_one(tmp_path):
+    dragon = _Dragon()
+    compiled = ChampionLoader(dragon, cache_dir=str(tmp_path)).load("Testy")
+    assert dragon.fetches == 1
+
+    # A loader with no DataDragon at all can only read the cache
+    cached = ChampionLoader(patch="14.3.1", cache_dir=str(tmp_path)).load("Testy")
+    assert cached == compiled
+    assert ChampionLoader(dragon, cache_dir=str(tmp_path)).load("Testy") == compiled
+    assert dragon.fetches == 1
+    assert os.listdir(tmp_path / "14.3.1") == ["Testy.json"] # No temp files left behind
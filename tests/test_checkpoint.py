@@ -0,0 +1,82 @@
+import pytest
+
+from engine import Stats
+from events import EventType, Priority
+from pipeline import EventManager, CombatSystem, DamageEngine
+from simulation import TimeEngine
+from stat_pipeline import StatPipeline
+from inventory_system import InventoryManager
+from equivalence import default_abilities
+
+def _engine(items):
+    bus = EventManager()
+    CombatSystem(bus, DamageEngine())
+    champ = Stats(base_ad=100.0, base_attack_speed=0.8)
+    target = Stats(base_hp=5000.0, current_health=5000.0, base_armor=60.0)
+    sim = TimeEngine(bus, champ, target, items)
+    sim.register_passives()
+    return sim
+
+def _first_hit(sim):
+    """Damage of the first auto attack launched after the fork."""
+    launched = []
+    sim.bus.subscribe(EventType.ATTACK_LAUNCH, lambda e: launched.append(e.base_instance), Priority.LOWEST)
+    hits = []
+    sim.bus.subscribe(EventType.POST_MITIGATION_DAMAGE,
+                      lambda e: hits.append(e.damage_result.post_mitigation_damage)
+                      if launched and e.base_instance is launched[0] else None, Priority.LOWEST)
+    sim.run([])
+    return hits[0]
+
+def test_fork_with_another_build_uses_its_stats_at_once(library):
+    opening = [library["Long Sword"]]
+    swapped = [library["Pickaxe"]]
+
+    sim = _engine(opening)
+    # Pause exactly on a frame that launches an auto
+    sim.run([], until=1.0)
+    while sim.current_time < sim.next_attack_time:
+        sim.run([], until=sim.current_time + sim.time_step)
+    checkpoint = sim.checkpoint()
+
+    same = checkpoint.fork()
+    other = checkpoint.fork(swapped)
+    expected = StatPipeline.resolve(checkpoint.base_attacker, swapped, checkpoint.buff_manager.get_all_buffs())
+    assert other.attacker.total_ad == expected.total_ad != checkpoint.attacker.total_ad
+    assert other.attacker.current_mana == checkpoint.attacker.current_mana
+
+    assert _first_hit(other) > _first_hit(same)
+
+def _trinity(library, wire):
+    items = [library["Trinity Force"]]
+    bus = EventManager()
+    CombatSystem(bus, DamageEngine())
+    champ = Stats(base_ad=100.0, base_attack_speed=0.8, base_mana=1000.0, current_mana=1000.0)
+    target = Stats(base_hp=1e6, current_health=1e6, base_armor=60.0)
+    sim = TimeEngine(bus, champ, target, items)
+    wire(sim, items)
+    return sim
+
+def _equip(sim, items):
+    inventory = InventoryManager(sim.bus, sim)
+    for item in items:
+        inventory.equip_item(item)
+
+@pytest.mark.parametrize("wire", [lambda sim, items: sim.register_passives(), _equip])
+@pytest.mark.parametrize("at", [0.033, 0.264, 3.96, 7.656])
+def test_fork_keeps_spellblade_however_it_was_equipped(library, wire, at):
+    whole = _trinity(library, wire)
+    whole.run(default_abilities())
+
+    # Right after a Q cast (0.033) Spellblade is armed but not yet spent
+    sim = _trinity(library, wire)
+    sim.run(default_abilities(), until=at)
+    fork = sim.checkpoint().fork()
+    fork.run(default_abilities())
+    assert fork.total_damage_done == pytest.approx(whole.total_damage_done)
+
+def test_checkpoint_refuses_passives_the_engine_never_saw(library):
+    sim = _trinity(library, lambda sim, items: [InventoryManager(sim.bus).equip_item(i) for i in items])
+    sim.run(default_abilities(), until=1.0)
+    with pytest.raises(ValueError, match="Trinity Force"):
+        sim.checkpoint()
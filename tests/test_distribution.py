@@ -0,0 +1,22 @@
+from engine import Stats
+from scenario import Scenario
+from distribution import CritDistributionEvaluator
+
+def _evaluator(library, max_support):
+    champ = Stats(base_ad=100.0, base_attack_speed=0.8, bonus_attack_speed=0.5)
+    target = Stats(base_hp=3000.0, current_health=3000.0, base_armor=80.0)
+    scenario = Scenario(name="crit", duration=10.0, attacker_level=18, target_stats=target)
+    items = [library["Infinity Edge"], library["The Collector"]]
+    return CritDistributionEvaluator(champ, items, [], scenario, max_support=max_support)
+
+def test_full_resolution_is_exact(library):
+    dist = _evaluator(library, max_support=50000).distribution()
+    assert dist.exact
+    assert abs(sum(dist.probs) - 1.0) < 1e-9
+
+def test_merged_support_is_not_exact(library):
+    full = _evaluator(library, max_support=50000).distribution()
+    merged = _evaluator(library, max_support=4).distribution()
+    assert len(merged.values) <= 4 < len(full.values)
+    assert not merged.exact
+    assert abs(sum(merged.probs) - 1.0) < 1e-9
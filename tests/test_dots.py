@@ -0,0 +1,103 @@
+import pytest
+
+from engine import Stats, DamageType, ProcType, StatType
+from ability import Ability, AbilityConfig, AbilityLevelData, ScalingRatio
+from events import EventType, CombatEvent, Priority
+from pipeline import EventManager, CombatSystem, DamageEngine
+from simulation import TimeEngine
+from dots import DotConfig
+
+def _engine(items=(), hp=4000.0, closed_form=False, duration=10.0):
+    bus = EventManager()
+    CombatSystem(bus, DamageEngine())
+    target = Stats(base_hp=hp, current_health=hp, base_mr=40.0)
+    sim = TimeEngine(bus, Stats(base_ad=60.0, base_mana=1000.0, current_mana=1000.0), target, list(items))
+    sim.max_duration = duration
+    sim.dot_manager.closed_form = closed_form
+    sim.register_passives()
+
+    ticks = []
+    bus.subscribe(EventType.POST_MITIGATION_DAMAGE,
+                  lambda e: ticks.append((e.timestamp, e.damage_result)) if e.ability_name == "DoT" else None,
+                  Priority.LOWEST)
+    return sim, ticks
+
+def _apply(sim, config, at):
+    sim.schedule_event(CombatEvent(EventType.DOT_APPLY, at, None, None, dot_config=config))
+
+BURN = DotConfig(name="Burn", duration=3.0, damage_per_second=40.0, tick_interval=0.5)
+
+def _dealt(ticks):
+    return sum(r.post_mitigation_damage for _, r in ticks)
+
+def test_closed_form_matches_ticks_when_dots_run_out_in_time():
+    totals = {}
+    for closed in (False, True):
+        sim, ticks = _engine(closed_form=closed)
+        _apply(sim, BURN, 0.5)
+        _apply(sim, BURN, 2.0) # Refresh: one burn until 5.0s
+        _apply(sim, DotConfig("Poison", 2.0, DamageType.TRUE, 25.0, tick_interval=0.25), 6.0)
+        sim.run([])
+        totals[closed] = (_dealt(ticks), sum(r.pre_mitigation_damage for _, r in ticks), len(ticks))
+
+    (tick_post, tick_raw, tick_hits), (closed_post, closed_raw, closed_hits) = totals[False], totals[True]
+    assert tick_raw == pytest.approx(40.0 * 4.5 + 25.0 * 2.0)
+    assert closed_raw == pytest.approx(tick_raw)
+    assert closed_post == pytest.approx(tick_post)
+    assert closed_hits < tick_hits
+
+def test_a_dot_cut_off_by_the_fight_pays_up_to_the_end():
+    totals = {}
+    for closed in (False, True):
+        sim, ticks = _engine(duration=2.0, closed_form=closed)
+        _apply(sim, BURN, 0.5) # Would burn until 3.5s
+        sim.run([])
+        totals[closed] = (sum(r.pre_mitigation_damage for _, r in ticks), _dealt(ticks))
+
+    # Ticks at 1.0s and 1.5s, then the rest settled at 2.0s (past the last frame)
+    assert totals[False][0] == pytest.approx(40.0 * 1.5)
+    assert totals[True] == pytest.approx(totals[False])
+
+def test_stacks_add_rate_up_to_the_cap():
+    config = DotConfig(name="Bleed", duration=2.0, damage_per_second=10.0, tick_interval=0.5, max_stacks=2)
+    sim, ticks = _engine()
+    for at in (0.5, 1.0, 1.5): # Third application is capped at two stacks
+        _apply(sim, config, at)
+    sim.run([])
+
+    raw = sum(r.pre_mitigation_damage for _, r in ticks)
+    # 0.5-1.0 one stack, 1.0-3.5 two stacks (the refresh at 1.5 extends it)
+    assert raw == pytest.approx(10.0 * 0.5 + 20.0 * 2.5)
+
+def _ezreal_q(cooldown):
+    return Ability(AbilityConfig(
+        name="Mystic Shot",
+        damage_type=DamageType.PHYSICAL,
+        ratios=[ScalingRatio(StatType.AD, 1.0)],
+        level_data=[AbilityLevelData(base_damage=50, mana_cost=0, cooldown=cooldown)],
+        proc_type=ProcType.SPELL | ProcType.ON_HIT
+    ), rank=1)
+
+def test_liandrys_scales_with_max_hp(library):
+    raw = {}
+    for hp in (2000.0, 6000.0):
+        sim, ticks = _engine([library["Liandry's Torment"]], hp=hp)
+        sim.run([_ezreal_q(30.0)])
+        raw[hp] = sum(r.pre_mitigation_damage for _, r in ticks)
+
+    # One Q at ~0.25s, burn runs its full 3s: 1% max HP per second
+    assert raw[2000.0] == pytest.approx(0.01 * 2000.0 * 3.0)
+    assert raw[6000.0] == pytest.approx(3 * raw[2000.0])
+
+def test_liandrys_refreshes_without_stacking(library):
+    sim, ticks = _engine([library["Liandry's Torment"]], hp=5000.0, duration=6.0)
+    sim.run([_ezreal_q(1.0)])
+
+    # Re-applied every second: never more than one burn's worth per 0.5s tick
+    per_tick = 0.01 * 5000.0 * 0.5
+    assert all(r.pre_mitigation_damage <= per_tick + 1e-9 for _, r in ticks)
+    # And it keeps burning between the Qs instead of expiring (until it is settled at the end)
+    *times, end = [t for t, _ in ticks]
+    assert end == 6.0
+    assert len(times) > 3.0 / 0.5
+    assert all(b - a == pytest.approx(0.5) for a, b in zip(times, times[1:]))
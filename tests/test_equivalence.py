@@ -0,0 +1,36 @@
+from dataclasses import replace
+
+from equivalence import (
+    generate_cases, check_equivalence, check_thread_safety,
+    run_reference, run_baseline, run_resumed, fork_cases
+)
+
+def _cases(library, count=20):
+    return generate_cases(library, count=count, seed=7)
+
+def test_baseline_matches_reference(library):
+    report = check_equivalence(run_baseline, _cases(library))
+    assert report.cases_run == 20
+    assert report.passed, report.divergences
+
+def test_checkpoint_fork_matches_reference(library):
+    report = check_equivalence(run_resumed, _cases(library))
+    assert report.passed, report.divergences
+
+def test_fork_after_a_cast_keeps_passive_state(library):
+    report = check_equivalence(run_resumed, fork_cases(library))
+    assert report.cases_run == 4
+    assert report.passed, report.divergences
+
+def test_harness_catches_a_divergence(library):
+    def off_by_one_hit(case):
+        metrics = run_reference(case)
+        return replace(metrics, hit_count=metrics.hit_count + 1)
+
+    report = check_equivalence(off_by_one_hit, _cases(library, count=3))
+    assert not report.passed
+    assert {d.metric for d in report.divergences} == {"hit_count"}
+
+def test_threaded_runs_match_serial(library):
+    report = check_thread_safety(_cases(library), workers=8)
+    assert report.passed, report.divergences
@@ -0,0 +1,77 @@
+import pytest
+
+from engine import Stats, DamageInstance, DamageType, ProcType
+from events import EventType, CombatEvent, Priority
+from pipeline import EventManager, CombatSystem, DamageEngine
+from simulation import TimeEngine
+
+def _hit(name, proc=ProcType.BASIC_ATTACK, timestamp=1.0):
+    inst = DamageInstance(raw_damage=100.0, damage_type=DamageType.PHYSICAL,
+                          source_stats=Stats(), proc_type=proc)
+    return CombatEvent(EventType.PRE_MITIGATION_HIT, timestamp, None, None,
+                       base_instance=inst, ability_name=name)
+
+def _bus(debug, log):
+    bus = EventManager(debug=debug)
+    bus.subscribe(EventType.PRE_MITIGATION_HIT, lambda e: log.append(("high", e.ability_name)), Priority.HIGH)
+    bus.subscribe_batch(EventType.PRE_MITIGATION_HIT,
+                        lambda es: log.append(("batch", [e.ability_name for e in es])), Priority.NORMAL)
+    bus.subscribe(EventType.PRE_MITIGATION_HIT, lambda e: log.append(("low", e.ability_name)), Priority.LOW)
+    return bus
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_batch_listener_is_a_barrier(debug):
+    log = []
+    _bus(debug, log).publish_batch([_hit("a"), _hit("b")])
+    assert log == [("high", "a"), ("high", "b"), ("batch", ["a", "b"]), ("low", "a"), ("low", "b")]
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_lone_publish_reaches_batch_listeners_in_priority_order(debug):
+    log = []
+    _bus(debug, log).publish(_hit("a"))
+    assert log == [("high", "a"), ("batch", ["a"]), ("low", "a")]
+
+def test_without_batch_listeners_each_event_runs_the_whole_chain():
+    log = []
+    bus = EventManager()
+    bus.subscribe(EventType.PRE_MITIGATION_HIT, lambda e: log.append(("high", e.ability_name)), Priority.HIGH)
+    bus.subscribe(EventType.PRE_MITIGATION_HIT, lambda e: log.append(("low", e.ability_name)), Priority.LOW)
+    bus.publish_batch([_hit("a"), _hit("b")])
+    assert log == [("high", "a"), ("low", "a"), ("high", "b"), ("low", "b")]
+
+def test_batch_proc_filter_and_late_subscription():
+    log = []
+    bus = _bus(False, log)
+    bus.publish_batch([_hit("warmup"), _hit("warmup")]) # Segments get cached here
+
+    # Subscribing again must rebuild the segments
+    bus.subscribe_batch(EventType.PRE_MITIGATION_HIT,
+                        lambda es: log.append(("spells", [e.ability_name for e in es])),
+                        Priority.LOWEST, proc_filter=ProcType.SPELL)
+    log.clear()
+    bus.publish_batch([_hit("auto"), _hit("q", ProcType.SPELL)])
+    assert log[-1] == ("spells", ["q"])
+
+    log.clear()
+    bus.publish_batch([_hit("auto"), _hit("auto2")])
+    assert all(entry[0] != "spells" for entry in log) # No match, no call
+
+def test_trace_recorder_sees_simultaneous_hits_once_processed():
+    bus = EventManager()
+    CombatSystem(bus, DamageEngine())
+    target = Stats(base_hp=5000.0, current_health=5000.0, base_armor=50.0)
+    sim = TimeEngine(bus, Stats(base_ad=100.0), target, [])
+    trace = sim.enable_trace()
+
+    seen = []
+    bus.subscribe_batch(EventType.PRE_MITIGATION_HIT,
+                        lambda es: seen.append([(e.ability_name, e.damage_result is not None) for e in es]),
+                        Priority.LOWEST)
+    sim.schedule_event(_hit("first", timestamp=0.5))
+    sim.schedule_event(_hit("second", timestamp=0.5))
+    sim.max_duration = 0.6
+    sim.run([])
+
+    # Both landed at 0.5s as one batch, already mitigated when the recorders got it
+    assert [("first", True), ("second", True)] in seen
+    assert [t for t in trace.hit_time if t == 0.5] == [0.5, 0.5]
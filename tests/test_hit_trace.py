@@ -0,0 +1,55 @@
+import pytest
+
+from engine import Stats
+from pipeline import EventManager, CombatSystem, DamageEngine
+from simulation import TimeEngine
+from rng import CritStream, build_fingerprint
+from hit_trace import HitTrace, TraceReplayer
+from equivalence import default_abilities
+
+# Crits, armor pen and Carve (which shreds the target, so replay re-runs it)
+BUILD = ["Black Cleaver", "Infinity Edge", "Lord Dominik's Regards"]
+
+def _target(armor):
+    return Stats(base_hp=1e6, current_health=1e6, base_armor=armor, base_mr=50.0)
+
+def _fight(items, target, trace=False):
+    bus = EventManager()
+    CombatSystem(bus, DamageEngine())
+    champ = Stats(base_ad=100.0, base_attack_speed=0.8, bonus_attack_speed=0.5,
+                  base_mana=1000.0, current_mana=1000.0)
+    sim = TimeEngine(bus, champ, target, items, CritStream(3, build_fingerprint(items)))
+    sim.max_duration = 10.0
+    sim.register_passives()
+    if trace:
+        sim.enable_trace()
+    sim.run(default_abilities())
+    return sim
+
+def test_bytes_round_trip(library):
+    trace = _fight([library[n] for n in BUILD], _target(80.0), trace=True).trace
+    trace.invalid_reason = "just checking the flag survives"
+    copy = HitTrace.from_bytes(trace.to_bytes())
+
+    assert len(copy) == len(trace) > 0
+    for name in ("hit_frame", "hit_time", "hit_start", "inst_type", "inst_raw", "inst_pen"):
+        assert getattr(copy, name) == getattr(trace, name), name
+    assert copy.pen == trace.pen
+    assert (copy.duration, copy.truncated, copy.invalid_reason) == \
+           (trace.duration, trace.truncated, trace.invalid_reason)
+
+def test_bytes_reject_other_data():
+    with pytest.raises(ValueError):
+        HitTrace.from_bytes(b"NOPE" + bytes(64))
+
+@pytest.mark.parametrize("armor", [80.0, 250.0])
+def test_replay_matches_the_simulation(library, armor):
+    items = [library[n] for n in BUILD]
+    recorded = _fight(items, _target(80.0), trace=True)
+    # Through bytes, as a stored trace would be
+    replayer = TraceReplayer(HitTrace.from_bytes(recorded.trace.to_bytes()), items)
+
+    result = replayer.replay(_target(armor))
+    expected = _fight(items, _target(armor))
+    assert result.total_damage == pytest.approx(expected.total_damage_done)
+    assert result.hits == len(recorded.trace)
@@ -0,0 +1,41 @@
+from rng import FixedStream
+from optimizer import _shared_stream
+
+def _builds(library):
+    return [
+        ("IE + Collector", [library["Infinity Edge"], library["The Collector"]]),
+        ("IE", [library["Infinity Edge"]]),
+        ("Long Sword", [library["Long Sword"]]),
+        ("Cleaver", [library["Black Cleaver"]]),
+    ]
+
+def test_race_never_trusts_a_single_run(library, make_optimizer):
+    entries = make_optimizer().race_builds(_builds(library), budget=200, initial_runs=1)
+    # Nobody is called deterministic, or knocked out, on one crit roll
+    for e in entries:
+        assert e.sims >= 2
+    assert sum(e.eliminated_round is None for e in entries) >= 1
+
+def test_race_separates_deterministic_builds_after_two_runs(library, make_optimizer):
+    # No crits: every run is identical, but only a second run can show that
+    builds = [("Long Sword", [library["Long Sword"]]), ("Cleaver", [library["Black Cleaver"]])]
+    winner, loser = make_optimizer().race_builds(builds, budget=100, initial_runs=1)
+    assert winner.build_name == "Cleaver" and winner.eliminated_round is None
+    assert loser.eliminated_round is not None
+    assert 2 <= loser.sims <= 3
+
+def test_transpositions_tell_crit_streams_apart(library, make_optimizer):
+    opt = make_optimizer()
+    items = [library["Infinity Edge"]]
+    # FixedStream has seed 0 / fingerprint 0, like shared run 0
+    forced = opt.evaluate_build("IE", items, FixedStream(-1.0))
+    shared = opt.evaluate_build("IE", items, _shared_stream(0, 0))
+    assert forced.dps > shared.dps
+
+def test_transpositions_follow_the_scenario(library, make_optimizer):
+    opt = make_optimizer(armor=20.0)
+    items = [library["Long Sword"]]
+    soft = opt.evaluate_build("Long Sword", items).dps
+
+    opt.scenario.target_stats.base_armor = 200.0
+    assert opt.evaluate_build("Long Sword", items).dps < soft
@@ -0,0 +1,44 @@
+import pytest
+
+from enumerator import BuildConstraints
+from pareto import optimistic_item
+from rng import FixedStream
+
+# Damage components first, then only tank items: once a partial build is
+# down to tank items, its optimistic bound loses to a cheaper damage build
+MIX = ["Long Sword", "Pickaxe", "Kindlegem", "Warmog's Armor", "Thornmail",
+       "Randuin's Omen", "Spirit Visage", "Force of Nature", "Heartsteel"]
+
+# These carry their stats as loader attributes (pen, lethality, crit), not modifiers
+DIRECT = ["Lord Dominik's Regards", "The Collector", "Infinity Edge"]
+
+def _frontier(optimizer, library, names, prune):
+    pool = {n: library[n] for n in names}
+    frontier = optimizer.pareto_sweep(pool, BuildConstraints(max_items=3), prune=prune)
+    return frontier, [(p.cost, p.dps) for p in frontier.points]
+
+def test_pruning_keeps_the_frontier(library, make_optimizer):
+    opt = make_optimizer()
+    full, exact = _frontier(opt, library, MIX, prune=False)
+    pruned, fast = _frontier(opt, library, MIX, prune=True)
+
+    assert pruned.seen < full.seen # The bound actually cut something
+    assert fast == exact
+
+@pytest.mark.parametrize("armor", [80.0, 1000.0])
+def test_pruning_keeps_the_frontier_with_direct_stats(library, make_optimizer, armor):
+    opt = make_optimizer(armor=armor)
+    _, exact = _frontier(opt, library, MIX + DIRECT, prune=False)
+    _, fast = _frontier(opt, library, MIX + DIRECT, prune=True)
+    assert fast == exact
+
+@pytest.mark.parametrize("armor", [80.0, 1000.0])
+def test_bound_beats_the_item_it_bounds(library, make_optimizer, armor):
+    # On its own, so a bigger stat elsewhere in the pool can't hide a missing one
+    opt = make_optimizer(armor=armor)
+    for name in MIX + DIRECT:
+        item = library[name]
+        sim = opt._simulate([optimistic_item([item], 1)], opt.scenario,
+                            stop_on_kill=False, rng=FixedStream(-1.0))
+        bound = sim.total_damage_done / opt.scenario.duration
+        assert opt.evaluate_build(name, [item]).dps <= bound, name
@@ -0,0 +1,104 @@
+import heapq
+import random
+
+import pytest
+
+from events import EventType, CombatEvent
+from scheduler import EventScheduler
+
+def _event(ts):
+    return CombatEvent(EventType.PRE_MITIGATION_HIT, ts, None, None)
+
+def _drain(queue):
+    out = []
+    while queue:
+        ts, event = queue.pop()
+        out.append((ts, id(event)))
+    return out
+
+def _heap_order(events):
+    # The reference: a heap on (timestamp, insertion order)
+    heap = [(e.timestamp, i, e) for i, e in enumerate(events)]
+    heapq.heapify(heap)
+    out = []
+    while heap:
+        ts, _, event = heapq.heappop(heap)
+        out.append((ts, id(event)))
+    return out
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pop_order_matches_heapq(seed):
+    rng = random.Random(seed)
+    # Spread over many buckets, with repeated timestamps and ties on bucket edges
+    times = [round(rng.uniform(0, 20), rng.choice([1, 2, 3])) for _ in range(2000)]
+    times += [0.033 * k for k in range(50)] * 2
+    events = [_event(t) for t in times]
+
+    queue = EventScheduler(0.033)
+    for e in events:
+        queue.push(e)
+    assert len(queue) == len(events)
+    assert _drain(queue) == _heap_order(events)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_interleaved_pushes_while_draining(seed):
+    """Pushes into the bucket being drained (insort) and into later buckets, like the engine does."""
+    rng = random.Random(seed)
+    queue = EventScheduler(0.033)
+    heap, counter = [], 0
+    popped, expected = [], []
+
+    def push(ts, bulk=False):
+        nonlocal counter
+        events = [_event(ts)] if not bulk else [_event(ts + 0.01 * k) for k in range(rng.randint(1, 5))]
+        for e in events:
+            heapq.heappush(heap, (e.timestamp, counter, e))
+            counter += 1
+        if bulk:
+            queue.push_many(events)
+        else:
+            queue.push(events[0])
+
+    now = 0.0
+    for _ in range(300):
+        push(now + rng.choice([0.0, 0.001, 0.01, 0.25, rng.uniform(0, 3)]), bulk=rng.random() < 0.3)
+    for _ in range(3000):
+        if not heap:
+            break
+        ts, event = queue.pop()
+        now = ts
+        popped.append((ts, id(event)))
+        t, _, e = heapq.heappop(heap)
+        expected.append((t, id(e)))
+        if rng.random() < 0.6:
+            push(now + rng.choice([0.0, 0.005, 0.033, 0.5, rng.uniform(0, 2)]), bulk=rng.random() < 0.3)
+
+    assert popped == expected
+
+def test_pop_simultaneous_groups_exact_timestamps():
+    queue = EventScheduler(0.033)
+    a, b, c, d = _event(1.0), _event(1.0), _event(1.0 + 1e-12), _event(1.0)
+    queue.push_many([a, b, c])
+    queue.push(d)
+
+    ts, batch = queue.pop_simultaneous()
+    assert ts == 1.0 and batch == [a, b, d] # Scheduling order, exact equality only
+    assert queue.pop_simultaneous() == (1.0 + 1e-12, [c])
+    assert not queue and len(queue) == 0
+    with pytest.raises(IndexError):
+        queue.pop()
+
+def test_copy_of_a_partly_drained_queue():
+    queue = EventScheduler(0.033)
+    events = [_event(t) for t in (0.5, 0.51, 0.52, 0.9, 3.0)]
+    for e in events:
+        queue.push(e)
+    queue.pop() # 0.5: the 0.5-0.53 bucket is now being drained
+
+    clone = queue.copy()
+    assert len(clone) == 4
+    late = _event(0.505)
+    clone.push(late) # Into the clone's current bucket only
+
+    assert [e for _, e in (queue.pop() for _ in range(4))] == events[1:]
+    assert [e for _, e in (clone.pop() for _ in range(5))] == [late] + events[1:]
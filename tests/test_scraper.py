@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+from scraper import DataDragon
+
+PATCH = "14.3.1"
+CHAMPIONS = [f"Champ{i}" for i in range(40)]
+
+class _StandIn(BaseHTTPRequestHandler):
+    """A tiny DataDragon: versions, items, one file per champion."""
+    routes = {}
+    # Paths that answer 503 once before succeeding (exercises the retry policy)
+    flaky = set()
+    hits = {}
+
+    def do_GET(self):
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path in self.flaky and self.hits[self.path] == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        body = self.routes.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class _Server(ThreadingHTTPServer):
+    # Eight workers connect at once; the default backlog of 5 drops SYNs (1s retransmit)
+    request_queue_size = 64
+
+@pytest.fixture
+def server():
+    base = f"/cdn/{PATCH}/data/en_US"
+    routes = {
+        "/api/versions.json": [PATCH, "14.2.1"],
+        f"{base}/item.json": {"data": {"1036": {"name": "Long Sword"}}},
+    }
+    for name in CHAMPIONS:
+        routes[f"{base}/champion/{name}.json"] = {"data": {name: {"id": name}}}
+
+    handler = type("Handler", (_StandIn,), {"routes": routes, "flaky": {f"{base}/item.json"}, "hits": {}})
+    httpd = _Server(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", handler
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_bulk_download_against_stand_in(server, tmp_path):
+    host, handler = server
+    dragon = DataDragon(host=host, data_dir=str(tmp_path), requests_per_second=0)
+    assert dragon.version == PATCH # Latest patch from versions.json
+
+    result = dragon.fetch_bulk(CHAMPIONS + ["Missing"])
+
+    assert result["versions"][0] == PATCH
+    assert result["items"] == {"1036": {"name": "Long Sword"}}
+    assert all(result["champions"][name] == {"id": name} for name in CHAMPIONS)
+    assert result["champions"]["Missing"] == {} # 404 comes back empty
+
+    # The 503 on item.json was retried, and every file landed on disk
+    assert handler.hits[f"/cdn/{PATCH}/data/en_US/item.json"] == 2
+    assert (tmp_path / "items_raw.json").exists()
+    assert (tmp_path / "Champ39_raw.json").exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_rate_limiter_spaces_requests(server, tmp_path):
+    host, _ = server
+    dragon = DataDragon(version=PATCH, host=host, data_dir=str(tmp_path), requests_per_second=20)
+
+    start = time.monotonic()
+    dragon.fetch_bulk(CHAMPIONS[:10], items=False, versions=False)
+    # 10 requests at 20/s: the last one cannot start before 0.45s
+    assert time.monotonic() - start >= 0.45
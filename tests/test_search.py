@@ -0,0 +1,36 @@
+import pytest
+
+from enumerator import BuildConstraints
+from search import EvolutionarySearch
+
+def _pool(library, names):
+    return {n: library[n] for n in names}
+
+SMALL = ["Long Sword", "Infinity Edge", "The Collector", "Black Cleaver",
+         "Blade of The Ruined King", "Lord Dominik's Regards", "Pickaxe", "Dagger"]
+
+def test_last_generation_is_evaluated(library, make_optimizer):
+    opt = make_optimizer()
+    search = EvolutionarySearch(opt, _pool(library, SMALL), build_size=3,
+                                population_size=8, seed=3)
+    result = search.run(generations=4)
+
+    assert result.generations == 4 and len(result.history) == 4
+    assert result.history[-1] == result.best.dps
+    # The final population was scored, so nothing in it beats the reported best
+    assert all(search.seen.get(search._key(n)) is not None for n in search.population)
+    final = [opt.evaluate_build(" + ".join(n), [library[x] for x in n]) for n in search.population]
+    assert max(r.dps for r in final) <= result.best.dps
+
+def test_mutation_with_the_whole_pool_owned(library, make_optimizer):
+    names = ["Long Sword", "Pickaxe", "Dagger"]
+    search = EvolutionarySearch(make_optimizer(), _pool(library, names), build_size=3,
+                                population_size=4, mutation_rate=1.0, seed=1)
+    result = search.run(generations=2)
+    assert sorted(result.best_items) == sorted(names)
+
+def test_fallback_build_respects_the_constraints(library, make_optimizer):
+    search = EvolutionarySearch(make_optimizer(), _pool(library, SMALL), build_size=3,
+                                constraints=BuildConstraints(gold_budget=100))
+    with pytest.raises(ValueError):
+        search._random_build()